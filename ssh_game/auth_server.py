@@ -0,0 +1,354 @@
+"""
+Local SSH public-key login simulator.
+Симулятор входа на SSH-сервер по ключу.
+
+A simplified version of SSH public-key authentication over loopback TCP,
+without exposing any real machine to the network:
+
+    server -> client   SSH-GAME-1.0
+    client -> server   AUTH <user> <key type> <base64 key>
+    server -> client   CHALLENGE <base64 nonce>        key is in the user's authorized_keys
+    client -> server   SIGN <base64 signature>         signature over challenge_data()
+    server -> client   OK | FAIL <reason>
+
+The server checks keys with ssh_utils.AuthorizedKeysIndex and signatures
+with ssh_utils.KeyHandle, the client driver logs in hundreds of students
+concurrently and reports handshakes per second and latency percentiles.
+
+Usage (from the ssh_game directory):
+    python auth_server.py --students 200 --algorithm ed25519
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import time
+
+import ssh_utils
+from benchmarks.harness import summarize
+
+BANNER = 'SSH-GAME-1.0'
+HOST = '127.0.0.1'
+NONCE_SIZE = 32
+LOGIN_TIMEOUT = 10.0  # Seconds a connection may wait for the other side
+BACKLOG = 1024  # Hundreds of students connect at the same moment
+
+
+class AuthError(Exception):
+    def __init__(self, reason):
+        super().__init__(f"Login failed: {reason}")
+        self.reason = reason
+
+
+def challenge_data(user, nonce, blob):
+    """
+    Data the client signs, binding the signature to this login.
+
+    Args:
+        user (str): Account name
+        nonce (bytes): Random challenge sent by the server
+        blob (bytes): Base64 public key from the AUTH line
+
+    Returns:
+        bytes: Bytes to sign
+    """
+    return b'ssh-game-auth\0' + user.encode('utf-8') + b'\0' + nonce + b'\0' + blob
+
+
+async def _read_line(reader):
+    line = await asyncio.wait_for(reader.readline(), LOGIN_TIMEOUT)
+    if not line:
+        raise ConnectionError("Connection closed")
+    return line.decode('utf-8').rstrip('\r\n')
+
+
+def _summarize(latencies, failures, elapsed):
+    # Percentiles of the benchmark harness, latencies in seconds
+    report = {
+        'count': len(latencies),
+        'failures': failures,
+        'seconds': elapsed,
+        'handshakes_per_s': len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+    report.update(summarize(latencies))
+    return report
+
+
+class AuthServer:
+    def __init__(self, on_event=None):
+        """
+        Args:
+            on_event (callable): on_event(source, kind, detail) for every protocol step,
+                used by the game to draw a login as it happens
+        """
+        self.on_event = on_event
+        self.authorized = {}  # user -> ssh_utils.AuthorizedKeysIndex
+        self._handles = {}  # base64 key -> parsed public key, parsed on first login
+        self._server = None
+        self.logins = 0
+        self.failures = 0
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    def authorize(self, user, public_key):
+        """
+        Add a key to the user's authorized_keys.
+
+        Args:
+            user (str): Account name
+            public_key (str): OpenSSH public key line
+        """
+        self.authorized.setdefault(user, ssh_utils.AuthorizedKeysIndex()).add(public_key)
+
+    def _event(self, kind, detail=''):
+        if self.on_event is not None:
+            self.on_event('server', kind, detail)
+
+    def _public_key(self, entry):
+        handle = self._handles.get(entry.blob)
+        if handle is None:
+            handle = self._handles[entry.blob] = ssh_utils.load_public_key(entry.public_key)
+        return handle
+
+    async def start(self, host=HOST, port=0):
+        """
+        Listen on a loopback port, 0 picks a free one (see the port property).
+        """
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=BACKLOG)
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            writer.write(f"{BANNER}\n".encode('ascii'))
+            self._event('banner', BANNER)
+
+            command, _, request = (await _read_line(reader)).partition(' ')
+            user, _, public_key = request.partition(' ')
+            if command != 'AUTH' or not public_key:
+                raise AuthError('protocol')
+            index = self.authorized.get(user)
+            entry = index.find(public_key) if index is not None else None
+            if entry is None:
+                raise AuthError('unknown-key')
+            self._event('key_found', entry.fingerprint)
+
+            nonce = os.urandom(NONCE_SIZE)
+            writer.write(b'CHALLENGE ' + base64.b64encode(nonce) + b'\n')
+            self._event('challenge', nonce.hex())
+
+            command, _, signature = (await _read_line(reader)).partition(' ')
+            if command != 'SIGN':
+                raise AuthError('protocol')
+            valid = self._public_key(entry).verify(challenge_data(user, nonce, entry.blob),
+                                                   base64.b64decode(signature))
+            if not valid:
+                raise AuthError('bad-signature')
+            self._event('verified', user)
+            writer.write(b'OK\n')
+            self.logins += 1
+            self._event('accepted', user)
+        except AuthError as e:
+            self.failures += 1
+            writer.write(f"FAIL {e.reason}\n".encode('ascii'))
+            self._event('rejected', e.reason)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            # The client went away or sent garbage, nothing to answer
+            self.failures += 1
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def login(host, port, user, private_key, public_key=None, on_event=None):
+    """
+    Log in as a user with a private key.
+
+    Args:
+        host (str): Server address
+        port (int): Server port
+        user (str): Account name
+        private_key (str or KeyHandle): PEM or OpenSSH private key, or a loaded key
+        public_key (str): OpenSSH public key line, derived from the private key if None
+        on_event (callable): on_event(source, kind, detail) for every protocol step
+
+    Returns:
+        float: Duration of the login in seconds, from connecting to the server's OK
+
+    Raises:
+        AuthError: If the server refused the key or the signature
+    """
+    def event(kind, detail=''):
+        if on_event is not None:
+            on_event('client', kind, detail)
+
+    if not isinstance(private_key, ssh_utils.KeyHandle):
+        private_key = ssh_utils.load_private_key(private_key)
+    if public_key is None:
+        public_key = ssh_utils.format_public_key_openssh(private_key)
+    key_type, blob = public_key.split()[:2]
+
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if await _read_line(reader) != BANNER:
+            raise AuthError('protocol')
+        writer.write(f"AUTH {user} {key_type} {blob}\n".encode('utf-8'))
+        event('auth', f"{user} {key_type}")
+
+        command, _, argument = (await _read_line(reader)).partition(' ')
+        if command == 'FAIL':
+            raise AuthError(argument)
+        if command != 'CHALLENGE':
+            raise AuthError('protocol')
+        signature = private_key.sign(challenge_data(user, base64.b64decode(argument), blob.encode('ascii')))
+        writer.write(b'SIGN ' + base64.b64encode(signature) + b'\n')
+        event('signature', signature.hex())
+
+        command, _, argument = (await _read_line(reader)).partition(' ')
+        if command != 'OK':
+            raise AuthError(argument or 'protocol')
+        elapsed = time.perf_counter() - start
+        event('done', f"{elapsed * 1000:.2f}")
+        return elapsed
+    finally:
+        writer.close()
+
+
+async def run_clients(host, port, students, concurrency=None, rounds=1):
+    """
+    Log every student in, many at the same time.
+
+    Args:
+        host (str): Server address
+        port (int): Server port
+        students (list): (user, KeyHandle, OpenSSH public key line) tuples
+        concurrency (int): Logins in progress at once, default is all of them
+        rounds (int): Logins per student
+
+    Returns:
+        dict: Handshake count, failures, handshakes per second and latency percentiles in ms
+    """
+    semaphore = asyncio.Semaphore(concurrency or len(students) * rounds)
+    latencies = []
+    failures = 0
+
+    async def one(user, private_key, public_key):
+        nonlocal failures
+        async with semaphore:
+            try:
+                latencies.append(await login(host, port, user, private_key, public_key))
+            except (AuthError, OSError, asyncio.TimeoutError):
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*student) for _ in range(rounds) for student in students))
+    return _summarize(latencies, failures, time.perf_counter() - start)
+
+
+def make_students(count, algorithm='ed25519'):
+    """
+    Returns:
+        list: (user, KeyHandle, OpenSSH public key line) for count new students
+    """
+    students = []
+    for i in range(1, count + 1):
+        private_pem, _ = ssh_utils.generate_key_pair(algorithm)
+        private_key = ssh_utils.load_private_key(private_pem)
+        students.append((f"student{i:03d}", private_key, ssh_utils.format_public_key_openssh(private_key)))
+    return students
+
+
+def simulate(students, concurrency=None, rounds=1):
+    """
+    Start a server on a loopback port, log the students in and stop it.
+
+    Args:
+        students (list): Tuples from make_students()
+
+    Returns:
+        dict: Report of run_clients() plus the server's counters
+    """
+    async def main():
+        server = AuthServer()
+        for user, _, public_key in students:
+            server.authorize(user, public_key)
+        await server.start()
+        try:
+            report = await run_clients(HOST, server.port, students, concurrency, rounds)
+        finally:
+            await server.close()
+        report['server_logins'] = server.logins
+        report['server_failures'] = server.failures
+        return report
+
+    return asyncio.run(main())
+
+
+def load_test(count, algorithm='ed25519'):
+    """
+    Log count students with new keys in at the same time.
+    Runs in the game's process pool, key generation would stall the frame loop.
+
+    Returns:
+        dict: Report of simulate()
+    """
+    return simulate(make_students(count, algorithm))
+
+
+def live_login(user, private_key, on_event):
+    """
+    One login against a private server, every step reported to on_event.
+    Runs in a worker thread of the game.
+
+    Returns:
+        float: Duration of the login in seconds
+    """
+    async def main():
+        server = AuthServer(on_event)
+        private_handle = ssh_utils.load_private_key(private_key)
+        public_key = ssh_utils.format_public_key_openssh(private_handle)
+        server.authorize(user, public_key)
+        await server.start()
+        try:
+            return await login(HOST, server.port, user, private_handle, public_key, on_event)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python auth_server.py', description="Simulate concurrent SSH key logins")
+    parser.add_argument('--students', type=int, default=200, help="Number of students logging in")
+    parser.add_argument('--algorithm', choices=sorted(ssh_utils.KEY_ALGORITHMS), default='ed25519')
+    parser.add_argument('--concurrency', type=int, help="Logins in progress at once (default: all)")
+    parser.add_argument('--rounds', type=int, default=1, help="Logins per student")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    students = make_students(args.students, args.algorithm)
+    report = simulate(students, args.concurrency, args.rounds)
+    print(f"Входов: {report['count']}, ошибок: {report['failures']}, {report['seconds']:.2f} с")
+    print(f"{report['handshakes_per_s']:.0f} входов/с")
+    if report['count']:
+        print(f"Задержка: p50 {report['p50_ms']:.2f} мс, p90 {report['p90_ms']:.2f} мс, "
+              f"p99 {report['p99_ms']:.2f} мс, max {report['max_ms']:.2f} мс")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Headless benchmark suite for the game scenes and the crypto helpers
+# Набор тестов производительности для сцен игры и криптографических функций
@@ -0,0 +1,110 @@
+"""
+Run the benchmark suite headless and compare against a stored baseline.
+
+Usage (from the ssh_game directory):
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json --threshold 0.25
+    python -m benchmarks --suite imports
+"""
+
+import argparse
+import os
+import sys
+
+# Scenes are drawn without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# Do not touch the player's key cache
+os.environ.setdefault('SSH_GAME_KEY_CACHE', '')
+
+from benchmarks import harness
+
+SUITES = ['scenes', 'crypto', 'particles', 'imports', 'stream', 'bulk', 'store', 'fingerprints', 'authorized_keys',
+          'auth']
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="SSH game benchmark suite")
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help="Suite to run, may be repeated (default: all)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames measured per scene")
+    parser.add_argument('--repeat', type=int, default=200, help="Calls per crypto microbenchmark")
+    parser.add_argument('--keygen-repeat', type=int, default=5, help="Calls per key generation benchmark")
+    parser.add_argument('--key-sizes', type=int, nargs='+', default=[1024, 2048], help="RSA key sizes")
+    parser.add_argument('--particle-counts', type=int, nargs='+', default=[1000, 10000],
+                        help="Particle counts timed per draw approach")
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[16 * 1024, 64 * 1024, 1024 * 1024],
+                        help="Chunk sizes of the streaming encryption benchmark")
+    parser.add_argument('--stream-mb', type=int, default=32, help="Megabytes encrypted per stream measurement")
+    parser.add_argument('--bulk-messages', type=int, default=512, help="Messages per bulk encrypt/decrypt batch")
+    parser.add_argument('--store-keys', type=int, default=2000, help="Keys inserted by the key store benchmark")
+    parser.add_argument('--index-keys', type=int, default=100000, help="Keys in the fingerprint index benchmark")
+    parser.add_argument('--authorized-keys-lines', type=int, default=100000,
+                        help="Entries in the synthetic authorized_keys file")
+    parser.add_argument('--auth-students', type=int, default=200, help="Students logging in per auth measurement")
+    parser.add_argument('--auth-concurrency', type=int, nargs='+', default=[0, 50],
+                        help="Logins in progress at once in the auth benchmark, 0 = all students")
+    parser.add_argument('--import-repeat', type=int, default=5, help="Interpreter starts per import benchmark")
+    parser.add_argument('--output', help="Save results as JSON")
+    parser.add_argument('--baseline', help="Compare against a JSON file saved with --output")
+    parser.add_argument('--threshold', type=float, default=harness.DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of the median before failing, 0.25 = 25%%")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    suites = args.suite or SUITES
+    results = {}
+
+    if 'scenes' in suites:
+        from benchmarks import scenes
+        results.update(scenes.run(args.frames))
+    if 'crypto' in suites:
+        from benchmarks import crypto
+        results.update(crypto.run(args.key_sizes, args.repeat, args.keygen_repeat))
+    if 'particles' in suites:
+        from benchmarks import particles
+        results.update(particles.run(args.particle_counts, min(args.frames, 60)))
+    if 'imports' in suites:
+        from benchmarks import imports
+        results.update(imports.run(args.import_repeat))
+    if 'stream' in suites:
+        from benchmarks import stream
+        results.update(stream.run(args.chunk_sizes, args.stream_mb, min(args.keygen_repeat, 5)))
+    if 'bulk' in suites:
+        from benchmarks import bulk
+        results.update(bulk.run(args.bulk_messages, min(args.keygen_repeat, 5)))
+    if 'store' in suites:
+        from benchmarks import store
+        results.update(store.run(args.store_keys, args.repeat))
+    if 'fingerprints' in suites:
+        from benchmarks import fingerprints
+        results.update(fingerprints.run(args.index_keys, args.repeat))
+    if 'authorized_keys' in suites:
+        from benchmarks import authorized_keys
+        results.update(authorized_keys.run(args.authorized_keys_lines, args.repeat))
+    if 'auth' in suites:
+        from benchmarks import auth
+        results.update(auth.run(args.auth_students, args.auth_concurrency))
+
+    harness.print_results(results)
+    if args.output:
+        harness.save_results(results, args.output)
+        print(f"\nResults saved to {args.output}")
+
+    failures = harness.budget_failures(results)
+    if failures:
+        harness.print_budget_failures(failures)
+        return 1
+
+    if args.baseline:
+        rows = harness.compare(results, harness.load_results(args.baseline), args.threshold)
+        harness.print_comparison(rows, args.threshold)
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
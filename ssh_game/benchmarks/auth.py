@@ -0,0 +1,28 @@
+"""
+Concurrent logins against the local SSH login simulator: handshakes per second
+and login latency, all students at once and with a limited number of connections.
+"""
+
+import auth_server
+
+ALGORITHMS = ['ed25519', 'rsa-2048']
+
+
+def run(student_count, concurrency_levels):
+    """
+    Args:
+        student_count (int): Students logging in per measurement
+        concurrency_levels (list): Logins in progress at once, 0 means all of them
+
+    Returns:
+        dict: Benchmark name -> login latency summary with handshakes_per_s
+    """
+    results = {}
+    for algorithm in ALGORITHMS:
+        students = auth_server.make_students(student_count, algorithm)
+        # Warm-up: imports and first-use setup of the crypto backend stay out of the measurement
+        auth_server.simulate(students[:1])
+        for concurrency in concurrency_levels:
+            report = auth_server.simulate(students, concurrency or None)
+            results[f"auth.{algorithm}.{concurrency or 'all'}.{student_count}"] = report
+    return results
@@ -0,0 +1,89 @@
+"""
+authorized_keys parsing and matching on a synthetic file, compared with
+reading the whole file into a list of strings.
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import ssh_utils
+from benchmarks.fingerprints import synthetic_public_key
+from benchmarks.harness import summarize, time_calls
+
+OPTIONS = ['', 'no-pty ', 'from="10.0.0.0/8",no-agent-forwarding ', 'command="echo \\"hello world\\"",no-pty ']
+
+
+def write_file(path, line_count):
+    rng = random.Random(1)
+    public_keys = []
+    with open(path, 'w') as f:
+        f.write("# synthetic authorized_keys\n")
+        for i in range(line_count):
+            public_key = synthetic_public_key(i)
+            public_keys.append(public_key)
+            f.write(rng.choice(OPTIONS) + public_key)
+    return public_keys
+
+
+def read_lines(path):
+    # Before the parser: the whole file as Python strings
+    with open(path) as f:
+        return [line.split() for line in f.read().splitlines() if line.strip() and not line.startswith('#')]
+
+
+def peak_memory_kb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def count(entries):
+    total = 0
+    for _ in entries:
+        total += 1
+    return total
+
+
+def run(line_count, repeat):
+    """
+    Args:
+        line_count (int): Entries in the synthetic authorized_keys file
+        repeat (int): Calls per lookup benchmark
+
+    Returns:
+        dict: Benchmark name -> timing summary, parsing with lines_per_s, peak memory in KB
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'authorized_keys')
+        public_keys = write_file(path, line_count)
+
+        for name, fn in (('parse', lambda: count(ssh_utils.iter_authorized_keys(path))),
+                         ('read_lines', lambda: read_lines(path))):
+            start = time.perf_counter()
+            fn()
+            summary = summarize([time.perf_counter() - start])
+            summary['lines_per_s'] = line_count / (summary['p50_ms'] / 1000)
+            results[f"authorized_keys.{name}.{line_count}"] = summary
+            results[f"authorized_keys.{name}_memory.{line_count}"] = {'peak_kb': peak_memory_kb(fn)}
+
+        start = time.perf_counter()
+        index = ssh_utils.AuthorizedKeysIndex.from_file(path)
+        results[f"authorized_keys.index_build.{line_count}"] = summarize([time.perf_counter() - start])
+
+        presented = iter(public_keys * (repeat // line_count + 1))
+        samples = time_calls(lambda: next(presented) in index, repeat)
+        results[f"authorized_keys.contains.{line_count}"] = summarize(samples)
+
+        # Without an index every check parses the file again
+        unknown = synthetic_public_key(line_count).split()[1].encode('ascii')
+        samples = time_calls(lambda: any(entry.blob == unknown for entry in ssh_utils.iter_authorized_keys(path)),
+                             max(1, repeat // 100))
+        results[f"authorized_keys.scan.{line_count}"] = summarize(samples)
+    return results
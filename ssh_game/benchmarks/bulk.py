@@ -0,0 +1,65 @@
+"""
+Bulk encrypt/decrypt throughput per number of worker processes.
+"""
+
+import os
+import time
+
+import ssh_utils
+import bulk_crypto
+from benchmarks.harness import summarize
+
+KEY_SIZE = 2048
+
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def measure(fn, count, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    summary = summarize(samples)
+    summary['messages_per_s'] = count / (summary['p50_ms'] / 1000)
+    return summary
+
+
+def run(message_count, repeat):
+    """
+    Args:
+        message_count (int): Messages per batch
+        repeat (int): Measurements per worker count
+
+    Returns:
+        dict: Benchmark name -> timing summary with messages_per_s
+    """
+    results = {}
+    private_pem, public_pem = ssh_utils.generate_rsa_key_pair(KEY_SIZE)
+    messages = [f"Задание студента {i}" for i in range(message_count)]
+    encrypted = [ssh_utils.encrypt_message(message, public_pem) for message in messages]
+
+    # One call at a time in this process, for comparison
+    private_key = ssh_utils.load_private_key(private_pem)
+    results["bulk.decrypt.sequential"] = measure(lambda: [private_key.decrypt(e) for e in encrypted],
+                                                 message_count, repeat)
+
+    for workers in worker_counts():
+        # Pools are started outside the measurement, like a pool reused for many batches
+        with bulk_crypto.CryptoPool(public_pem, workers=workers) as pool:
+            list(pool.encrypt_many(messages[:workers]))
+            results[f"bulk.encrypt.{workers}"] = measure(lambda: list(pool.encrypt_many(messages)),
+                                                         message_count, repeat)
+        with bulk_crypto.CryptoPool(private_pem, private=True, workers=workers) as pool:
+            list(pool.decrypt_many(encrypted[:workers]))
+            results[f"bulk.decrypt.{workers}"] = measure(lambda: list(pool.decrypt_many(encrypted)),
+                                                         message_count, repeat)
+    return results
@@ -0,0 +1,68 @@
+"""
+Microbenchmarks for the ssh_utils helpers, per key size and key algorithm.
+"""
+
+import ssh_utils
+from benchmarks.harness import summarize, time_calls
+
+MESSAGE = "Секретное сообщение"
+
+
+def run(key_sizes, repeat, keygen_repeat):
+    """
+    Args:
+        key_sizes (list): RSA key sizes in bits
+        repeat (int): Calls per encrypt/decrypt/format benchmark
+        keygen_repeat (int): Calls per key generation benchmark
+
+    Returns:
+        dict: Benchmark name -> timing summary
+    """
+    results = {}
+    for key_size in key_sizes:
+        samples = time_calls(lambda: ssh_utils.generate_rsa_key_pair(key_size), keygen_repeat)
+        results[f"crypto.generate_rsa_key_pair.{key_size}"] = summarize(samples)
+
+        private_pem, public_pem = ssh_utils.generate_rsa_key_pair(key_size)
+        encrypted = ssh_utils.encrypt_message(MESSAGE, public_pem)
+
+        samples = time_calls(lambda: ssh_utils.encrypt_message(MESSAGE, public_pem), repeat)
+        results[f"crypto.encrypt_message.{key_size}"] = summarize(samples)
+
+        samples = time_calls(lambda: ssh_utils.decrypt_message(encrypted, private_pem), repeat)
+        results[f"crypto.decrypt_message.{key_size}"] = summarize(samples)
+
+        # Every call parses the PEM again, as before the key cache
+        def uncached(fn, *args):
+            ssh_utils.key_cache.clear()
+            fn(*args)
+
+        samples = time_calls(lambda: uncached(ssh_utils.encrypt_message, MESSAGE, public_pem), repeat)
+        results[f"crypto.encrypt_message_uncached.{key_size}"] = summarize(samples)
+
+        samples = time_calls(lambda: uncached(ssh_utils.decrypt_message, encrypted, private_pem), repeat)
+        results[f"crypto.decrypt_message_uncached.{key_size}"] = summarize(samples)
+
+        private_key = ssh_utils.load_private_key(private_pem)
+        samples = time_calls(lambda: private_key.decrypt(encrypted), repeat)
+        results[f"crypto.key_handle_decrypt.{key_size}"] = summarize(samples)
+
+        samples = time_calls(lambda: ssh_utils.format_key_for_display(private_pem), repeat)
+        results[f"crypto.format_key_for_display.{key_size}"] = summarize(samples)
+
+    # Signatures, the operation an SSH login actually performs with the key
+    for algorithm in ssh_utils.KEY_ALGORITHMS:
+        samples = time_calls(lambda: ssh_utils.generate_key_pair(algorithm), keygen_repeat)
+        results[f"crypto.generate_key_pair.{algorithm}"] = summarize(samples)
+
+        private_pem, public_pem = ssh_utils.generate_key_pair(algorithm)
+        private_key = ssh_utils.load_private_key(private_pem)
+        public_key = ssh_utils.load_public_key(public_pem)
+        signature = private_key.sign(MESSAGE)
+
+        samples = time_calls(lambda: private_key.sign(MESSAGE), repeat)
+        results[f"crypto.sign.{algorithm}"] = summarize(samples)
+
+        samples = time_calls(lambda: public_key.verify(MESSAGE, signature), repeat)
+        results[f"crypto.verify.{algorithm}"] = summarize(samples)
+    return results
@@ -0,0 +1,64 @@
+"""
+Fingerprint computation and the in-memory fingerprint index on synthetic keys.
+"""
+
+import base64
+import os
+import struct
+import time
+
+import ssh_utils
+from key_store import FingerprintIndex
+from benchmarks.harness import summarize, time_calls
+
+
+def synthetic_public_key(index):
+    # Random 32 bytes in the Ed25519 wire format, enough for fingerprints and parsing
+    key_type = b'ssh-ed25519'
+    blob = struct.pack('>I', len(key_type)) + key_type + struct.pack('>I', 32) + os.urandom(32)
+    return f"ssh-ed25519 {base64.b64encode(blob).decode('ascii')} student{index}@ssh-game\n"
+
+
+def run(key_count, repeat):
+    """
+    Args:
+        key_count (int): Keys in the index
+        repeat (int): Calls per lookup benchmark
+
+    Returns:
+        dict: Benchmark name -> timing summary, the index build with keys_per_s
+    """
+    results = {}
+    public_keys = [synthetic_public_key(i) for i in range(key_count)]
+
+    start = time.perf_counter()
+    index = FingerprintIndex()
+    for i, public_key in enumerate(public_keys):
+        index.add(ssh_utils.blob_fingerprint(base64.b64decode(public_key.split()[1])), i)
+    summary = summarize([time.perf_counter() - start])
+    summary['keys_per_s'] = key_count / (summary['p50_ms'] / 1000)
+    results[f"fingerprints.index_build.{key_count}"] = summary
+
+    presented = iter(public_keys * (repeat // key_count + 1))
+    samples = time_calls(lambda: index.contains_key(next(presented)), repeat)
+    results[f"fingerprints.contains_key.{key_count}"] = summarize(samples)
+
+    unknown = [synthetic_public_key(i) for i in range(repeat)]
+    presented_unknown = iter(unknown)
+    samples = time_calls(lambda: index.contains_key(next(presented_unknown)), repeat)
+    results[f"fingerprints.contains_key_miss.{key_count}"] = summarize(samples)
+
+    # Before the index: compare the presented key with every stored key string
+    samples = time_calls(lambda: unknown[0] in public_keys, max(1, repeat // 100))
+    results[f"fingerprints.string_scan.{key_count}"] = summarize(samples)
+
+    private_pem, public_pem = ssh_utils.generate_key_pair('ed25519')
+    handle = ssh_utils.load_public_key(public_pem)
+
+    def uncached():
+        handle._fingerprint = None
+        return ssh_utils.fingerprint(handle)
+
+    results["fingerprints.fingerprint_uncached"] = summarize(time_calls(uncached, repeat))
+    results["fingerprints.fingerprint_memoized"] = summarize(time_calls(lambda: ssh_utils.fingerprint(handle), repeat))
+    return results
@@ -0,0 +1,152 @@
+"""
+Timing, statistics and baseline comparison shared by all benchmarks.
+summarize() is also used by the frame profiler and the login simulator.
+"""
+
+import json
+import platform
+import sys
+import time
+
+# A result is a regression when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.25
+COMPARE_METRIC = 'p50_ms'
+
+
+def time_calls(fn, repeat):
+    """
+    Call a function several times.
+
+    Args:
+        fn (callable): Function without arguments
+        repeat (int): Number of calls
+
+    Returns:
+        list: Duration of every call in seconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize(samples, to_ms=1000):
+    """
+    Args:
+        samples (list): Durations in seconds
+        to_ms (float): Milliseconds per sample unit, 1 for samples already in milliseconds
+
+    Returns:
+        dict: Count, mean and percentiles in milliseconds
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * to_ms,
+        'p50_ms': percentile(ordered, 0.50) * to_ms,
+        'p90_ms': percentile(ordered, 0.90) * to_ms,
+        'p99_ms': percentile(ordered, 0.99) * to_ms,
+        'max_ms': ordered[-1] * to_ms,
+    }
+
+
+def metadata():
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, metric=COMPARE_METRIC):
+    """
+    Compare results against a stored baseline.
+
+    Args:
+        results (dict): Current results, name -> summary
+        baseline (dict): Baseline results, name -> summary
+        threshold (float): Allowed relative slowdown, 0.25 means 25%
+        metric (str): Summary field that is compared
+
+    Returns:
+        list: (name, baseline value, current value, ratio, regressed) tuples
+    """
+    rows = []
+    for name in sorted(results):
+        if name not in baseline or metric not in results[name] or metric not in baseline[name]:
+            continue
+        old = baseline[name][metric]
+        new = results[name][metric]
+        ratio = new / old if old else float('inf') if new else 1.0
+        rows.append((name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def budget_failures(results):
+    """
+    Returns:
+        list: (name, result) of results over their budget or loading forbidden modules
+    """
+    return [(name, results[name]) for name in sorted(results)
+            if results[name].get('over_budget') or results[name].get('forbidden_imports')]
+
+
+def print_results(results):
+    print(f"{'benchmark':<48} {'count':>6} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name in sorted(results):
+        r = results[name]
+        if 'p50_ms' not in r:
+            extra = ', '.join(f"{key}={value}" for key, value in sorted(r.items()))
+            print(f"{name:<48} {extra}")
+            continue
+        throughput = ''
+        if 'mb_per_s' in r:
+            throughput = f" {r['mb_per_s']:>9.1f} MB/s"
+        elif 'messages_per_s' in r:
+            throughput = f" {r['messages_per_s']:>9.0f} msg/s"
+        elif 'keys_per_s' in r:
+            throughput = f" {r['keys_per_s']:>9.0f} keys/s"
+        elif 'lines_per_s' in r:
+            throughput = f" {r['lines_per_s']:>9.0f} lines/s"
+        elif 'handshakes_per_s' in r:
+            throughput = f" {r['handshakes_per_s']:>9.0f} logins/s"
+        print(f"{name:<48} {r['count']:>6} {r['p50_ms']:>10.3f} {r['p90_ms']:>10.3f} "
+              f"{r['p99_ms']:>10.3f} {r['max_ms']:>10.3f}{throughput}")
+
+
+def print_comparison(rows, threshold):
+    print(f"\n{'benchmark':<48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, old, new, ratio, regressed in rows:
+        mark = '  REGRESSION' if regressed else ''
+        print(f"{name:<48} {old:>10.3f} {new:>10.3f} {ratio:>7.2f}{mark}")
+    regressions = sum(1 for row in rows if row[4])
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+
+
+def print_budget_failures(failures):
+    print()
+    for name, r in failures:
+        if r.get('over_budget'):
+            print(f"{name}: p50 {r['p50_ms']:.3f} ms over the budget of {r['budget_ms']} ms")
+        if r.get('forbidden_imports'):
+            print(f"{name}: loads {', '.join(r['forbidden_imports'])} at import time")
@@ -0,0 +1,65 @@
+"""
+Import time of the game modules, measured with python -X importtime in a
+fresh interpreter for every sample.
+"""
+
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import summarize
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget of each module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    'ssh_utils': 20,
+    'key_pool': 60,
+    'main': 600,
+}
+# Packages these modules must not load at import time (scripts, grading server without a display)
+FORBIDDEN_IMPORTS = {
+    'ssh_utils': ('pygame', 'cryptography', 'rsa'),
+    'key_pool': ('pygame', 'cryptography', 'rsa'),
+}
+
+
+def import_times(module):
+    """
+    Import a module in a new interpreter.
+
+    Returns:
+        dict: Imported module name -> cumulative import time in seconds
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=GAME_DIR, capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Skips the header line
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def run(repeat):
+    """
+    Args:
+        repeat (int): Interpreter starts per module
+
+    Returns:
+        dict: Benchmark name -> timing summary with the budget check
+    """
+    results = {}
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        # The first import may compile bytecode, it is not measured
+        times = import_times(module)
+        samples = [import_times(module)[module] for _ in range(repeat)]
+        summary = summarize(samples)
+        summary['budget_ms'] = budget_ms
+        summary['over_budget'] = summary['p50_ms'] > budget_ms
+        summary['forbidden_imports'] = [name for name in FORBIDDEN_IMPORTS.get(module, ()) if name in times]
+        results[f"imports.{module}"] = summary
+    return results
@@ -0,0 +1,85 @@
+"""
+Particle throughput: how many particles each draw approach sustains at 60 FPS.
+"""
+
+import numpy as np
+import pygame
+
+from particles import ParticleSystem
+from benchmarks.harness import summarize, time_calls
+
+FRAME_BUDGET_MS = 1000 / 60
+APPROACHES = {
+    'circles': ParticleSystem.draw_circles,
+    'blits': ParticleSystem.draw,
+}
+COLORS = [(0, 255, 0), (255, 255, 0), (128, 0, 128)]
+
+
+def create_system(count, rng):
+    # Particles spread over the screen, all travelling to far away targets
+    system = ParticleSystem(count)
+    for i, color in enumerate(COLORS):
+        n = count // len(COLORS) + (1 if i < count % len(COLORS) else 0)
+        positions = rng.uniform((0, 0), (800, 600), (n, 2))
+        indices = system.add(positions, color, rng.integers(2, 5, n), rng.uniform(1, 3, n), i)
+        system.set_targets(indices, rng.uniform((-4000, -4000), (4000, 4000), (n, 2)))
+    return system
+
+
+def frame_times(surface, draw, count, frames, rng):
+    system = create_system(count, rng)
+
+    def frame():
+        surface.fill((255, 255, 255))
+        system.update()
+        draw(system, surface)
+
+    return time_calls(frame, frames)
+
+
+def max_particles(surface, draw, frames, rng, limit):
+    """
+    Largest particle count whose median frame (update + draw) fits in 1/60 s.
+    """
+    def fits(count):
+        samples = sorted(frame_times(surface, draw, count, frames, rng))
+        return samples[len(samples) // 2] * 1000 <= FRAME_BUDGET_MS
+
+    low, high = 0, 1000
+    while high <= limit and fits(high):
+        low, high = high, high * 2
+    high = min(high, limit + 1)
+    # Bisect to about 2% precision
+    while high - low > max(50, low // 50):
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def run(counts, frames, limit=1000000):
+    """
+    Args:
+        counts (list): Particle counts timed per approach
+        frames (int): Frames timed per measurement
+        limit (int): Upper bound for the 60 FPS search
+
+    Returns:
+        dict: Benchmark name -> timing summary or particle count
+    """
+    surface = pygame.display.get_surface()
+    if surface is None:
+        surface = pygame.display.set_mode((800, 600))
+    rng = np.random.default_rng(0)
+    results = {}
+    for name, draw in APPROACHES.items():
+        for count in counts:
+            samples = frame_times(surface, draw, count, frames, rng)
+            results[f"particles.{name}.{count}"] = summarize(samples)
+        results[f"particles.{name}.max_at_60fps"] = {
+            'max_particles': max_particles(surface, draw, frames, rng, limit)
+        }
+    return results
@@ -0,0 +1,159 @@
+"""
+Per-frame update/draw timings of every scene, driven without a window.
+The SDL dummy video driver must be selected before this module is imported.
+"""
+
+import time
+
+import rsa
+
+import main
+from key_generator import KeyGenStage, encrypt_decrypt
+from benchmarks.harness import summarize
+
+KEY_GEN_STAGES = {
+    'intro': KeyGenStage.INTRO,
+    'key_size': KeyGenStage.KEY_SIZE,
+    'generating': KeyGenStage.GENERATING,
+    'generation_steps': KeyGenStage.GENERATION_STEPS,
+    'display_keys': KeyGenStage.DISPLAY_KEYS,
+    'encrypt_decrypt': KeyGenStage.ENCRYPT_DECRYPT,
+    'complete': KeyGenStage.COMPLETE,
+}
+
+
+def create_game():
+    """
+    Returns:
+        tuple: (game, seconds from creating the game to its first drawn frame)
+    """
+    start = time.perf_counter()
+    game = main.Game()
+    game.draw()
+    first_frame = time.perf_counter() - start
+    # Background pool refills would compete with the measured frames
+    game.key_pool.refill = lambda: None
+    return game, first_frame
+
+
+def hover_positions(buttons):
+    # Alternate between hovering each button and empty space, like a moving mouse
+    positions = [(0, 0)]
+    for button in buttons:
+        positions += [button.rect.center, (0, 0)]
+    return positions
+
+
+def measure_frames(game, frames, before_frame=None):
+    """
+    Run the game's update() and draw() for a number of frames.
+
+    Returns:
+        tuple: (update durations, draw durations) in seconds
+    """
+    update_samples = []
+    draw_samples = []
+    for frame in range(frames):
+        if before_frame is not None:
+            before_frame(frame)
+        start = time.perf_counter()
+        game.update()
+        middle = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+        update_samples.append(middle - start)
+        draw_samples.append(end - middle)
+    return update_samples, draw_samples
+
+
+def add_result(results, name, samples):
+    update_samples, draw_samples = samples
+    results[f"scene.{name}.update"] = summarize(update_samples)
+    results[f"scene.{name}.draw"] = summarize(draw_samples)
+
+
+def bench_static_scene(game, state, frames):
+    game.state = state
+    game.renderer.reset()
+    buttons = game.buttons.get(state, [])
+    if state == main.QUIZ:
+        buttons = game.quiz.option_buttons
+    positions = hover_positions(buttons)
+
+    def hover(frame):
+        # Change the hover state every few frames
+        pos = positions[(frame // 10) % len(positions)]
+        for button in buttons:
+            button.check_hover(pos)
+
+    return measure_frames(game, frames, hover)
+
+
+def bench_key_generator(game, stage, frames, keys):
+    key_generator = game.key_generator
+    game.state = main.INTERACTIVE_1
+    game.renderer.reset()
+    key_generator.cancel_jobs()
+    key_generator.set_key_size(1024)
+    if stage == KeyGenStage.GENERATION_STEPS:
+        key_generator.generate_keys()
+    key_generator.stage = stage
+    key_generator.set_keys(*keys)
+    if stage == KeyGenStage.ENCRYPT_DECRYPT:
+        key_generator.set_crypto_result(*encrypt_decrypt(key_generator.message, *keys))
+    samples = measure_frames(game, frames)
+    key_generator.cancel_jobs()
+    return samples
+
+
+def bench_visualization(game, frames):
+    game.state = main.VISUALIZATION
+    game.renderer.reset()
+
+    def advance(frame):
+        # Play the stages one after another, restarting after the last one
+        visualizer = game.visualizer
+        if visualizer.current_stage >= visualizer.max_stages:
+            game.scenes.unload(main.VISUALIZATION)
+        elif visualizer.animation_done:
+            visualizer.next_stage()
+
+    return measure_frames(game, frames, advance)
+
+
+def bench_construction(game, state, repeat):
+    # Unload and construct the scene again, as on a first visit
+    for _ in range(repeat):
+        game.scenes.unload(state)
+        game.scenes.get(state)
+    return game.scenes.construction[state][-repeat:]
+
+
+def run(frames):
+    """
+    Args:
+        frames (int): Frames measured per scene
+
+    Returns:
+        dict: Benchmark name -> timing summary
+    """
+    results = {}
+    game, first_frame = create_game()
+    results["scene.first_frame"] = summarize([first_frame])
+
+    add_result(results, 'main_menu', bench_static_scene(game, main.MAIN_MENU, frames))
+    for name, lesson in [('lesson_1', main.LESSON_1), ('lesson_2', main.LESSON_2), ('lesson_3', main.LESSON_3)]:
+        add_result(results, name, bench_static_scene(game, lesson, frames))
+    add_result(results, 'quiz', bench_static_scene(game, main.QUIZ, frames))
+
+    public_key, private_key = rsa.newkeys(1024)
+    for name, stage in KEY_GEN_STAGES.items():
+        samples = bench_key_generator(game, stage, frames, (public_key, private_key))
+        add_result(results, f"key_generator.{name}", samples)
+
+    add_result(results, 'visualization', bench_visualization(game, frames))
+    
+    for state, name in main.SCENE_NAMES.items():
+        results[f"scene.{name}.construct"] = summarize(bench_construction(game, state, min(frames, 20)))
+    game.key_pool.shutdown()
+    return results
@@ -0,0 +1,73 @@
+"""
+Key store: bulk insert throughput and lookups by fingerprint, compared with
+scanning a directory of loose key files.
+"""
+
+import os
+import tempfile
+import time
+
+import ssh_utils
+from key_store import KeyStore
+from benchmarks.harness import summarize, time_calls
+
+ALGORITHM = 'ed25519'
+
+
+def scan_lookup(directory, fingerprint):
+    # Without an index: read and fingerprint every public key file until one matches
+    for owner in os.listdir(directory):
+        owner_dir = os.path.join(directory, owner)
+        if not os.path.isdir(owner_dir):
+            continue
+        for name in os.listdir(owner_dir):
+            if name.endswith('.pub'):
+                with open(os.path.join(owner_dir, name)) as f:
+                    if ssh_utils.fingerprint(f.read()) == fingerprint:
+                        return name
+    return None
+
+
+def run(key_count, repeat):
+    """
+    Args:
+        key_count (int): Keys inserted into the store
+        repeat (int): Lookups per lookup benchmark
+
+    Returns:
+        dict: Benchmark name -> timing summary, inserts with keys_per_s
+    """
+    results = {}
+    keys = [ssh_utils.generate_openssh_key_pair(ALGORITHM) for _ in range(key_count)]
+    entries = [(f"student{i:05d}", public_key, private_key) for i, (private_key, public_key) in enumerate(keys)]
+    fingerprints = [ssh_utils.fingerprint(public_key) for _, public_key in keys]
+
+    with tempfile.TemporaryDirectory() as root:
+        with KeyStore(os.path.join(root, 'bulk')) as store:
+            start = time.perf_counter()
+            store.add_many(entries)
+            summary = summarize([time.perf_counter() - start])
+            summary['keys_per_s'] = key_count / (summary['p50_ms'] / 1000)
+            results[f"store.add_many.{key_count}"] = summary
+
+            # A transaction per key, like indexing files one at a time
+            with KeyStore(os.path.join(root, 'single')) as single:
+                count = min(key_count, 200)
+                start = time.perf_counter()
+                for owner, public_key, private_key in entries[:count]:
+                    single.add(owner, public_key, private_key)
+                summary = summarize([time.perf_counter() - start])
+                summary['keys_per_s'] = count / (summary['p50_ms'] / 1000)
+                results[f"store.add_one_by_one.{count}"] = summary
+
+            lookups = iter(fingerprints * (repeat // key_count + 1))
+            samples = time_calls(lambda: store.by_fingerprint(next(lookups)), repeat)
+            results[f"store.by_fingerprint.{key_count}"] = summarize(samples)
+
+            samples = time_calls(lambda: store.by_fingerprint(next(lookups)).public_key, repeat)
+            results[f"store.by_fingerprint_load.{key_count}"] = summarize(samples)
+
+            # The scan is slow, a few lookups of the last key are enough
+            samples = time_calls(lambda: scan_lookup(store.root, fingerprints[-1]), max(1, repeat // 100))
+            results[f"store.scan_lookup.{key_count}"] = summarize(samples)
+    return results
@@ -0,0 +1,63 @@
+"""
+Throughput of the streaming hybrid encryption, in MB/s per algorithm and chunk size.
+"""
+
+import os
+import time
+
+import ssh_utils
+from benchmarks.harness import summarize
+
+KEY_SIZE = 2048
+BLOCK_SIZE = 1024 * 1024  # Size of the blocks fed into the stream, like file reads
+
+
+def payload(total_bytes):
+    block = os.urandom(BLOCK_SIZE)
+    for offset in range(0, total_bytes, BLOCK_SIZE):
+        yield block[:min(BLOCK_SIZE, total_bytes - offset)]
+
+
+def consume(chunks):
+    # Only counts the output, so the measurement does not hold the whole stream in memory
+    total = 0
+    for data in chunks:
+        total += len(data)
+    return total
+
+
+def run(chunk_sizes, megabytes, repeat):
+    """
+    Args:
+        chunk_sizes (list): Plaintext chunk sizes in bytes
+        megabytes (int): Data encrypted per measurement
+        repeat (int): Measurements per combination
+
+    Returns:
+        dict: Benchmark name -> timing summary with mb_per_s
+    """
+    results = {}
+    private_pem, public_pem = ssh_utils.generate_rsa_key_pair(KEY_SIZE)
+    public_key = ssh_utils.load_public_key(public_pem)
+    private_key = ssh_utils.load_private_key(private_pem)
+    total_bytes = megabytes * 1024 * 1024
+
+    for algorithm in ssh_utils.HYBRID_ALGORITHMS:
+        for chunk_size in chunk_sizes:
+            encrypted = b''.join(ssh_utils.encrypt_stream(payload(total_bytes), public_key, chunk_size, algorithm))
+            encrypted_blocks = [encrypted[i:i + BLOCK_SIZE] for i in range(0, len(encrypted), BLOCK_SIZE)]
+            operations = {
+                'encrypt': lambda: consume(ssh_utils.encrypt_stream(payload(total_bytes), public_key,
+                                                                     chunk_size, algorithm)),
+                'decrypt': lambda: consume(ssh_utils.decrypt_stream(encrypted_blocks, private_key)),
+            }
+            for operation, fn in operations.items():
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    fn()
+                    samples.append(time.perf_counter() - start)
+                summary = summarize(samples)
+                summary['mb_per_s'] = megabytes / (summary['p50_ms'] / 1000)
+                results[f"stream.{algorithm}.{operation}.{chunk_size}"] = summary
+    return results
@@ -0,0 +1,136 @@
+"""
+Bulk RSA encryption and decryption on all CPU cores.
+Массовое шифрование и расшифровка на всех ядрах процессора.
+
+Used for classroom batches: encrypting a challenge per student and
+decrypting all submissions. Messages are sent to a process pool in batches,
+every worker parses the key once when it starts, and results come back in
+input order as soon as they are ready.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import ssh_utils
+
+DEFAULT_BATCH_SIZE = 32
+# Batches in flight per worker, keeps every worker busy without reading the whole input
+BATCHES_PER_WORKER = 4
+
+# Key of the current worker process, set by _init_worker
+_worker_key = None
+
+
+def _init_worker(key_pem, private):
+    global _worker_key
+    if private:
+        _worker_key = ssh_utils.load_private_key(key_pem)
+    else:
+        _worker_key = ssh_utils.load_public_key(key_pem)
+
+
+def _encrypt_batch(messages):
+    return [_worker_key.encrypt(message) for message in messages]
+
+
+def _decrypt_batch(encrypted_messages):
+    return [_worker_key.decrypt(encrypted) for encrypted in encrypted_messages]
+
+
+def _batches(items, batch_size):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class CryptoPool:
+    def __init__(self, key_pem, private=False, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Process pool bound to one key. Reuse it for several batches, starting
+        the worker processes costs far more than a single RSA operation.
+
+        Args:
+            key_pem (str): PEM-encoded public key, or private key if private is True
+            private (bool): True to allow decryption
+            workers (int): Number of processes, default is the number of CPUs
+            batch_size (int): Messages sent to a worker at once
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.private = private
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(key_pem, private))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, fn, items):
+        # Ordered streaming: at most a few batches per worker are in flight
+        pending = deque()
+        batches = _batches(items, self.batch_size)
+        for batch in islice(batches, self.workers * BATCHES_PER_WORKER):
+            pending.append(self._executor.submit(fn, batch))
+        while pending:
+            results = pending.popleft().result()
+            batch = next(batches, None)
+            if batch is not None:
+                pending.append(self._executor.submit(fn, batch))
+            yield from results
+
+    def encrypt_many(self, messages):
+        """
+        Args:
+            messages (iterable): Messages (str) to encrypt
+
+        Yields:
+            bytes: Encrypted messages, in input order
+        """
+        return self._run(_encrypt_batch, messages)
+
+    def decrypt_many(self, encrypted_messages):
+        """
+        Args:
+            encrypted_messages (iterable): Messages encrypted with the public key
+
+        Yields:
+            str: Decrypted messages, in input order
+
+        Raises:
+            ValueError: If the pool was created with a public key
+        """
+        if not self.private:
+            raise ValueError("Decryption needs a pool created with a private key")
+        return self._run(_decrypt_batch, encrypted_messages)
+
+
+def encrypt_many(messages, public_key_pem, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encrypt many messages with one public key on a temporary process pool.
+
+    Yields:
+        bytes: Encrypted messages, in input order
+    """
+    with CryptoPool(public_key_pem, private=False, workers=workers, batch_size=batch_size) as pool:
+        yield from pool.encrypt_many(messages)
+
+
+def decrypt_many(encrypted_messages, private_key_pem, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Decrypt many messages with one private key on a temporary process pool.
+
+    Yields:
+        str: Decrypted messages, in input order
+    """
+    with CryptoPool(private_key_pem, private=True, workers=workers, batch_size=batch_size) as pool:
+        yield from pool.decrypt_many(encrypted_messages)
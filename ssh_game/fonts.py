@@ -0,0 +1,103 @@
+"""
+Central font registry.
+Общий реестр шрифтов.
+
+Every (face, size) font is loaded exactly once and shared by all scenes.
+Resolving a face name with pygame.font.SysFont scans the system fonts, which is
+slow on Linux, so resolved file paths are remembered across launches in a file
+next to the game; in a read-only game directory they are only kept in memory.
+"""
+
+import json
+import os
+
+import pygame
+
+DEFAULT_FACE = 'Arial'
+SMALL_SIZE = 16
+MEDIUM_SIZE = 24
+LARGE_SIZE = 32
+# Next to the game, never in the player's home directory
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'font_cache.json')
+
+
+class FontManager:
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, default_face=DEFAULT_FACE):
+        """
+        Args:
+            cache_path (str): JSON file with resolved font paths, None to disable
+            default_face (str): Face used by the small/medium/large fonts
+        """
+        self.cache_path = cache_path
+        self.default_face = default_face
+        self._fonts = {}
+        self._paths = self._load_paths()
+
+    @property
+    def small(self):
+        return self.get(self.default_face, SMALL_SIZE)
+
+    @property
+    def medium(self):
+        return self.get(self.default_face, MEDIUM_SIZE)
+
+    @property
+    def large(self):
+        return self.get(self.default_face, LARGE_SIZE)
+
+    def get(self, face, size):
+        """
+        Return the font for a face and size, loading it on first use.
+
+        Args:
+            face (str): Font face name, e.g. 'Arial'
+            size (int): Font size in points
+
+        Returns:
+            pygame.font.Font: The shared font object
+        """
+        key = (face.lower(), size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(self.resolve(face), size)
+            self._fonts[key] = font
+        return font
+
+    def resolve(self, face):
+        """
+        Find the font file for a face name.
+
+        Returns:
+            str: Path to the font file, or None for the pygame default font
+        """
+        face = face.lower()
+        if face in self._paths:
+            path = self._paths[face]
+            if path is None or os.path.exists(path):
+                return path
+        # Unknown face or the file was removed: do the slow system scan once
+        path = pygame.font.match_font(face)
+        self._paths[face] = path
+        self._save_paths()
+        return path
+
+    def _load_paths(self):
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_paths(self):
+        if self.cache_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self._paths, f, indent=2)
+        except OSError as e:
+            # Read-only game directory: keep the paths for this launch only
+            print(f"Could not save font cache, it is kept in memory: {e}")
+            self.cache_path = None
@@ -0,0 +1,135 @@
+"""
+Game clock with a fixed simulation step and a timer scheduler.
+Игровые часы с фиксированным шагом симуляции и планировщик таймеров.
+
+The frame loop measures real time with GameClock.tick() and feeds it into
+an accumulator. Game logic then runs in fixed steps of SIMULATION_STEP
+seconds, as many as the elapsed time needs, so animations run at the same
+wall-clock speed at 30 or 144 FPS and a slow frame only skips drawing.
+Scheduler keeps timers in a heap ordered by due time on the simulation
+clock, each timer belongs to an owner (usually a scene) and can be
+cancelled with everything else of that owner.
+"""
+
+import heapq
+import itertools
+import time
+
+SIMULATION_STEP = 1 / 60  # Seconds of game time per logic step
+MAX_FRAME_TIME = 0.25  # Longer frames (e.g. after a pause) are not caught up
+
+
+class GameClock:
+    def __init__(self, step=SIMULATION_STEP, max_frame_time=MAX_FRAME_TIME, time_source=time.perf_counter):
+        """
+        Args:
+            step (float): Length of one simulation step in seconds
+            max_frame_time (float): Upper limit of the time simulated per frame
+            time_source (callable): Returns the current time in seconds
+        """
+        self.step = step
+        self.max_frame_time = max_frame_time
+        self.time_source = time_source
+        self.time = 0.0  # Simulation time, advanced one step at a time
+        self.frame_time = 0.0
+        self.accumulator = 0.0
+        self._last = None
+
+    def tick(self):
+        """
+        Measure the real time since the previous tick.
+
+        Returns:
+            float: Elapsed seconds, at most max_frame_time
+        """
+        now = self.time_source()
+        dt = 0.0 if self._last is None else now - self._last
+        self._last = now
+        self.frame_time = min(dt, self.max_frame_time)
+        return self.frame_time
+
+    def advance(self, dt):
+        self.accumulator += min(dt, self.max_frame_time)
+
+    def steps(self):
+        """
+        Yield the step length once for every whole step in the accumulator.
+        """
+        while self.accumulator >= self.step:
+            self.accumulator -= self.step
+            self.time += self.step
+            yield self.step
+
+    @property
+    def alpha(self):
+        # How far the real time is between the last two simulation steps
+        return self.accumulator / self.step
+
+
+class Timer:
+    def __init__(self, due, callback, args, owner):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.owner = owner
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    def __init__(self):
+        self.time = 0.0
+        self._heap = []
+        self._order = itertools.count()  # Timers due at the same time fire in scheduling order
+
+    def call_at(self, due, callback, *args, owner=None):
+        """
+        Run callback(*args) once the simulation time reaches due.
+
+        Returns:
+            Timer: Handle that can be cancelled
+        """
+        timer = Timer(due, callback, args, owner)
+        heapq.heappush(self._heap, (due, next(self._order), timer))
+        return timer
+
+    def call_later(self, delay, callback, *args, owner=None):
+        return self.call_at(self.time + delay, callback, *args, owner=owner)
+
+    def cancel_owner(self, owner):
+        # Cancelled timers stay in the heap and are dropped when they come due
+        for _, _, timer in self._heap:
+            if timer.owner is owner:
+                timer.cancel()
+
+    def pending(self, owner=None):
+        return any(not timer.cancelled and (owner is None or timer.owner is owner)
+                   for _, _, timer in self._heap)
+
+    def next_due(self):
+        """
+        Returns:
+            float: Due time of the earliest live timer, None if there is none
+        """
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now):
+        """
+        Advance the scheduler to now and fire every timer that came due.
+
+        Returns:
+            int: Number of callbacks run
+        """
+        self.time = now
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            timer.callback(*timer.args)
+            fired += 1
+        return fired
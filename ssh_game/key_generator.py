@@ -1,10 +1,15 @@
 import pygame
 import sys
 from pygame.locals import *
-import rsa
 import binascii
+import queue
 import random
 import time
+import workers
+import ssh_utils
+import auth_server
+from text_cache import render_text
+from game_clock import Scheduler
 
 # Constants
 SCREEN_WIDTH = 800
@@ -19,6 +24,64 @@ LIGHT_BLUE = (173, 216, 230)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
+# Visible part of the scrollable generation steps panel
+STEPS_VIEW = pygame.Rect(0, 80, SCREEN_WIDTH, SCREEN_HEIGHT - 180)
+STEPS_TOP = 50  # First step row below the panel title
+FINISH_DELAY = 1.0  # Seconds between receiving the keys and finishing the steps
+
+# Key algorithms offered on the key size screen: (algorithm, button label, x, y)
+ALGORITHM_CHOICES = [
+    ('rsa-1024', "RSA 1024", 130, 230),
+    ('rsa-2048', "RSA 2048", 310, 230),
+    ('ed25519', "Ed25519", 490, 230),
+    ('ecdsa-p256', "ECDSA P-256", 220, 280),
+    ('ecdsa-p384', "ECDSA P-384", 400, 280),
+]
+ALGORITHM_LABELS = {algorithm: label for algorithm, label, _, _ in ALGORITHM_CHOICES}
+TIMINGS_TOP = 345  # Timing table on the key size screen
+# Timings of this machine do not change, they are measured once per game and kept when the scene is unloaded
+measured_timings = None
+KEY_ERROR_Y = 485  # Key generation error, above the button that retries
+
+# Live login on the local server: protocol steps are revealed one by one so they can be read
+LOGIN_STEP_DELAY = 0.4
+LOGIN_USER = "student"
+LOAD_TEST_STUDENTS = 100
+CLIENT_X = 140
+SERVER_X = 660
+LOGIN_TOP = 165
+LOGIN_ROW = 32
+# Protocol step -> where it is drawn and its caption; arrows point from sender to receiver
+LOGIN_STEP_TEXT = {
+    'banner': ('to_client', "Баннер сервера: {detail}"),
+    'auth': ('to_server', "Запрос входа и публичный ключ: {detail}"),
+    'key_found': ('server', "Ключ найден в authorized_keys: {detail:.27}..."),
+    'challenge': ('to_client', "Случайный вызов (challenge): {detail:.16}..."),
+    'signature': ('to_server', "Подпись вызова приватным ключом: {detail:.16}..."),
+    'verified': ('server', "Подпись проверена публичным ключом"),
+    'accepted': ('to_client', "OK: вход выполнен"),
+    'rejected': ('to_client', "Отказ: {detail}"),
+    'done': ('client', "Вход занял {detail} мс"),
+}
+
+def encrypt_decrypt(message, public_key, private_key):
+    # Runs in a worker thread: encrypt with the public key, decrypt with the private one
+    import rsa
+    try:
+        encrypted = rsa.encrypt(message.encode('utf-8'), public_key)
+        decrypted = rsa.decrypt(encrypted, private_key).decode('utf-8')
+    except OverflowError:
+        # Too long for one RSA block: RSA only wraps a symmetric key that encrypts the message
+        encrypted = ssh_utils.hybrid_encrypt(message, public_key.save_pkcs1())
+        decrypted = ssh_utils.hybrid_decrypt(encrypted, private_key.save_pkcs1()).decode('utf-8')
+    return encrypted, decrypted
+
+def sign_verify(message, private_pem, public_pem):
+    # Runs in a worker thread: sign with the private key, verify with the public one
+    signature = ssh_utils.sign_message(message, private_pem)
+    valid = ssh_utils.verify_signature(message, signature, public_pem)
+    return signature, "Подпись верна" if valid else "Подпись неверна"
+
 class KeyGenStage:
     INTRO = 0
     KEY_SIZE = 1
@@ -27,23 +90,51 @@ class KeyGenStage:
     DISPLAY_KEYS = 4
     ENCRYPT_DECRYPT = 5
     COMPLETE = 6
+    LOGIN = 7
 
 class KeyGenerator:
-    def __init__(self, screen, font_small, font_medium, font_large):
+    def __init__(self, screen, fonts, key_pool=None, scheduler=None):
         self.screen = screen
-        self.font_small = font_small
-        self.font_medium = font_medium
-        self.font_large = font_large
+        self.font_small = fonts.small
+        self.font_medium = fonts.medium
+        self.font_large = fonts.large
         self.stage = KeyGenStage.INTRO
         self.key_size = 2048
+        self.algorithm = 'rsa-2048'
         self.private_key = None
         self.public_key = None
+        # Formatted and rendered key and ciphertext text, rebuilt only when they change
+        self.key_view = None
+        self.cipher_view = None
         self.message = "Секретное сообщение"
         self.encrypted = None
         self.decrypted = None
         self.completion_percentage = 0
         self.generation_complete = False
         self.scroll_offset = 0  # Для прокрутки
+        self.frame_signature = None
+        
+        # Background jobs polled by the frame loop
+        self.key_pool = key_pool
+        self.key_job = None
+        self.key_error = None
+        self.crypto_job = None
+        # Generation, signing and verification times of every algorithm, measured once
+        self.timings = measured_timings
+        self.timing_job = None
+        # Live login: steps received from the server thread, how many are shown, load test report
+        self.login_job = None
+        self.load_job = None
+        self.login_queue = queue.SimpleQueue()
+        self.login_steps = []
+        self.login_shown = 0
+        self.login_timer = None
+        self.login_result = None
+        self.load_report = None
+        
+        # Timers of this scene, cancelled together when the student leaves it
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.finish_timer = None
         
         # Generation steps
         self.current_step = 0
@@ -86,36 +177,57 @@ class KeyGenerator:
             }
         ]
         
+        # The steps panel is drawn into one persistent surface, rows are redrawn only when they change
+        self.steps_content_height = len(self.generation_steps) * 150 + 100
+        self.steps_surface = pygame.Surface((SCREEN_WIDTH, self.steps_content_height))
+        if pygame.display.get_surface() is not None:
+            self.steps_surface = self.steps_surface.convert()
+        self.step_rows = []
+        self.steps_footer = None
+        self.steps_panel_changed = True
+        self.drawn_scroll_offset = None
+        self.reset_steps_panel()
+        
         # Create buttons
         button_width = 200
         button_height = 40
         self.buttons = {
             KeyGenStage.INTRO: [
-                Button(300, 400, button_width, button_height, "Начать", GRAY, LIGHT_BLUE, self.start_key_size_selection)
+                Button(300, 400, button_width, button_height, "Начать", GRAY, LIGHT_BLUE, self.start_key_size_selection, fonts)
             ],
             KeyGenStage.KEY_SIZE: [
-                Button(200, 300, button_width, button_height, "1024 бит", GRAY, LIGHT_BLUE, lambda: self.set_key_size(1024)),
-                Button(400, 300, button_width, button_height, "2048 бит", GRAY, LIGHT_BLUE, lambda: self.set_key_size(2048)),
-                Button(300, 400, button_width, button_height, "Сгенерировать", GRAY, LIGHT_BLUE, self.generate_keys)
+                Button(300, 500, button_width, button_height, "Сгенерировать", GRAY, LIGHT_BLUE, self.generate_keys, fonts)
             ],
             KeyGenStage.GENERATING: [
                 Button(300, 500, button_width, button_height, "Начать генерацию", GRAY, LIGHT_BLUE, 
-                      lambda: setattr(self, 'stage', KeyGenStage.GENERATION_STEPS))
+                      lambda: setattr(self, 'stage', KeyGenStage.GENERATION_STEPS), fonts)
             ],
             KeyGenStage.GENERATION_STEPS: [
-                Button(300, 500, button_width, button_height, "Продолжить", GRAY, LIGHT_BLUE, self.show_keys)
+                Button(300, 500, button_width, button_height, "Продолжить", GRAY, LIGHT_BLUE, self.show_keys, fonts)
             ],
             KeyGenStage.DISPLAY_KEYS: [
-                Button(300, 500, button_width, button_height, "Продолжить", GRAY, LIGHT_BLUE, self.show_encryption)
+                Button(300, 500, button_width, button_height, "Продолжить", GRAY, LIGHT_BLUE, self.show_encryption, fonts)
             ],
             KeyGenStage.ENCRYPT_DECRYPT: [
-                Button(300, 500, button_width, button_height, "Завершить", GRAY, LIGHT_BLUE, self.complete)
+                Button(190, 500, button_width, button_height, "Вход на сервер", GRAY, LIGHT_BLUE, self.start_login, fonts),
+                Button(410, 500, button_width, button_height, "Завершить", GRAY, LIGHT_BLUE, self.complete, fonts)
+            ],
+            KeyGenStage.LOGIN: [
+                Button(190, 500, button_width, button_height, "Повторить вход", GRAY, LIGHT_BLUE, self.start_login, fonts),
+                Button(410, 500, button_width, button_height, "Завершить", GRAY, LIGHT_BLUE, self.complete, fonts)
             ],
             KeyGenStage.COMPLETE: [
-                Button(300, 500, button_width, button_height, "В главное меню", GRAY, LIGHT_BLUE, None)
+                Button(300, 500, button_width, button_height, "В главное меню", GRAY, LIGHT_BLUE, None, fonts)
             ]
         }
         
+        self.algorithm_buttons = {}
+        for algorithm, label, x, y in ALGORITHM_CHOICES:
+            button = Button(x, y, 170, button_height, label, GRAY, LIGHT_BLUE,
+                            lambda algorithm=algorithm: self.set_algorithm(algorithm), fonts)
+            self.algorithm_buttons[algorithm] = button
+            self.buttons[KeyGenStage.KEY_SIZE].insert(-1, button)
+        
         # Messages for each stage
         self.stage_messages = {
             KeyGenStage.INTRO: [
@@ -124,9 +236,8 @@ class KeyGenerator:
                 "с использованием асимметричной криптографии RSA."
             ],
             KeyGenStage.KEY_SIZE: [
-                "Выберите размер ключа:",
-                "1024 бит - быстрее, но менее безопасный",
-                "2048 бит - стандартный выбор, хороший баланс скорости и безопасности"
+                "Выберите алгоритм и размер ключа:",
+                "RSA - классический выбор, Ed25519 и ECDSA - эллиптические кривые"
             ],
             KeyGenStage.GENERATING: [
                 "Подготовка к генерации ключевой пары RSA...",
@@ -149,23 +260,70 @@ class KeyGenerator:
                 "Теперь вы понимаете основной принцип работы асимметричной криптографии."
             ]
         }
+        # Ed25519 and ECDSA keys only sign, the last stage shows a signature instead of encryption
+        self.signature_messages = [
+            "Давайте проверим, как работает подпись с нашими ключами:",
+            "Сообщение для подписи:",
+            "Подпись (создана приватным ключом):",
+            "Проверка подписи (публичным ключом):"
+        ]
     
     def start_key_size_selection(self):
         self.stage = KeyGenStage.KEY_SIZE
     
     def set_key_size(self, size):
-        self.key_size = size
+        self.set_algorithm(f"rsa-{size}")
+    
+    def set_algorithm(self, algorithm):
+        self.algorithm = algorithm
+        if self.is_rsa():
+            self.key_size = int(algorithm.split('-')[1])
+    
+    def is_rsa(self):
+        return self.algorithm.startswith('rsa')
     
     def generate_keys(self):
+        self.key_error = None
+        if not self.is_rsa():
+            self.generate_curve_keys()
+            return
         self.stage = KeyGenStage.GENERATING
         self.generation_complete = False
         self.completion_percentage = 0
         self.current_step = 0
         self.scroll_offset = 0
+        self.public_key = None
+        self.private_key = None
+        self.key_view = None
+        self.scheduler.cancel_owner(self)
+        self.finish_timer = None
         # Reset all steps
         for step in self.generation_steps:
             step["progress"] = 0
             step["details"] = ""
+        self.reset_steps_panel()
+        
+        # Start the real key generation right away, it runs while the steps are animated
+        if self.key_job is not None:
+            self.key_job.cancel()
+        self.key_job = self.request_keys()
+    
+    def generate_curve_keys(self):
+        # Elliptic curve keys take well under a millisecond, there are no steps to animate
+        self.stage = KeyGenStage.DISPLAY_KEYS
+        self.public_key = None
+        self.private_key = None
+        self.key_view = None
+        workers.cancel_all([self.key_job])
+        self.key_job = workers.submit(ssh_utils.generate_key_pair, self.algorithm)
+    
+    def request_keys(self):
+        # Pre-generated pairs from the pool are handed out instantly
+        if self.key_pool is not None:
+            return self.key_pool.request(self.key_size)
+        # rsa is pure Python and would hold the GIL next to the frame loop
+        import rsa
+        return workers.submit_process(rsa.newkeys, self.key_size)
     
     def simulate_generation_step(self):
         if self.current_step < len(self.generation_steps):
@@ -210,27 +368,153 @@ class KeyGenerator:
         else:
             # All steps completed, generate actual keys
             if not self.generation_complete:
-                (self.public_key, self.private_key) = rsa.newkeys(self.key_size)
-                self.generation_complete = True
-                pygame.time.set_timer(pygame.USEREVENT, 1000)  # 1 second delay
+                if self.public_key is None:
+                    if self.key_job is None:
+                        self.key_job = self.request_keys()
+                    if not self.key_job.done():
+                        return False
+                    try:
+                        self.set_keys(*self.key_job.result())
+                    except Exception as e:
+                        self.key_generation_failed(e)
+                        return False
+                    self.key_job = None
+                # Keep the "finishing" message for a moment before the summary
+                if self.finish_timer is None or self.finish_timer.cancelled:
+                    self.finish_timer = self.scheduler.call_later(FINISH_DELAY, self.finish_generation, owner=self)
+                return False
             return True
     
+    def set_keys(self, public_key, private_key):
+        """
+        Store a generated key pair and format it for display once.
+        
+        Args:
+            public_key: rsa.PublicKey, or PEM string for elliptic curve keys
+            private_key: rsa.PrivateKey, or PEM string for elliptic curve keys
+        """
+        self.public_key = public_key
+        self.private_key = private_key
+        if self.is_rsa():
+            self.key_view = KeyView.for_rsa(self.font_small, public_key, private_key)
+        else:
+            self.key_view = KeyView.for_pem(self.font_small, private_key,
+                                            ssh_utils.format_public_key_openssh(public_key))
+    
+    def set_crypto_result(self, encrypted, decrypted):
+        self.encrypted = encrypted
+        self.decrypted = decrypted
+        self.cipher_view = CipherView(self.font_small, encrypted, decrypted)
+    
+    def key_generation_failed(self, error):
+        # Back to the key size screen, the error is shown above the button that retries
+        print(f"Key generation error: {error}")
+        self.key_error = f"Не удалось сгенерировать ключи: {error}"
+        self.key_job = None
+        self.public_key = None
+        self.private_key = None
+        self.key_view = None
+        self.scheduler.cancel_owner(self)
+        self.finish_timer = None
+        self.stage = KeyGenStage.KEY_SIZE
+    
+    def finish_generation(self):
+        self.generation_complete = True
+    
     def show_keys(self):
-        self.stage = KeyGenStage.DISPLAY_KEYS
+        if self.generation_complete:
+            self.stage = KeyGenStage.DISPLAY_KEYS
     
-    def handle_event(self, event):
-        if event.type == USEREVENT:
-            # Timer event for key generation completion
-            pygame.time.set_timer(pygame.USEREVENT, 0)  # Cancel the timer
-            self.stage = KeyGenStage.GENERATION_STEPS
+    def fixed_update(self, dt):
+        # Progress bars advance once per simulation step, independent of the frame rate
+        if self.stage == KeyGenStage.GENERATION_STEPS:
+            self.simulate_generation_step()
+    
+    def update(self):
+        global measured_timings
+        # Poll the timing and key jobs of the elliptic curve algorithms
+        if self.timing_job is not None and self.timing_job.done():
+            try:
+                self.timings = measured_timings = self.timing_job.result()
+            except Exception as e:
+                print(f"Timing error: {e}")
+                self.timings = {}
+            self.timing_job = None
+        if self.stage == KeyGenStage.KEY_SIZE and self.timings is None and self.timing_job is None:
+            self.timing_job = workers.submit(ssh_utils.measure_key_algorithms, tuple(ALGORITHM_LABELS))
         
+        if not self.is_rsa() and self.key_job is not None and self.key_job.done():
+            try:
+                private_pem, public_pem = self.key_job.result()
+                self.set_keys(public_pem, private_pem)
+                self.key_job = None
+            except Exception as e:
+                self.key_generation_failed(e)
+        if (self.stage == KeyGenStage.DISPLAY_KEYS and not self.is_rsa()
+                and self.public_key is None and self.key_job is None):
+            self.generate_curve_keys()
+        
+        # Poll the encryption job without blocking the frame loop
+        if self.crypto_job is not None and self.crypto_job.done():
+            try:
+                self.set_crypto_result(*self.crypto_job.result())
+            except Exception as e:
+                print(f"Encryption error: {e}")
+                # Fallback message if encryption fails
+                self.set_crypto_result(b"Error: Could not encrypt", "Error: Could not decrypt")
+            self.crypto_job = None
+        
+        # The job was cancelled when the student left the scene, restart it
+        if (self.stage == KeyGenStage.ENCRYPT_DECRYPT and self.encrypted is None
+                and self.crypto_job is None):
+            self.show_encryption()
+        
+        if self.stage == KeyGenStage.LOGIN:
+            self.update_login()
+    
+    def is_animating(self):
+        # Progress bars move and background jobs have to be polled
+        if self.stage == KeyGenStage.GENERATION_STEPS and not self.generation_complete:
+            return True
+        return any(job is not None for job in
+                   (self.key_job, self.crypto_job, self.timing_job, self.login_job, self.load_job))
+    
+    def dirty_rects(self):
+        """
+        Regions changed by the last draw(), None when the whole screen changed.
+        """
+        signature = (self.stage, self.algorithm, self.generation_complete, self.encrypted is None,
+                     self.public_key is None, self.timings is None, self.key_error, self.login_shown,
+                     self.login_result is None, self.load_report is None)
+        if signature != self.frame_signature:
+            self.frame_signature = signature
+            return None
+        # Inside a stage only button hover and the steps panel can change
+        rects = [button.rect for button in self.buttons.get(self.stage, [])]
+        if self.stage == KeyGenStage.GENERATION_STEPS and self.steps_panel_changed:
+            rects.append(STEPS_VIEW)
+        self.steps_panel_changed = False
+        return rects
+    
+    def on_exit(self):
+        self.cancel_jobs()
+    
+    def cancel_jobs(self):
+        # Called when the student leaves the interactive module
+        workers.cancel_all([self.key_job, self.crypto_job, self.timing_job, self.login_job, self.load_job])
+        self.key_job = None
+        self.crypto_job = None
+        self.timing_job = None
+        self.login_job = None
+        self.load_job = None
+        self.scheduler.cancel_owner(self)
+    
+    def handle_event(self, event):
         # Handle mouse wheel for scrolling
         if event.type == pygame.MOUSEWHEEL and self.stage == KeyGenStage.GENERATION_STEPS:
             self.scroll_offset -= event.y * 20  # Negative for natural scrolling
             # Calculate max scroll offset
-            content_height = len(self.generation_steps) * 150 + 100
-            visible_height = SCREEN_HEIGHT - 180
-            max_offset = max(0, content_height - visible_height)
+            max_offset = max(0, self.steps_content_height - STEPS_VIEW.height)
             self.scroll_offset = max(0, min(self.scroll_offset, max_offset))
         
         mouse_pos = pygame.mouse.get_pos()
@@ -247,34 +531,217 @@ class KeyGenerator:
     
     def show_encryption(self):
         # Encrypt and decrypt a sample message
+        # The result is picked up in update() once the worker is done
         if self.private_key and self.public_key:
-            try:
-                # RSA encryption requires message to be encoded to bytes
-                message_bytes = self.message.encode('utf-8')
-                
-                # Encrypt with public key
-                self.encrypted = rsa.encrypt(message_bytes, self.public_key)
-                
-                # Decrypt with private key
-                decrypted_bytes = rsa.decrypt(self.encrypted, self.private_key)
-                self.decrypted = decrypted_bytes.decode('utf-8')
-                
-                self.stage = KeyGenStage.ENCRYPT_DECRYPT
-            except Exception as e:
-                print(f"Encryption error: {e}")
-                # Fallback message if encryption fails
-                self.encrypted = b"Error: Message too long for key size"
-                self.decrypted = "Error: Could not decrypt"
-                self.stage = KeyGenStage.ENCRYPT_DECRYPT
+            if self.crypto_job is not None:
+                self.crypto_job.cancel()
+            self.encrypted = None
+            self.decrypted = None
+            self.cipher_view = None
+            if self.is_rsa():
+                self.crypto_job = workers.submit(encrypt_decrypt, self.message, self.public_key, self.private_key)
+            else:
+                self.crypto_job = workers.submit(sign_verify, self.message, self.private_key, self.public_key)
+            self.stage = KeyGenStage.ENCRYPT_DECRYPT
     
     def complete(self):
         self.stage = KeyGenStage.COMPLETE
     
+    def start_login(self):
+        # Log in to a local server with the generated key, the steps arrive through the queue
+        if not (self.private_key and self.public_key):
+            return
+        workers.cancel_all([self.login_job, self.load_job])
+        self.stage = KeyGenStage.LOGIN
+        self.login_queue = queue.SimpleQueue()
+        self.login_steps = []
+        self.login_shown = 0
+        self.login_result = None
+        self.load_report = None
+        self.load_job = None
+        if self.login_timer is not None:
+            self.login_timer.cancel()
+        private_pem = self.private_key.save_pkcs1().decode('ascii') if self.is_rsa() else self.private_key
+        self.login_job = workers.submit(auth_server.live_login, LOGIN_USER, private_pem,
+                                        lambda *step: self.login_queue.put(step))
+    
+    def update_login(self):
+        while True:
+            try:
+                self.login_steps.append(self.login_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if self.login_job is not None and self.login_job.done():
+            try:
+                self.login_result = self.login_job.result()
+            except Exception as e:
+                print(f"Login error: {e}")
+                self.login_result = e
+            self.login_job = None
+        
+        # The load test starts after the live login, so it does not slow the login down
+        if self.login_result is not None and self.load_job is None and self.load_report is None:
+            self.load_job = workers.submit_process(auth_server.load_test, LOAD_TEST_STUDENTS, self.algorithm)
+        if self.load_job is not None and self.load_job.done():
+            try:
+                self.load_report = self.load_job.result()
+            except Exception as e:
+                print(f"Load test error: {e}")
+                self.load_report = {}
+            self.load_job = None
+        
+        # Left the scene in the middle of the login, start over
+        if self.login_job is None and self.login_result is None:
+            self.start_login()
+            return
+        
+        if self.login_shown < len(self.login_steps) and (self.login_timer is None or self.login_timer.cancelled):
+            self.login_timer = self.scheduler.call_later(LOGIN_STEP_DELAY, self.reveal_login_step, owner=self)
+    
+    def reveal_login_step(self):
+        self.login_timer = None
+        self.login_shown = min(self.login_shown + 1, len(self.login_steps))
+    
+    def reset_steps_panel(self):
+        self.steps_surface.fill(WHITE)
+        text = render_text(self.font_medium, "Процесс генерации RSA ключей", True, PURPLE)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, 20))
+        self.steps_surface.blit(text, text_rect)
+        # Signature of every drawn row, a row is redrawn when its signature changes
+        self.step_rows = [None] * len(self.generation_steps)
+        self.steps_footer = None
+        self.steps_panel_changed = True
+    
+    @staticmethod
+    def step_row_rect(signature):
+        y_offset, _, _, details = signature
+        return pygame.Rect(0, y_offset, SCREEN_WIDTH, 95 + (25 if details else 0))
+    
+    def steps_footer_rect(self, signature):
+        y_offset = signature[0]
+        return pygame.Rect(0, y_offset, SCREEN_WIDTH, self.steps_content_height - y_offset)
+    
+    def update_steps_panel(self):
+        """
+        Redraw the rows of the steps panel whose progress, color or position changed.
+        """
+        changed = []
+        y_offset = STEPS_TOP
+        for i, step in enumerate(self.generation_steps):
+            # Future steps are not shown
+            signature = None
+            if i <= self.current_step or step["progress"] != 0:
+                color = BLUE if i == self.current_step else (GREEN if step["progress"] == 100 else BLACK)
+                signature = (y_offset, color, step["progress"], step["details"])
+                y_offset += 95 + (25 if step["details"] else 0)
+            if signature != self.step_rows[i]:
+                changed.append((i, signature))
+        
+        footer = None
+        if self.current_step >= len(self.generation_steps):
+            footer = (y_offset, self.generation_complete)
+        footer_changed = footer != self.steps_footer
+        if not changed and not footer_changed:
+            return
+        
+        # Clear every changed row at its old and new place first, rows may have moved
+        for i, signature in changed:
+            for rect_signature in (self.step_rows[i], signature):
+                if rect_signature is not None:
+                    self.steps_surface.fill(WHITE, self.step_row_rect(rect_signature))
+        if footer_changed:
+            for rect_signature in (self.steps_footer, footer):
+                if rect_signature is not None:
+                    self.steps_surface.fill(WHITE, self.steps_footer_rect(rect_signature))
+        
+        for i, signature in changed:
+            self.step_rows[i] = signature
+            if signature is not None:
+                self.draw_step_row(self.generation_steps[i], signature)
+        if footer_changed:
+            self.steps_footer = footer
+            if footer is not None:
+                self.draw_steps_footer(*footer)
+        self.steps_panel_changed = True
+    
+    def draw_step_row(self, step, signature):
+        content_surface = self.steps_surface
+        y_offset, color, progress, details = signature
+        
+        # Step title
+        text = render_text(self.font_small, step["title"], True, color)
+        text_rect = text.get_rect(midleft=(50, y_offset + 20))
+        content_surface.blit(text, text_rect)
+        y_offset += 30
+        
+        # Step description
+        text = render_text(self.font_small, step["description"], True, BLACK)
+        text_rect = text.get_rect(midleft=(70, y_offset + 20))
+        content_surface.blit(text, text_rect)
+        y_offset += 25
+        
+        # Step details if available
+        if details:
+            text = render_text(self.font_small, details, True, BLUE)
+            text_rect = text.get_rect(midleft=(70, y_offset + 20))
+            content_surface.blit(text, text_rect)
+            y_offset += 25
+        
+        # Progress bar
+        if progress > 0:
+            bar_width = 600
+            bar_height = 15
+            bar_x = 70
+            
+            # Background
+            pygame.draw.rect(content_surface, GRAY, (bar_x, y_offset + 20, bar_width, bar_height))
+            # Filled
+            fill_width = int(bar_width * (progress / 100))
+            pygame.draw.rect(content_surface, GREEN, (bar_x, y_offset + 20, fill_width, bar_height))
+            # Border
+            pygame.draw.rect(content_surface, BLACK, (bar_x, y_offset + 20, bar_width, bar_height), 1)
+            # Percentage
+            text = render_text(self.font_small, f"{progress}%", True, BLACK)
+            text_rect = text.get_rect(midleft=(bar_x + bar_width + 10, y_offset + 20 + bar_height//2))
+            content_surface.blit(text, text_rect)
+    
+    def draw_steps_footer(self, y_offset, generation_complete):
+        content_surface = self.steps_surface
+        y_offset += 20
+        
+        # Steps are animated but the worker is still generating the keys
+        if not generation_complete:
+            text = render_text(self.font_small, "Завершаем генерацию ключей...", True, BLUE)
+            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset + 20))
+            content_surface.blit(text, text_rect)
+            return
+        
+        # Add some educational explanation if all steps complete
+        text = render_text(self.font_small, "Все этапы генерации ключей завершены!", True, GREEN)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset + 20))
+        content_surface.blit(text, text_rect)
+        y_offset += 30
+        
+        text = render_text(self.font_small, "Теперь у нас есть:", True, BLACK)
+        text_rect = text.get_rect(midleft=(50, y_offset + 20))
+        content_surface.blit(text, text_rect)
+        y_offset += 25
+        
+        text = render_text(self.font_small, "- Публичный ключ (e, n) - можно свободно распространять", True, BLUE)
+        text_rect = text.get_rect(midleft=(70, y_offset + 20))
+        content_surface.blit(text, text_rect)
+        y_offset += 25
+        
+        text = render_text(self.font_small, "- Приватный ключ (d, n) - должен храниться в секрете", True, RED)
+        text_rect = text.get_rect(midleft=(70, y_offset + 20))
+        content_surface.blit(text, text_rect)
+    
     def draw(self):
         self.screen.fill(WHITE)
         
         # Draw title
-        title = self.font_large.render("Генератор RSA-ключей с объяснением", True, BLACK)
+        title = render_text(self.font_large, "Генератор SSH-ключей с объяснением", True, BLACK)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 40))
         self.screen.blit(title, title_rect)
         
@@ -282,7 +749,7 @@ class KeyGenerator:
         if self.stage == KeyGenStage.INTRO:
             y_offset = 150
             for line in self.stage_messages[self.stage]:
-                text = self.font_medium.render(line, True, BLACK)
+                text = render_text(self.font_medium, line, True, BLACK)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 40
@@ -290,25 +757,27 @@ class KeyGenerator:
         elif self.stage == KeyGenStage.KEY_SIZE:
             y_offset = 150
             for line in self.stage_messages[self.stage]:
-                text = self.font_medium.render(line, True, BLACK)
+                text = render_text(self.font_medium, line, True, BLACK)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 40
             
-            # Highlight selected key size
+            # Highlight selected algorithm
             for button in self.buttons[self.stage]:
-                if "1024" in button.text and self.key_size == 1024:
-                    button.color = LIGHT_BLUE
-                elif "2048" in button.text and self.key_size == 2048:
-                    button.color = LIGHT_BLUE
-                else:
-                    button.color = GRAY
+                button.color = LIGHT_BLUE if button is self.algorithm_buttons.get(self.algorithm) else GRAY
+            
+            self.draw_timings()
+            
+            if self.key_error:
+                text = render_text(self.font_small, self.key_error, True, RED)
+                text_rect = text.get_rect(center=(SCREEN_WIDTH//2, KEY_ERROR_Y))
+                self.screen.blit(text, text_rect)
                 
         elif self.stage == KeyGenStage.GENERATING:
             y_offset = 100
             
             # Title
-            text = self.font_medium.render("Подготовка к генерации RSA ключей", True, PURPLE)
+            text = render_text(self.font_medium, "Подготовка к генерации RSA ключей", True, PURPLE)
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 50
@@ -321,7 +790,7 @@ class KeyGenerator:
             ]
             
             for line in explanation:
-                text = self.font_small.render(line, True, BLACK)
+                text = render_text(self.font_small, line, True, BLACK)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 30
@@ -330,130 +799,50 @@ class KeyGenerator:
             y_offset += 20
             for i, step in enumerate(self.generation_steps):
                 color = LIGHT_BLUE if i == 0 else GRAY
-                text = self.font_small.render(step["title"], True, color)
+                text = render_text(self.font_small, step["title"], True, color)
                 text_rect = text.get_rect(midleft=(150, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 25
             
         elif self.stage == KeyGenStage.GENERATION_STEPS:
-            # Simulate generation
-            self.simulate_generation_step()
-            
-            # Create a surface for scrollable content
-            content_height = len(self.generation_steps) * 150 + 100
-            content_surface = pygame.Surface((SCREEN_WIDTH, content_height))
-            content_surface.fill(WHITE)
+            self.update_steps_panel()
             
-            y_offset = 0
-            
-            # Title on content surface
-            text = self.font_medium.render("Процесс генерации RSA ключей", True, PURPLE)
-            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset + 20))
-            content_surface.blit(text, text_rect)
-            y_offset += 50
-            
-            # Draw each step with scroll offset
-            for i, step in enumerate(self.generation_steps):
-                # Skip future steps
-                if i > self.current_step and step["progress"] == 0:
-                    continue
-                
-                # Step title
-                color = BLUE if i == self.current_step else (GREEN if step["progress"] == 100 else BLACK)
-                text = self.font_small.render(step["title"], True, color)
-                text_rect = text.get_rect(midleft=(50, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 30
-                
-                # Step description
-                text = self.font_small.render(step["description"], True, BLACK)
-                text_rect = text.get_rect(midleft=(70, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 25
-                
-                # Step details if available
-                if step["details"]:
-                    text = self.font_small.render(step["details"], True, BLUE)
-                    text_rect = text.get_rect(midleft=(70, y_offset + 20))
-                    content_surface.blit(text, text_rect)
-                    y_offset += 25
-                
-                # Progress bar
-                if step["progress"] > 0:
-                    bar_width = 600
-                    bar_height = 15
-                    bar_x = 70
-                    
-                    # Background
-                    pygame.draw.rect(content_surface, GRAY, (bar_x, y_offset + 20, bar_width, bar_height))
-                    # Filled
-                    fill_width = int(bar_width * (step["progress"] / 100))
-                    pygame.draw.rect(content_surface, GREEN, (bar_x, y_offset + 20, fill_width, bar_height))
-                    # Border
-                    pygame.draw.rect(content_surface, BLACK, (bar_x, y_offset + 20, bar_width, bar_height), 1)
-                    # Percentage
-                    text = self.font_small.render(f"{step['progress']}%", True, BLACK)
-                    text_rect = text.get_rect(midleft=(bar_x + bar_width + 10, y_offset + 20 + bar_height//2))
-                    content_surface.blit(text, text_rect)
-                
-                y_offset += 40
-            
-            # Add some educational explanation if all steps complete
-            if self.current_step >= len(self.generation_steps):
-                y_offset += 20
-                text = self.font_small.render("Все этапы генерации ключей завершены!", True, GREEN)
-                text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 30
-                
-                text = self.font_small.render("Теперь у нас есть:", True, BLACK)
-                text_rect = text.get_rect(midleft=(50, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 25
-                
-                text = self.font_small.render("- Публичный ключ (e, n) - можно свободно распространять", True, BLUE)
-                text_rect = text.get_rect(midleft=(70, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 25
-                
-                text = self.font_small.render("- Приватный ключ (d, n) - должен храниться в секрете", True, RED)
-                text_rect = text.get_rect(midleft=(70, y_offset + 20))
-                content_surface.blit(text, text_rect)
-                y_offset += 40
-            
-            # Draw the scrollable content with clipping
-            visible_area = pygame.Rect(0, 80, SCREEN_WIDTH, SCREEN_HEIGHT - 180)
-            self.screen.set_clip(visible_area)
-            self.screen.blit(content_surface, (0, -self.scroll_offset + 80))
-            self.screen.set_clip(None)
+            # Scrolling only moves the visible window over the persistent panel
+            visible_area = STEPS_VIEW
+            self.screen.blit(self.steps_surface, visible_area,
+                             (0, self.scroll_offset, visible_area.width, visible_area.height))
+            if self.scroll_offset != self.drawn_scroll_offset:
+                self.drawn_scroll_offset = self.scroll_offset
+                self.steps_panel_changed = True
             
             # Draw scroll indicator if needed
+            content_height = self.steps_content_height
             if content_height > visible_area.height:
                 scroll_ratio = visible_area.height / content_height
                 scroll_pos = (self.scroll_offset / content_height) * visible_area.height
                 scroll_bar_height = scroll_ratio * visible_area.height
                 pygame.draw.rect(self.screen, GRAY, (SCREEN_WIDTH - 10, 80 + scroll_pos, 5, scroll_bar_height))
             
+        elif self.stage == KeyGenStage.DISPLAY_KEYS and (not self.is_rsa() or self.key_view is None):
+            self.draw_curve_keys()
+            
         elif self.stage == KeyGenStage.DISPLAY_KEYS:
             y_offset = 120
             
             # Title and instructions
-            text = self.font_medium.render(self.stage_messages[self.stage][0], True, BLACK)
+            text = render_text(self.font_medium, self.stage_messages[self.stage][0], True, BLACK)
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 40
             
             # Private key label
-            text = self.font_small.render(self.stage_messages[self.stage][1], True, BLACK)
+            text = render_text(self.font_small, self.stage_messages[self.stage][1], True, BLACK)
             text_rect = text.get_rect(midleft=(50, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 30
             
             # Private key display (first few lines)
-            private_key_str = f"n={hex(self.private_key.n)[:50]}...\nd={hex(self.private_key.d)[:50]}..."
-            private_key_lines = private_key_str.split('\n')[:3]
-            for line in private_key_lines:
-                text = self.font_small.render(line, True, RED)
+            for text in self.key_view.private_surfaces:
                 text_rect = text.get_rect(midleft=(70, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 20
@@ -461,64 +850,63 @@ class KeyGenerator:
             y_offset += 30
             
             # Public key label
-            text = self.font_small.render(self.stage_messages[self.stage][2], True, BLACK)
+            text = render_text(self.font_small, self.stage_messages[self.stage][2], True, BLACK)
             text_rect = text.get_rect(midleft=(50, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 30
             
             # Public key display (first few lines)
-            public_key_str = f"n={hex(self.public_key.n)[:50]}...\ne={hex(self.public_key.e)}"
-            public_key_lines = public_key_str.split('\n')[:3]
-            for line in public_key_lines:
-                text = self.font_small.render(line, True, BLUE)
+            for text in self.key_view.public_surfaces:
                 text_rect = text.get_rect(midleft=(70, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 20
             
         elif self.stage == KeyGenStage.ENCRYPT_DECRYPT:
             y_offset = 120
+            messages = self.stage_messages[self.stage] if self.is_rsa() else self.signature_messages
             
             # Title
-            text = self.font_medium.render(self.stage_messages[self.stage][0], True, BLACK)
+            text = render_text(self.font_medium, messages[0], True, BLACK)
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 50
             
             # Original message
-            text = self.font_small.render(self.stage_messages[self.stage][1], True, BLACK)
+            text = render_text(self.font_small, messages[1], True, BLACK)
             text_rect = text.get_rect(midleft=(50, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 30
             
-            text = self.font_small.render(self.message, True, BLACK)
+            text = render_text(self.font_small, self.message, True, BLACK)
             text_rect = text.get_rect(midleft=(70, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 50
             
             # Encrypted message
-            text = self.font_small.render(self.stage_messages[self.stage][2], True, BLACK)
+            text = render_text(self.font_small, messages[2], True, BLACK)
             text_rect = text.get_rect(midleft=(50, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 30
             
             # Display part of the encrypted message as hex
-            if isinstance(self.encrypted, bytes):
-                encrypted_hex = binascii.hexlify(self.encrypted).decode('utf-8')
+            if self.cipher_view is None:
+                text = render_text(self.font_small, "Шифрование...", True, BLUE)
             else:
-                encrypted_hex = str(self.encrypted)
-                
-            text = self.font_small.render(encrypted_hex[:50] + "...", True, BLUE)
+                text = self.cipher_view.encrypted_surface
             text_rect = text.get_rect(midleft=(70, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 50
             
             # Decrypted message
-            text = self.font_small.render(self.stage_messages[self.stage][3], True, BLACK)
+            text = render_text(self.font_small, messages[3], True, BLACK)
             text_rect = text.get_rect(midleft=(50, y_offset))
             self.screen.blit(text, text_rect)
             y_offset += 30
             
-            text = self.font_small.render(self.decrypted, True, GREEN)
+            if self.cipher_view is None:
+                text = render_text(self.font_small, "Расшифровка...", True, GREEN)
+            else:
+                text = self.cipher_view.decrypted_surface
             text_rect = text.get_rect(midleft=(70, y_offset))
             self.screen.blit(text, text_rect)
             
@@ -530,17 +918,27 @@ class KeyGenerator:
                 "2. Приватный ключ (d,n) расшифровывает: m = c^d mod n",
                 "3. Без знания d расшифровать сообщение крайне сложно"
             ]
+            if not self.is_rsa():
+                explanation = [
+                    "Как это работает:",
+                    "1. Приватный ключ подписывает сообщение при входе на сервер",
+                    "2. Сервер проверяет подпись публичным ключом из authorized_keys",
+                    "3. Без приватного ключа подделать подпись крайне сложно"
+                ]
             
             for line in explanation:
-                text = self.font_small.render(line, True, PURPLE)
+                text = render_text(self.font_small, line, True, PURPLE)
                 text_rect = text.get_rect(midleft=(50, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 25
             
+        elif self.stage == KeyGenStage.LOGIN:
+            self.draw_login()
+            
         elif self.stage == KeyGenStage.COMPLETE:
             y_offset = 150
             for line in self.stage_messages[self.stage]:
-                text = self.font_small.render(line, True, BLACK)
+                text = render_text(self.font_small, line, True, BLACK)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 35
@@ -550,9 +948,195 @@ class KeyGenerator:
             for button in self.buttons[self.stage]:
                 button.draw(self.screen)
 
+    def draw_timings(self):
+        # Measured once in the background, so the numbers come from this machine
+        y_offset = TIMINGS_TOP
+        if self.timings is None:
+            text = render_text(self.font_small, "Измеряем скорость алгоритмов...", True, GRAY)
+            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
+            self.screen.blit(text, text_rect)
+            return
+        
+        columns = (150, 330, 470, 610)
+        header = ("Алгоритм", "Генерация", "Подпись", "Проверка")
+        for x, label in zip(columns, header):
+            text = render_text(self.font_small, label, True, PURPLE)
+            self.screen.blit(text, text.get_rect(midleft=(x, y_offset)))
+        y_offset += 25
+        
+        for algorithm, label in ALGORITHM_LABELS.items():
+            timing = self.timings.get(algorithm)
+            if timing is None:
+                continue
+            color = BLUE if algorithm == self.algorithm else BLACK
+            row = (label, f"{timing['generate_ms']:.2f} мс", f"{timing['sign_ms']:.3f} мс",
+                   f"{timing['verify_ms']:.3f} мс")
+            for x, value in zip(columns, row):
+                text = render_text(self.font_small, value, True, color)
+                self.screen.blit(text, text.get_rect(midleft=(x, y_offset)))
+            y_offset += 22
+    
+    def draw_curve_keys(self):
+        label = ALGORITHM_LABELS[self.algorithm]
+        y_offset = 120
+        
+        if self.key_view is None:
+            text = render_text(self.font_medium, f"Генерация ключей {label}...", True, BLACK)
+            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
+            self.screen.blit(text, text_rect)
+            return
+        
+        text = render_text(self.font_medium, f"Ваша ключевая пара {label} сгенерирована!", True, BLACK)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
+        self.screen.blit(text, text_rect)
+        y_offset += 40
+        
+        text = render_text(self.font_small, self.stage_messages[self.stage][1], True, BLACK)
+        text_rect = text.get_rect(midleft=(50, y_offset))
+        self.screen.blit(text, text_rect)
+        y_offset += 30
+        
+        for text in self.key_view.private_surfaces:
+            text_rect = text.get_rect(midleft=(70, y_offset))
+            self.screen.blit(text, text_rect)
+            y_offset += 20
+        y_offset += 30
+        
+        text = render_text(self.font_small, "Публичный ключ в формате OpenSSH (authorized_keys):", True, BLACK)
+        text_rect = text.get_rect(midleft=(50, y_offset))
+        self.screen.blit(text, text_rect)
+        y_offset += 30
+        
+        for text in self.key_view.public_surfaces:
+            text_rect = text.get_rect(midleft=(70, y_offset))
+            self.screen.blit(text, text_rect)
+            y_offset += 20
+        y_offset += 30
+        
+        # Measured times next to RSA 2048
+        if self.timings:
+            for algorithm in (self.algorithm, 'rsa-2048'):
+                timing = self.timings[algorithm]
+                line = (f"{ALGORITHM_LABELS[algorithm]}: генерация {timing['generate_ms']:.2f} мс, "
+                        f"подпись {timing['sign_ms']:.3f} мс, проверка {timing['verify_ms']:.3f} мс")
+                text = render_text(self.font_small, line, True, PURPLE)
+                text_rect = text.get_rect(midleft=(50, y_offset))
+                self.screen.blit(text, text_rect)
+                y_offset += 25
+
+    def draw_login(self):
+        text = render_text(self.font_medium, "Вход на сервер по ключу (симуляция SSH)", True, BLACK)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, 95))
+        self.screen.blit(text, text_rect)
+        
+        # Client and server with their lifelines, messages go between them
+        for x, label in ((CLIENT_X, "Клиент (студент)"), (SERVER_X, "Сервер")):
+            text = render_text(self.font_small, label, True, PURPLE)
+            text_rect = text.get_rect(center=(x, 135))
+            self.screen.blit(text, text_rect)
+            pygame.draw.line(self.screen, GRAY, (x, 150), (x, 440), 2)
+        
+        y_offset = LOGIN_TOP
+        for source, kind, detail in self.login_steps[:self.login_shown]:
+            place, caption = LOGIN_STEP_TEXT.get(kind, ('server', kind))
+            caption = caption.format(detail=detail)
+            if place in ('to_client', 'to_server'):
+                start, end = (SERVER_X, CLIENT_X) if place == 'to_client' else (CLIENT_X, SERVER_X)
+                color = RED if kind == 'rejected' else BLUE
+                pygame.draw.line(self.screen, color, (start, y_offset + 8), (end, y_offset + 8), 2)
+                head = 10 if start > end else -10
+                pygame.draw.polygon(self.screen, color, [(end, y_offset + 8), (end + head, y_offset + 3),
+                                                         (end + head, y_offset + 13)])
+                text = render_text(self.font_small, caption, True, BLACK)
+                text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset - 4))
+            else:
+                # Work done on one side, written next to its lifeline
+                text = render_text(self.font_small, caption, True, GREEN if kind == 'done' else PURPLE)
+                if place == 'server':
+                    text_rect = text.get_rect(midright=(SERVER_X - 10, y_offset + 4))
+                else:
+                    text_rect = text.get_rect(midleft=(CLIENT_X + 10, y_offset + 4))
+            self.screen.blit(text, text_rect)
+            y_offset += LOGIN_ROW
+        
+        # Many students at once, measured after the live login
+        if self.login_shown < len(self.login_steps) or self.login_result is None:
+            return
+        if isinstance(self.login_result, Exception):
+            text = render_text(self.font_small, f"Ошибка входа: {self.login_result}", True, RED)
+            text_rect = text.get_rect(center=(SCREEN_WIDTH//2, 440))
+            self.screen.blit(text, text_rect)
+        if self.load_report is None:
+            line = f"Нагрузочный тест: {LOAD_TEST_STUDENTS} студентов входят одновременно..."
+        elif self.load_report.get('count'):
+            report = self.load_report
+            line = (f"{report['count']} входов одновременно: {report['handshakes_per_s']:.0f} входов/с, "
+                    f"p50 {report['p50_ms']:.1f} мс, p99 {report['p99_ms']:.1f} мс")
+        else:
+            line = "Нагрузочный тест не удался"
+        text = render_text(self.font_small, line, True, BLACK)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH//2, 465))
+        self.screen.blit(text, text_rect)
+
+class KeyView:
+    def __init__(self, font, private_lines, public_lines):
+        """
+        Key text of the DISPLAY_KEYS stage, formatted and rendered once per
+        key pair, so drawing a frame does no big-integer or PEM formatting.
+        
+        Args:
+            font: Font the lines are rendered with
+            private_lines (list): Lines shown for the private key
+            public_lines (list): Lines shown for the public key
+        """
+        self.private_lines = private_lines
+        self.public_lines = public_lines
+        self.private_surfaces = [render_text(font, line, True, RED) for line in private_lines]
+        self.public_surfaces = [render_text(font, line, True, BLUE) for line in public_lines]
+    
+    @classmethod
+    def for_rsa(cls, font, public_key, private_key):
+        # Only the leading digits are shown, the full hex of an 8192-bit number is never built
+        return cls(font,
+                   [f"n={leading_hex(private_key.n)}...", f"d={leading_hex(private_key.d)}..."],
+                   [f"n={leading_hex(public_key.n)}...", f"e={hex(public_key.e)}"])
+    
+    @classmethod
+    def for_pem(cls, font, private_pem, public_openssh):
+        # PEM body without the header and footer lines
+        body = [line for line in ssh_utils.format_key_for_display(private_pem) if line and not line.startswith('-----')]
+        return cls(font,
+                   [line + "..." for line in body[:2]],
+                   ssh_utils.format_key_for_display(public_openssh)[:3])
+
+def leading_hex(value, digits=48):
+    """
+    Returns:
+        str: hex(value) cut to its first digits, computed from the top bits only
+    """
+    total_digits = (value.bit_length() + 3) // 4
+    if total_digits > digits:
+        value >>= 4 * (total_digits - digits)
+    return hex(value)
+
+class CipherView:
+    def __init__(self, font, encrypted, decrypted):
+        """
+        Rendered result of the ENCRYPT_DECRYPT stage, built when the worker
+        returns instead of running hexlify over the ciphertext every frame.
+        """
+        if isinstance(encrypted, bytes):
+            # 25 bytes are 50 hex digits, the rest is not shown
+            encrypted_hex = binascii.hexlify(encrypted[:25]).decode('utf-8')
+        else:
+            encrypted_hex = str(encrypted)
+        self.encrypted_surface = render_text(font, encrypted_hex[:50] + "...", True, BLUE)
+        self.decrypted_surface = render_text(font, decrypted, True, GREEN)
+
 class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color, action=None):
+    def __init__(self, x, y, width, height, text, color, hover_color, action, fonts):
         self.rect = pygame.Rect(x, y, width, height)
+        self.font = fonts.small
         self.text = text
         self.color = color
         self.hover_color = hover_color
@@ -564,8 +1148,7 @@ class Button:
         pygame.draw.rect(surface, color, self.rect, border_radius=5)
         pygame.draw.rect(surface, BLACK, self.rect, 1, border_radius=5)
         
-        font = pygame.font.SysFont('Arial', 16)
-        text_surface = font.render(self.text, True, BLACK)
+        text_surface = render_text(self.font, self.text, True, BLACK)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
         
@@ -0,0 +1,287 @@
+"""
+Pool of pre-generated key pairs.
+Пул заранее сгенерированных ключевых пар.
+
+The keys shown in the game are throwaway teaching keys, so they are generated
+ahead of time while the student reads lessons and handed out instantly when the
+interactive module needs them. The pool can be mirrored to a cache directory so
+that a fresh launch starts warm; a cached key is deleted as soon as it is handed
+out or no longer fits in the pool.
+"""
+
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import workers
+
+DEFAULT_KEY_SIZES = (1024, 2048)
+DEFAULT_DEPTH = 2
+DEFAULT_REFILL_WORKERS = 1
+# Next to the game, never in the player's home directory
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'key_cache')
+
+
+class KeyPool:
+    def __init__(self, generate, dump=None, load=None, key_sizes=DEFAULT_KEY_SIZES,
+                 depth=DEFAULT_DEPTH, refill_workers=DEFAULT_REFILL_WORKERS, cache_dir=None,
+                 in_process=False):
+        """
+        Args:
+            generate (callable): generate(key_size) -> key pair
+            dump (callable): dump(key pair) -> bytes, needed for the disk cache
+            load (callable): load(bytes) -> key pair, needed for the disk cache
+            key_sizes (iterable): Key sizes kept in the pool
+            depth (int): Number of pairs kept ready per key size
+            refill_workers (int): Number of pairs generated concurrently
+            cache_dir (str): Directory mirroring the pool, None to disable
+            in_process (bool): Run generate in the shared process pool, for pure-Python
+                generators that hold the GIL; generate must then be a module-level function
+        """
+        self.generate = generate
+        self.dump = dump
+        self.load = load
+        self.depth = depth
+        self.refill_workers = refill_workers
+        self.in_process = in_process
+        self.cache_dir = cache_dir if dump is not None and load is not None else None
+
+        self._lock = threading.Lock()
+        self._ready = {size: deque() for size in key_sizes}
+        self._in_flight = 0
+        self._pending = {}
+        self._cache_loaded = self.cache_dir is None
+        self._executor = None
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.loaded_from_cache = 0
+
+    @property
+    def key_sizes(self):
+        return tuple(self._ready)
+
+    def add_key_size(self, key_size):
+        with self._lock:
+            self._ready.setdefault(key_size, deque())
+
+    def available(self, key_size):
+        with self._lock:
+            return len(self._ready.get(key_size, ()))
+
+    def stats(self):
+        """
+        Returns:
+            dict: Pool depth per key size and hit/miss counters
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'ready': {size: len(pairs) for size, pairs in self._ready.items()},
+                'depth': self.depth,
+                'refill_workers': self.refill_workers,
+                'in_flight': self._in_flight,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'generated': self.generated,
+                'loaded_from_cache': self.loaded_from_cache,
+            }
+
+    def take(self, key_size):
+        """
+        Take a fresh pair out of the pool without blocking.
+
+        Returns:
+            The key pair, or None if the pool for this size is empty
+        """
+        with self._lock:
+            pairs = self._ready.setdefault(key_size, deque())
+            if not pairs:
+                self.misses += 1
+                return None
+            pair, path = pairs.popleft()
+            self.hits += 1
+        self._remove_cached(path)
+        return pair
+
+    def get(self, key_size):
+        """
+        Take a pair from the pool, generating one in the calling thread on a miss.
+        """
+        pair = self.take(key_size)
+        if pair is None:
+            pair = self.generate(key_size)
+        return pair
+
+    def request(self, key_size):
+        """
+        Take a pair as a background Job: already finished on a hit, generated
+        by the shared worker or process pool on a miss.
+
+        Returns:
+            workers.Job: Job resolving to the key pair
+        """
+        pair = self.take(key_size)
+        if pair is not None:
+            return workers.completed(pair)
+        if self.in_process:
+            return workers.submit_process(self.generate, key_size)
+        return workers.submit(self.generate, key_size)
+
+    def refill(self):
+        """
+        Schedule background generation until every key size has `depth` pairs.
+        Cheap to call every frame; the game calls it while the scene is idle.
+        """
+        with self._lock:
+            if not self._cache_loaded:
+                # Loading the cache counts as the first refill task
+                if self._in_flight == 0:
+                    self._in_flight += 1
+                    self._get_executor().submit(self._load_cache_task)
+                return
+            counts = {size: len(pairs) + self._pending.get(size, 0)
+                      for size, pairs in self._ready.items()}
+            missing = []
+            # Free workers fill the emptiest sizes first
+            for _ in range(self.refill_workers - self._in_flight):
+                size = min(counts, key=counts.get, default=None)
+                if size is None or counts[size] >= self.depth:
+                    break
+                counts[size] += 1
+                self._pending[size] = self._pending.get(size, 0) + 1
+                missing.append(size)
+            self._in_flight += len(missing)
+        for size in missing:
+            self._get_executor().submit(self._refill_task, size)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.refill_workers,
+                                                thread_name_prefix='ssh-game-key-pool')
+        return self._executor
+
+    def _refill_task(self, key_size):
+        try:
+            if self.in_process:
+                # The refill thread only waits, the key is generated in another process
+                pair = workers.get_process_executor().submit(self.generate, key_size).result()
+            else:
+                pair = self.generate(key_size)
+            path = self._store_cached(key_size, pair)
+            with self._lock:
+                self._ready.setdefault(key_size, deque()).append((pair, path))
+                self.generated += 1
+        except Exception as e:
+            print(f"Key pool refill error: {e}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._pending[key_size] -= 1
+
+    def _load_cache_task(self):
+        try:
+            for key_size in self.key_sizes:
+                size_dir = os.path.join(self.cache_dir, str(key_size))
+                if not os.path.isdir(size_dir):
+                    continue
+                names = sorted(os.listdir(size_dir))
+                # Keys beyond the pool depth would never be handed out
+                for name in names[self.depth:]:
+                    self._remove_cached(os.path.join(size_dir, name))
+                for name in names[:self.depth]:
+                    path = os.path.join(size_dir, name)
+                    try:
+                        with open(path, 'rb') as f:
+                            pair = self.load(f.read())
+                    except Exception:
+                        # Broken cache entries are simply dropped
+                        self._remove_cached(path)
+                        continue
+                    with self._lock:
+                        self._ready[key_size].append((pair, path))
+                        self.loaded_from_cache += 1
+        finally:
+            with self._lock:
+                self._cache_loaded = True
+                self._in_flight -= 1
+
+    def _store_cached(self, key_size, pair):
+        if self.cache_dir is None:
+            return None
+        size_dir = os.path.join(self.cache_dir, str(key_size))
+        os.makedirs(size_dir, exist_ok=True)
+        path = os.path.join(size_dir, f"{uuid.uuid4().hex}.pem")
+        # Private keys are written with owner-only permissions from the start
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.dump(pair))
+        return path
+
+    def _remove_cached(self, path):
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _dump_rsa_pair(pair):
+    public_key, private_key = pair
+    return private_key.save_pkcs1()
+
+
+def _load_rsa_pair(data):
+    import rsa
+    private_key = rsa.PrivateKey.load_pkcs1(data)
+    return rsa.PublicKey(private_key.n, private_key.e), private_key
+
+
+def _generate_rsa_pair(key_size):
+    import rsa
+    return rsa.newkeys(key_size)
+
+
+def create_rsa_pool(**kwargs):
+    """
+    Pool of (rsa.PublicKey, rsa.PrivateKey) pairs as returned by rsa.newkeys,
+    used by the interactive key generator. rsa is pure Python, the pairs are
+    generated in the process pool.
+    """
+    kwargs.setdefault('in_process', True)
+    return KeyPool(_generate_rsa_pair, _dump_rsa_pair, _load_rsa_pair, **kwargs)
+
+
+def _dump_pem_pair(pair):
+    private_pem, public_pem = pair
+    return (private_pem + public_pem).encode('utf-8')
+
+
+def _load_pem_pair(data):
+    text = data.decode('utf-8')
+    split = text.index('-----BEGIN PUBLIC KEY-----')
+    return text[:split], text[split:]
+
+
+def _generate_pem_pair(key_size):
+    import ssh_utils
+    return ssh_utils.generate_rsa_key_pair(key_size)
+
+
+def create_pem_pool(**kwargs):
+    """
+    Pool of (private_pem, public_pem) pairs as returned by
+    ssh_utils.generate_rsa_key_pair.
+    """
+    return KeyPool(_generate_pem_pair, _dump_pem_pair, _load_pem_pair, **kwargs)
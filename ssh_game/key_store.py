@@ -0,0 +1,379 @@
+"""
+Indexed on-disk key store and in-memory fingerprint index.
+Хранилище ключей с индексом и индекс отпечатков в памяти.
+
+Key files stay ordinary OpenSSH files on disk, an SQLite index next to them
+maps owner, algorithm, size, creation time and fingerprint to the file
+location. Lookups go through the index, and key material is only read from
+disk when a record's key is actually used.
+
+    <root>/index.sqlite3
+    <root>/<owner>/<algorithm>-<fingerprint prefix>      private key, mode 600
+    <root>/<owner>/<algorithm>-<fingerprint prefix>.pub  public key line
+"""
+
+import base64
+import os
+import sqlite3
+import struct
+import time
+
+import ssh_utils
+
+INDEX_NAME = 'index.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    key_size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    fingerprint TEXT NOT NULL UNIQUE,
+    public_path TEXT NOT NULL,
+    private_path TEXT
+);
+CREATE INDEX IF NOT EXISTS keys_owner ON keys (owner, algorithm);
+"""
+COLUMNS = 'id, owner, algorithm, key_size, created, fingerprint, public_path, private_path'
+
+# OpenSSH key type -> (algorithm, key size), RSA sizes are read from the modulus
+SSH_KEY_TYPES = {
+    'ssh-ed25519': ('ed25519', 256),
+    'ecdsa-sha2-nistp256': ('ecdsa-p256', 256),
+    'ecdsa-sha2-nistp384': ('ecdsa-p384', 384),
+}
+
+
+def describe_public_key(public_key):
+    """
+    Read algorithm and size from the SSH wire format without parsing the key.
+
+    Args:
+        public_key (str): OpenSSH public key line
+
+    Returns:
+        tuple: (algorithm, key_size), e.g. ('rsa-2048', 2048)
+    """
+    key_type, blob = public_key.split()[:2]
+    if key_type in SSH_KEY_TYPES:
+        return SSH_KEY_TYPES[key_type]
+    if key_type != 'ssh-rsa':
+        raise ValueError(f"Unsupported key type {key_type}")
+    # string "ssh-rsa", mpint e, mpint n
+    data = base64.b64decode(blob)
+    offset = 0
+    for _ in range(3):
+        length, = struct.unpack_from('>I', data, offset)
+        field = data[offset + 4:offset + 4 + length]
+        offset += 4 + length
+    key_size = int.from_bytes(field, 'big').bit_length()
+    return f"rsa-{key_size}", key_size
+
+
+def directory_key_files(directory):
+    """
+    Walk a directory written by provisioning.py: one subdirectory per owner
+    holding key pairs.
+
+    Yields:
+        tuple: (owner, public_path, private_path), private_path is None without a private key
+    """
+    for owner_entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not owner_entry.is_dir():
+            continue
+        for entry in sorted(os.scandir(owner_entry.path), key=lambda entry: entry.name):
+            if not entry.name.endswith('.pub'):
+                continue
+            private_path = entry.path[:-len('.pub')]
+            yield owner_entry.name, entry.path, private_path if os.path.exists(private_path) else None
+
+
+class KeyRecord:
+    __slots__ = ('id', 'owner', 'algorithm', 'key_size', 'created', 'fingerprint',
+                 'public_path', 'private_path', '_public_key', '_private_key')
+
+    def __init__(self, row, root):
+        """
+        One indexed key. The key files are read on first access of
+        public_key / private_key, not when the record is looked up.
+
+        Args:
+            row (tuple): Index row in COLUMNS order
+            root (str): Store directory, relative paths are resolved against it
+        """
+        (self.id, self.owner, self.algorithm, self.key_size, self.created,
+         self.fingerprint, public_path, private_path) = row
+        self.public_path = os.path.join(root, public_path)
+        self.private_path = os.path.join(root, private_path) if private_path else None
+        self._public_key = None
+        self._private_key = None
+
+    def __repr__(self):
+        return f"KeyRecord({self.owner!r}, {self.algorithm!r}, {self.fingerprint!r})"
+
+    @property
+    def public_key(self):
+        """OpenSSH public key line."""
+        if self._public_key is None:
+            with open(self.public_path, encoding='ascii') as f:
+                self._public_key = f.read()
+        return self._public_key
+
+    @property
+    def private_key(self):
+        """OpenSSH private key, None if the store only knows the public key."""
+        if self._private_key is None and self.private_path is not None:
+            with open(self.private_path, encoding='ascii') as f:
+                self._private_key = f.read()
+        return self._private_key
+
+    def load_public_key(self):
+        return ssh_utils.load_public_key(self.public_key)
+
+    def load_private_key(self):
+        if self.private_key is None:
+            raise ValueError(f"No private key stored for {self.fingerprint}")
+        return ssh_utils.load_private_key(self.private_key)
+
+
+class KeyStore:
+    def __init__(self, root):
+        """
+        Open the store in a directory, creating the directory and index if needed.
+
+        Args:
+            root (str): Store directory
+        """
+        self.root = root
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, INDEX_NAME))
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM keys').fetchone()[0]
+
+    def __contains__(self, fingerprint):
+        return self._db.execute('SELECT 1 FROM keys WHERE fingerprint = ?', (fingerprint,)).fetchone() is not None
+
+    def __iter__(self):
+        for row in self._db.execute(f'SELECT {COLUMNS} FROM keys ORDER BY id'):
+            yield KeyRecord(row, self.root)
+
+    def _relative(self, path):
+        path = os.path.abspath(path)
+        root = os.path.abspath(self.root)
+        return os.path.relpath(path, root) if path.startswith(root + os.sep) else path
+
+    def _insert(self, rows):
+        # One transaction for the whole batch, the index never holds half of it
+        with self._db:
+            self._db.executemany(
+                'INSERT INTO keys (owner, algorithm, key_size, created, fingerprint, public_path, private_path) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def add(self, owner, public_key, private_key=None):
+        """
+        Store one key pair, see add_many().
+
+        Returns:
+            KeyRecord: The stored key
+        """
+        self.add_many([(owner, public_key, private_key)])
+        return self.by_fingerprint(ssh_utils.fingerprint(public_key))
+
+    def add_many(self, entries):
+        """
+        Write key files into the store and index them in a single transaction.
+
+        Args:
+            entries (iterable): (owner, public_key, private_key) tuples, OpenSSH
+                public key lines and OpenSSH private keys or None
+
+        Returns:
+            int: Number of stored keys
+
+        Raises:
+            sqlite3.IntegrityError: If a fingerprint is already stored or repeated in
+                entries, checked before its files are written, nothing is added then
+        """
+        rows = []
+        written = []
+        fingerprints = set()
+        created = time.time()
+        try:
+            for owner, public_key, private_key in entries:
+                if os.sep in owner or owner in ('', '.', '..'):
+                    raise ValueError(f"Invalid owner name {owner!r}")
+                algorithm, key_size = describe_public_key(public_key)
+                key_fingerprint = ssh_utils.fingerprint(public_key)
+                # Checked first, the key file of the same owner would already exist
+                if key_fingerprint in fingerprints or key_fingerprint in self:
+                    raise sqlite3.IntegrityError(f"Key {key_fingerprint} is already stored")
+                fingerprints.add(key_fingerprint)
+                owner_dir = os.path.join(self.root, owner)
+                os.makedirs(owner_dir, mode=0o700, exist_ok=True)
+                # Fingerprints are base64, '/' and '+' are not safe in file names
+                digest = base64.b64decode(key_fingerprint[len('SHA256:'):] + '=')
+                name = f"{algorithm}-{digest[:8].hex()}"
+                private_path = os.path.join(owner_dir, name)
+                ssh_utils.write_key_file(private_path + '.pub', public_key, 0o644, overwrite=False)
+                written.append(private_path + '.pub')
+                if private_key is not None:
+                    ssh_utils.write_key_file(private_path, private_key, 0o600, overwrite=False)
+                    written.append(private_path)
+                rows.append((owner, algorithm, key_size, created, key_fingerprint,
+                             self._relative(private_path + '.pub'),
+                             self._relative(private_path) if private_key is not None else None))
+            return self._insert(rows)
+        except BaseException:
+            for path in written:
+                os.remove(path)
+            raise
+
+    def register_files(self, entries):
+        """
+        Index key files that already exist elsewhere, without copying them.
+
+        Args:
+            entries (iterable): (owner, public_path, private_path) tuples, private_path may be None
+
+        Returns:
+            int: Number of indexed keys
+        """
+        rows = []
+        created = time.time()
+        for owner, public_path, private_path in entries:
+            with open(public_path, encoding='ascii') as f:
+                public_key = f.read()
+            algorithm, key_size = describe_public_key(public_key)
+            rows.append((owner, algorithm, key_size, created, ssh_utils.fingerprint(public_key),
+                         self._relative(public_path), self._relative(private_path) if private_path else None))
+        return self._insert(rows)
+
+    def import_directory(self, directory):
+        """
+        Index a directory written by provisioning.py, see directory_key_files().
+
+        Returns:
+            int: Number of indexed keys
+        """
+        return self.register_files(directory_key_files(directory))
+
+    def get(self, key_id):
+        row = self._db.execute(f'SELECT {COLUMNS} FROM keys WHERE id = ?', (key_id,)).fetchone()
+        return KeyRecord(row, self.root) if row else None
+
+    def by_fingerprint(self, fingerprint):
+        """
+        Returns:
+            KeyRecord: The key with this SHA256 fingerprint, None if it is not stored
+        """
+        row = self._db.execute(f'SELECT {COLUMNS} FROM keys WHERE fingerprint = ?', (fingerprint,)).fetchone()
+        return KeyRecord(row, self.root) if row else None
+
+    def by_owner(self, owner, algorithm=None):
+        """
+        Returns:
+            list: KeyRecords of the owner, oldest first
+        """
+        if algorithm is None:
+            rows = self._db.execute(f'SELECT {COLUMNS} FROM keys WHERE owner = ? ORDER BY id', (owner,))
+        else:
+            rows = self._db.execute(f'SELECT {COLUMNS} FROM keys WHERE owner = ? AND algorithm = ? ORDER BY id',
+                                    (owner, algorithm))
+        return [KeyRecord(row, self.root) for row in rows]
+
+    def remove(self, fingerprint):
+        """
+        Delete a key from the index and its files from the store directory.
+        Files registered from elsewhere are left in place.
+        """
+        record = self.by_fingerprint(fingerprint)
+        if record is None:
+            return False
+        with self._db:
+            self._db.execute('DELETE FROM keys WHERE id = ?', (record.id,))
+        root = os.path.abspath(self.root) + os.sep
+        for path in (record.public_path, record.private_path):
+            if path and os.path.abspath(path).startswith(root) and os.path.exists(path):
+                os.remove(path)
+        return True
+
+
+class FingerprintIndex:
+    def __init__(self):
+        """
+        Hash index from SHA256 fingerprint to key record, for answering
+        "is this key one of ours" in constant time. Build it once with
+        from_store() or from_directory() and query it many times.
+        """
+        self._records = {}
+        self.duplicates = []  # (fingerprint, record) of keys found more than once
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._records
+
+    def add(self, fingerprint, record):
+        if fingerprint in self._records:
+            self.duplicates.append((fingerprint, record))
+            return
+        self._records[fingerprint] = record
+
+    def get(self, fingerprint):
+        return self._records.get(fingerprint)
+
+    def find_key(self, public_key):
+        """
+        Args:
+            public_key (str or KeyHandle): Key presented by a student, any format fingerprint() accepts
+
+        Returns:
+            KeyRecord: The matching record, None if the key is unknown
+        """
+        return self._records.get(ssh_utils.fingerprint(public_key))
+
+    def contains_key(self, public_key):
+        return self.find_key(public_key) is not None
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Build the index with one query over the key store, no key files are read.
+        """
+        index = cls()
+        for record in store:
+            index.add(record.fingerprint, record)
+        return index
+
+    @classmethod
+    def from_directory(cls, directory):
+        """
+        Build the index in one pass over a provisioning directory, reading
+        only the public key files. Records of loose files have no id and
+        no creation time.
+        """
+        index = cls()
+        for owner, public_path, private_path in directory_key_files(directory):
+            with open(public_path, encoding='ascii') as f:
+                public_key = f.read()
+            algorithm, key_size = describe_public_key(public_key)
+            blob_fingerprint = ssh_utils.blob_fingerprint(base64.b64decode(public_key.split()[1]))
+            record = KeyRecord((None, owner, algorithm, key_size, None, blob_fingerprint,
+                                public_path, private_path), '')
+            index.add(blob_fingerprint, record)
+        return index
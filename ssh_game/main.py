@@ -5,14 +5,21 @@ from pygame.locals import *
 from key_generator import KeyGenerator
 from quiz import Quiz
 from visualization import EncryptionVisualizer
-
-# Initialize pygame
-pygame.init()
+import key_pool
+from text_cache import render_text
+from fonts import FontManager
+from scene_graph import SceneGraph, TextNode, ButtonNode, ScrollNode, Renderer
+from text_layout import layout_text
+from profiler import FrameProfiler
+from game_clock import GameClock, Scheduler
+from scene_registry import SceneRegistry, UNLOAD
 
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+IDLE_TIMEOUT_MS = 250  # Static scenes wake up at least this often
+LESSON_VIEW_BOTTOM = 490  # Lesson text scrolls above the "back" button
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 BLUE = (0, 0, 255)
@@ -31,19 +38,58 @@ QUIZ = 5
 VISUALIZATION = 6
 GAME_OVER = 7
 
-# Setup the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("SSH Keys Educational Game")
-clock = pygame.time.Clock()
+SCENE_NAMES = {
+    MAIN_MENU: 'main_menu',
+    LESSON_1: 'lesson_1',
+    LESSON_2: 'lesson_2',
+    LESSON_3: 'lesson_3',
+    INTERACTIVE_1: 'key_generator',
+    QUIZ: 'quiz',
+    VISUALIZATION: 'visualization',
+}
+# Scenes drawn from a retained scene graph
+STATIC_SCENES = (MAIN_MENU, LESSON_1, LESSON_2, LESSON_3)
+
+# Pre-generated teaching keys, cached in the game directory by default.
+# Set SSH_GAME_KEY_CACHE to another directory, or to an empty string to disable the disk cache
+KEY_SIZES = (1024, 2048)
+KEY_POOL_DEPTH = 2
+KEY_POOL_REFILL_WORKERS = 1
+KEY_CACHE_DIR = os.environ.get('SSH_GAME_KEY_CACHE', key_pool.DEFAULT_CACHE_DIR) or None
 
-# Font setup - уменьшим размер шрифтов для лучшей читаемости
-font_small = pygame.font.SysFont('Arial', 16)
-font_medium = pygame.font.SysFont('Arial', 24)
-font_large = pygame.font.SysFont('Arial', 32)
+# Display, clock and fonts are created by init_display() when the first Game starts,
+# importing this module does not initialize pygame or open a window
+screen = None
+clock = None
+fonts = None
+font_small = None
+font_medium = None
+font_large = None
+
+def init_display():
+    global screen, clock, fonts, font_small, font_medium, font_large
+    if screen is not None:
+        return screen
+    
+    # Initialize pygame
+    pygame.init()
+    
+    # Setup the display
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("SSH Keys Educational Game")
+    clock = pygame.time.Clock()
+    
+    # Font setup - уменьшим размер шрифтов для лучшей читаемости
+    fonts = FontManager()
+    font_small = fonts.small
+    font_medium = fonts.medium
+    font_large = fonts.large
+    return screen
 
 class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color, action=None):
+    def __init__(self, x, y, width, height, text, color, hover_color, action, fonts):
         self.rect = pygame.Rect(x, y, width, height)
+        self.fonts = fonts
         self.text = text
         self.color = color
         self.hover_color = hover_color
@@ -68,8 +114,8 @@ class Button:
                 text1 = self.text[:space_pos]
                 text2 = self.text[space_pos+1:]
                 
-                text_surface1 = font_small.render(text1, True, BLACK)
-                text_surface2 = font_small.render(text2, True, BLACK)
+                text_surface1 = render_text(self.fonts.small, text1, True, BLACK)
+                text_surface2 = render_text(self.fonts.small, text2, True, BLACK)
                 
                 text_rect1 = text_surface1.get_rect(center=(self.rect.centerx, self.rect.centery - 10))
                 text_rect2 = text_surface2.get_rect(center=(self.rect.centerx, self.rect.centery + 10))
@@ -78,12 +124,12 @@ class Button:
                 surface.blit(text_surface2, text_rect2)
             else:
                 # Если пробел не найден, отображаем весь текст
-                text_surface = font_small.render(self.text, True, BLACK)
+                text_surface = render_text(self.fonts.small, self.text, True, BLACK)
                 text_rect = text_surface.get_rect(center=self.rect.center)
                 surface.blit(text_surface, text_rect)
         else:
             # Для короткого текста отображаем как обычно
-            text_surface = font_medium.render(self.text, True, BLACK)
+            text_surface = render_text(self.fonts.medium, self.text, True, BLACK)
             text_rect = text_surface.get_rect(center=self.rect.center)
             surface.blit(text_surface, text_rect)
         
@@ -99,36 +145,39 @@ class Button:
 
 class Game:
     def __init__(self):
+        init_display()
         self.state = MAIN_MENU
-        self.key_generator = KeyGenerator(screen, font_small, font_medium, font_large)
-        self.quiz = Quiz(screen, font_small, font_medium, font_large)
-        self.visualizer = EncryptionVisualizer(screen, font_small, font_medium, font_large)
-        
+        # Game logic runs in fixed steps of simulated time, scene timers fire on the same clock
+        self.game_clock = GameClock()
+        self.scheduler = Scheduler()
+        self.key_pool = key_pool.create_rsa_pool(key_sizes=KEY_SIZES, depth=KEY_POOL_DEPTH,
+                                                 refill_workers=KEY_POOL_REFILL_WORKERS,
+                                                 cache_dir=KEY_CACHE_DIR)
         # Create buttons for main menu - увеличим размер кнопок
         button_width = 320
         button_height = 50
         button_x = (SCREEN_WIDTH - button_width) // 2
         self.buttons = {
             MAIN_MENU: [
-                Button(button_x, 170, button_width, button_height, "Урок 1: Основы шифрования", GRAY, LIGHT_BLUE, LESSON_1),
-                Button(button_x, 230, button_width, button_height, "Урок 2: Асимметричная криптография", GRAY, LIGHT_BLUE, LESSON_2),
-                Button(button_x, 290, button_width, button_height, "Урок 3: SSH-ключи", GRAY, LIGHT_BLUE, LESSON_3),
-                Button(button_x, 350, button_width, button_height, "Интерактив: Создание SSH-ключа", GRAY, LIGHT_BLUE, INTERACTIVE_1),
-                Button(button_x, 410, button_width, button_height, "Тест знаний", GRAY, LIGHT_BLUE, QUIZ),
-                Button(button_x, 470, button_width, button_height, "Визуализация шифрования", GRAY, LIGHT_BLUE, VISUALIZATION),
-                Button(button_x, 530, button_width, button_height, "Выход", GRAY, LIGHT_BLUE, GAME_OVER)
+                Button(button_x, 170, button_width, button_height, "Урок 1: Основы шифрования", GRAY, LIGHT_BLUE, LESSON_1, fonts),
+                Button(button_x, 230, button_width, button_height, "Урок 2: Асимметричная криптография", GRAY, LIGHT_BLUE, LESSON_2, fonts),
+                Button(button_x, 290, button_width, button_height, "Урок 3: SSH-ключи", GRAY, LIGHT_BLUE, LESSON_3, fonts),
+                Button(button_x, 350, button_width, button_height, "Интерактив: Создание SSH-ключа", GRAY, LIGHT_BLUE, INTERACTIVE_1, fonts),
+                Button(button_x, 410, button_width, button_height, "Тест знаний", GRAY, LIGHT_BLUE, QUIZ, fonts),
+                Button(button_x, 470, button_width, button_height, "Визуализация шифрования", GRAY, LIGHT_BLUE, VISUALIZATION, fonts),
+                Button(button_x, 530, button_width, button_height, "Выход", GRAY, LIGHT_BLUE, GAME_OVER, fonts)
             ],
             LESSON_1: [
-                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU)
+                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU, fonts)
             ],
             LESSON_2: [
-                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU)
+                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU, fonts)
             ],
             LESSON_3: [
-                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU)
+                Button(button_x, 500, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU, fonts)
             ],
             VISUALIZATION: [
-                Button(button_x, 550, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU)
+                Button(button_x, 550, button_width, button_height, "Назад в меню", GRAY, LIGHT_BLUE, MAIN_MENU, fonts)
             ]
         }
         
@@ -182,147 +231,242 @@ class Game:
                 "автоматизация развертывания, безопасные туннели."
             ]
         }
+        
+        # Static screens are described once and redrawn only where they change
+        self.renderer = Renderer(screen)
+        self.profiler = FrameProfiler(font_small)
+        self.lesson_pages = {}
+        
+        # Scenes are constructed on first entry, only the main menu is needed for the first frame
+        self.scenes = SceneRegistry()
+        self.scenes.register(MAIN_MENU, SCENE_NAMES[MAIN_MENU], self.build_menu_scene)
+        for lesson in [LESSON_1, LESSON_2, LESSON_3]:
+            self.scenes.register(lesson, SCENE_NAMES[lesson], lambda lesson=lesson: self.build_lesson_scene(lesson))
+        self.scenes.register(INTERACTIVE_1, SCENE_NAMES[INTERACTIVE_1],
+                             lambda: KeyGenerator(screen, fonts, self.key_pool, scheduler=self.scheduler))
+        self.scenes.register(QUIZ, SCENE_NAMES[QUIZ], lambda: Quiz(screen, fonts))
+        # The visualization frees its particles on exit and starts over on the next visit
+        self.scenes.register(VISUALIZATION, SCENE_NAMES[VISUALIZATION],
+                             lambda: EncryptionVisualizer(screen, fonts, scheduler=self.scheduler), on_exit=UNLOAD)
     
-    def run(self):
+    @property
+    def key_generator(self):
+        return self.scenes.get(INTERACTIVE_1)
+    
+    @property
+    def quiz(self):
+        return self.scenes.get(QUIZ)
+    
+    @property
+    def visualizer(self):
+        return self.scenes.get(VISUALIZATION)
+    
+    def build_menu_scene(self):
+        scene = SceneGraph(WHITE)
+        scene.add(TextNode(font_large, "SSH Keys Educational Game", BLACK, center=(SCREEN_WIDTH//2, 100)))
+        scene.add(TextNode(font_medium, "Изучите основы криптографии и SSH-ключей", BLACK, center=(SCREEN_WIDTH//2, 140)))
+        for button in self.buttons[MAIN_MENU]:
+            scene.add(ButtonNode(button))
+        return scene
+    
+    def build_lesson_scene(self, lesson):
+        scene = SceneGraph(WHITE)
+        scene.add(TextNode(font_large, self.lesson_content[lesson][0], BLACK, center=(SCREEN_WIDTH//2, 100)))
+        
+        # Текст урока верстается один раз в одну страницу, прокрутка только сдвигает видимую область
+        max_width = screen.get_width() - 200  # Оставляем поля по бокам
+        layout = layout_text(font_small, self.lesson_content[lesson][1:], max_width)
+        page_view = pygame.Rect(100, 140, max_width + 10, LESSON_VIEW_BOTTOM - 140)
+        self.lesson_pages[lesson] = scene.add(ScrollNode(layout.surface, page_view))
+        
+        # Кнопка "Назад в меню" для уроков
+        for button in self.buttons[lesson]:
+            scene.add(ButtonNode(button))
+        return scene
+    
+    def scroll_lesson(self, event):
+        page = self.lesson_pages[self.state]
+        if event.type == MOUSEWHEEL:
+            page.scroll_by(-event.y * 20)
+        elif event.type == KEYDOWN and event.key == K_PAGEDOWN:
+            page.page(1)
+        elif event.type == KEYDOWN and event.key == K_PAGEUP:
+            page.page(-1)
+        elif event.type == KEYDOWN and event.key == K_DOWN:
+            page.scroll_by(20)
+        elif event.type == KEYDOWN and event.key == K_UP:
+            page.scroll_by(-20)
+    
+    def is_animating(self):
+        # Only the key generation progress and the visualization need fixed-rate frames
+        if self.state == INTERACTIVE_1:
+            return self.key_generator.is_animating()
+        if self.state == VISUALIZATION:
+            return self.visualizer.is_animating()
+        return False
+    
+    def wait_events(self):
+        # Block until an event arrives, the next timer is due or the idle timeout passes
+        timeout = IDLE_TIMEOUT_MS
+        due = self.scheduler.next_due()
+        if due is not None:
+            timeout = max(1, min(timeout, int((due - self.game_clock.time) * 1000)))
+        event = pygame.event.wait(timeout)
+        events = [] if event.type == NOEVENT else [event]
+        return events + pygame.event.get()
+    
+    def handle_events(self, events):
+        """
+        Process one frame of input. Returns False when the game should quit.
+        """
         running = True
+        mouse_pos = pygame.mouse.get_pos()
         
-        while running:
-            mouse_pos = pygame.mouse.get_pos()
-            
-            # Обновление состояния наведения для кнопок всех состояний
-            if self.state in self.buttons:
-                for button in self.buttons[self.state]:
-                    button.check_hover(mouse_pos)
-            
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    running = False
-                
-                # Handle key generator events if in interactive mode
-                if self.state == INTERACTIVE_1:
-                    result = self.key_generator.handle_event(event)
-                    if result == "MAIN_MENU":
-                        self.state = MAIN_MENU
-                
-                # Handle quiz events
-                elif self.state == QUIZ:
-                    result = self.quiz.handle_event(event)
-                    if result == "MAIN_MENU":
-                        self.state = MAIN_MENU
-                
-                # Handle visualization events
-                elif self.state == VISUALIZATION:
-                    result = self.visualizer.handle_event(event)
-                    if result == "COMPLETE":
-                        self.state = MAIN_MENU
-                    
-                    # Проверка кнопки "Назад в меню" для визуализации
-                    if event.type == MOUSEBUTTONDOWN and event.button == 1:
-                        for button in self.buttons[VISUALIZATION]:
-                            if button.is_hovered:
-                                self.state = MAIN_MENU
-                
-                # Handle button clicks for other states
-                elif self.state in self.buttons:
-                    for button in self.buttons[self.state]:
-                        action = button.handle_event(event)
-                        if action is not None:
-                            if action == GAME_OVER:
-                                running = False
-                            else:
-                                self.state = action
+        # Обновление состояния наведения для кнопок всех состояний
+        if self.state in self.buttons:
+            for button in self.buttons[self.state]:
+                button.check_hover(mouse_pos)
+        
+        for event in events:
+            if event.type == QUIT:
+                running = False
             
-            # Update visualization
-            if self.state == VISUALIZATION:
-                self.visualizer.update()
+            # Frame-time overlay: F3 toggles it, F4 saves the timings
+            if event.type == KEYDOWN and event.key == K_F3:
+                self.profiler.toggle()
+                self.renderer.reset()  # Repaint the area under the overlay
+            elif event.type == KEYDOWN and event.key == K_F4:
+                self.profiler.dump(scene_construction=self.scenes.report())
             
-            # Draw screen based on game state
-            screen.fill(WHITE)
+            # Handle key generator events if in interactive mode
+            if self.state == INTERACTIVE_1:
+                result = self.key_generator.handle_event(event)
+                if result == "MAIN_MENU":
+                    self.state = MAIN_MENU
             
-            if self.state == MAIN_MENU:
-                title = font_large.render("SSH Keys Educational Game", True, BLACK)
-                title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
-                screen.blit(title, title_rect)
-                
-                subtitle = font_medium.render("Изучите основы криптографии и SSH-ключей", True, BLACK)
-                subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH//2, 140))
-                screen.blit(subtitle, subtitle_rect)
-                
-            elif self.state == INTERACTIVE_1:
-                # Draw the key generator interface
-                self.key_generator.draw()
-                
+            # Handle quiz events
             elif self.state == QUIZ:
-                # Draw the quiz interface
-                self.quiz.draw()
-                
+                result = self.quiz.handle_event(event)
+                if result == "MAIN_MENU":
+                    self.state = MAIN_MENU
+            
+            # Handle visualization events
             elif self.state == VISUALIZATION:
-                # Draw the visualization
-                self.visualizer.draw()
-                
-                # Отрисовка кнопки "Назад в меню" для визуализации
-                for button in self.buttons[VISUALIZATION]:
-                    button.draw(screen)
-                
-            elif self.state in [LESSON_1, LESSON_2, LESSON_3]:
-                title = font_large.render(self.lesson_content[self.state][0], True, BLACK)
-                title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
-                screen.blit(title, title_rect)
-                
-                # Используем меньший размер текста с ограниченной шириной для уроков
-                max_width = SCREEN_WIDTH - 200  # Оставляем поля по бокам
-                y_offset = 150
-                for line in self.lesson_content[self.state][1:]:
-                    if line == "":
-                        y_offset += 15  # Add extra space for empty lines
-                        continue
-                    
-                    # Если строка слишком длинная, разбиваем её
-                    text = font_small.render(line, True, BLACK)
-                    text_rect = text.get_rect(midleft=(100, y_offset))
-                    
-                    # Убедимся, что текст не выходит за пределы
-                    if text_rect.width > max_width:
-                        # Разбиваем строку на несколько
-                        words = line.split()
-                        current_line = words[0]
-                        
-                        for word in words[1:]:
-                            test_line = current_line + " " + word
-                            test_width = font_small.size(test_line)[0]
-                            
-                            if test_width <= max_width:
-                                current_line = test_line
-                            else:
-                                # Отрисовка текущей строки и переход к новой
-                                text = font_small.render(current_line, True, BLACK)
-                                text_rect = text.get_rect(midleft=(100, y_offset))
-                                screen.blit(text, text_rect)
-                                y_offset += 20
-                                current_line = word
-                        
-                        # Отрисовка последней строки
-                        text = font_small.render(current_line, True, BLACK)
-                        text_rect = text.get_rect(midleft=(100, y_offset))
-                        screen.blit(text, text_rect)
-                    else:
-                        screen.blit(text, text_rect)
-                    
-                    y_offset += 20
+                result = self.visualizer.handle_event(event)
+                if result == "COMPLETE":
+                    self.state = MAIN_MENU
                 
-                # Отрисовка кнопки "Назад в меню" для уроков
-                for button in self.buttons[self.state]:
-                    button.draw(screen)
+                # Проверка кнопки "Назад в меню" для визуализации
+                if event.type == MOUSEBUTTONDOWN and event.button == 1:
+                    for button in self.buttons[VISUALIZATION]:
+                        if button.is_hovered:
+                            self.state = MAIN_MENU
             
-            # Draw buttons for main menu
-            if self.state == MAIN_MENU:
+            # Handle button clicks for other states
+            elif self.state in self.buttons:
+                if self.state in self.lesson_pages:
+                    self.scroll_lesson(event)
+
                 for button in self.buttons[self.state]:
-                    button.draw(screen)
+                    action = button.handle_event(event)
+                    if action is not None:
+                        if action == GAME_OVER:
+                            running = False
+                        else:
+                            self.state = action
+        return running
+    
+    def update(self, dt=None):
+        """
+        Advance the game by dt seconds of real time, one simulation step if dt is None.
+        """
+        if dt is None:
+            dt = self.game_clock.step
+        self.game_clock.advance(dt)
+        for step in self.game_clock.steps():
+            self.fixed_update(step)
+            self.scheduler.run_due(self.game_clock.time)
+        
+        # Background jobs are polled once per frame
+        if self.state == INTERACTIVE_1:
+            self.key_generator.update()
+        
+        # Refill the key pool while the student reads static screens
+        if self.state in [MAIN_MENU, LESSON_1, LESSON_2, LESSON_3, QUIZ]:
+            self.key_pool.refill()
+    
+    def fixed_update(self, dt):
+        # Update visualization
+        if self.state == VISUALIZATION:
+            self.visualizer.update(dt)
+        elif self.state == INTERACTIVE_1:
+            self.key_generator.fixed_update(dt)
+    
+    def draw(self):
+        # Draw screen based on game state
+        if self.state in STATIC_SCENES:
+            # Static screens only redraw what changed
+            self.renderer.render(self.scenes.get(self.state))
+            
+        elif self.state == INTERACTIVE_1:
+            # Draw the key generator interface
+            self.key_generator.draw()
+            self.renderer.present(self.key_generator, self.key_generator.dirty_rects())
+            
+        elif self.state == QUIZ:
+            # Draw the quiz interface
+            self.renderer.render(self.quiz.scene)
+            
+        elif self.state == VISUALIZATION:
+            # Draw the visualization
+            self.visualizer.draw()
+            
+            # Отрисовка кнопки "Назад в меню" для визуализации
+            for button in self.buttons[VISUALIZATION]:
+                button.draw(screen)
+            
+            rects = self.visualizer.dirty_rects()
+            if rects is not None:
+                rects += [button.rect for button in self.buttons[VISUALIZATION]]
+            self.renderer.present(self.visualizer, rects)
+    
+    def run(self):
+        running = True
+        
+        while running:
+            # Static scenes wait for the next input event instead of running update/draw at FPS.
+            # Whether that saves CPU depends on the video driver, the dummy driver polls inside the wait
+            if self.is_animating():
+                events = pygame.event.get()
+            else:
+                events = self.wait_events()
+            
+            profiling = self.profiler.enabled
+            if profiling:
+                self.profiler.begin_frame(SCENE_NAMES[self.state])
+            
+            previous_state = self.state
+            running = self.handle_events(events)
+            
+            # Leaving a scene stops its jobs and timers, some scenes are unloaded
+            if self.state != previous_state:
+                self.scenes.exit(previous_state)
             
-            pygame.display.flip()
+            if profiling:
+                self.profiler.mark('events')
+            self.update(self.game_clock.tick())
+            if profiling:
+                self.profiler.mark('update')
+            self.draw()
+            if profiling:
+                self.profiler.mark('draw')
+                self.profiler.end_frame()
+                if self.profiler.enabled:
+                    self.profiler.draw(screen)
             clock.tick(FPS)
         
+        self.scenes.unload_all()
+        self.key_pool.shutdown()
         pygame.quit()
         sys.exit()
 
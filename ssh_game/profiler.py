@@ -0,0 +1,153 @@
+"""
+Frame-time overlay and per-scene timing histograms.
+Отображение времени кадра и гистограммы по сценам.
+
+F3 toggles the overlay, F4 dumps the collected timings to a JSON file.
+While the overlay is off the game loop only checks the `enabled` flag.
+"""
+
+import json
+import time
+from collections import deque
+
+import pygame
+
+from benchmarks.harness import summarize
+
+SECTIONS = ('events', 'update', 'draw')
+HISTORY = 300  # Frames kept per scene
+# Upper bounds of the frame time histogram bins, in milliseconds
+BIN_EDGES_MS = (4, 8, 16.7, 33.3, 66.7, float('inf'))
+BIN_LABELS = ('<4', '<8', '<17', '<33', '<67', '67+')
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 200, 0)
+YELLOW = (230, 200, 0)
+RED = (220, 0, 0)
+PANEL_RECT = pygame.Rect(530, 10, 260, 190)
+
+
+class SceneTimings:
+    def __init__(self, history):
+        self.frames = deque(maxlen=history)
+        self.sections = {section: deque(maxlen=history) for section in SECTIONS}
+        self.total_frames = 0
+
+    def histogram(self):
+        counts = [0] * len(BIN_EDGES_MS)
+        for frame_ms in self.frames:
+            for i, edge in enumerate(BIN_EDGES_MS):
+                if frame_ms < edge:
+                    counts[i] += 1
+                    break
+        return counts
+
+
+class FrameProfiler:
+    def __init__(self, font, history=HISTORY):
+        self.font = font
+        self.history = history
+        self.enabled = False
+        self.scenes = {}
+        self._scene = None
+        self._frame_start = 0.0
+        self._mark = 0.0
+        self._last_frame_end = None
+        self._current = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._last_frame_end = None
+
+    def begin_frame(self, scene_name):
+        now = time.perf_counter()
+        self._scene = self.scenes.get(scene_name)
+        if self._scene is None:
+            self._scene = self.scenes[scene_name] = SceneTimings(self.history)
+        self._frame_start = now
+        self._mark = now
+        self._current = {}
+
+    def mark(self, section):
+        # Time since the previous mark is attributed to this section
+        now = time.perf_counter()
+        elapsed_ms = (now - self._mark) * 1000
+        self._mark = now
+        self._current[section] = elapsed_ms
+        self._scene.sections[section].append(elapsed_ms)
+
+    def end_frame(self):
+        # Frame time runs from one frame end to the next, so it includes waiting and clock.tick
+        now = time.perf_counter()
+        if self._last_frame_end is not None:
+            self._scene.frames.append((now - self._last_frame_end) * 1000)
+        self._last_frame_end = now
+        self._scene.total_frames += 1
+
+    def draw(self, surface):
+        """
+        Draw the overlay panel and push it to the display.
+        """
+        scene = self._scene
+        if scene is None:
+            return
+        pygame.draw.rect(surface, BLACK, PANEL_RECT)
+        frame_ms = scene.frames[-1] if scene.frames else 0.0
+        fps = 1000 / frame_ms if frame_ms else 0.0
+        lines = [f"FPS {fps:5.1f}   frame {frame_ms:6.2f} ms"]
+        for section in SECTIONS:
+            samples = scene.sections[section]
+            average = sum(samples) / len(samples) if samples else 0.0
+            lines.append(f"{section:<7} {self._current.get(section, 0.0):6.2f} ms  avg {average:6.2f}")
+
+        x = PANEL_RECT.x + 8
+        y = PANEL_RECT.y + 6
+        for line in lines:
+            # Numbers change every frame, so they bypass the shared text cache
+            surface.blit(self.font.render(line, True, WHITE), (x, y))
+            y += 20
+
+        # Rolling histogram of frame times
+        counts = scene.histogram()
+        total = max(1, sum(counts))
+        bar_width = (PANEL_RECT.width - 16) // len(counts)
+        bar_bottom = PANEL_RECT.bottom - 22
+        max_height = bar_bottom - y - 4
+        for i, count in enumerate(counts):
+            height = int(max_height * count / total)
+            color = GREEN if i < 3 else YELLOW if i < 4 else RED
+            bar = pygame.Rect(x + i * bar_width, bar_bottom - height, bar_width - 4, height)
+            pygame.draw.rect(surface, color, bar)
+            label = self.font.render(BIN_LABELS[i], True, WHITE)
+            surface.blit(label, label.get_rect(midtop=(bar.centerx, bar_bottom + 2)))
+        pygame.display.update(PANEL_RECT)
+
+    def report(self):
+        """
+        Returns:
+            dict: Per-scene frame and section summaries with histograms
+        """
+        report = {}
+        for name, scene in self.scenes.items():
+            report[name] = {
+                'frames': scene.total_frames,
+                'frame': summarize(scene.frames, to_ms=1),
+                'sections': {section: summarize(samples, to_ms=1) for section, samples in scene.sections.items()},
+                'histogram': dict(zip(BIN_LABELS, scene.histogram())),
+            }
+        return report
+
+    def dump(self, path=None, **extra):
+        """
+        Save report() as JSON, with extra sections such as scene construction times.
+
+        Returns:
+            str: Path of the written file
+        """
+        if path is None:
+            path = time.strftime('frame_profile_%Y%m%d_%H%M%S.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.report(), **extra), f, indent=2)
+        print(f"Frame profile saved to {path}")
+        return path
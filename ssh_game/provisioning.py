@@ -0,0 +1,139 @@
+"""
+Bulk key provisioning for a whole class.
+Массовое создание ключей для всех студентов курса.
+
+Key pairs are generated on all CPU cores and every worker writes its own
+files, in the layout ssh-keygen uses:
+
+    <output>/<student>/id_ed25519        OpenSSH private key, mode 600
+    <output>/<student>/id_ed25519.pub    public key line, mode 644
+    <output>/<student>/authorized_keys   the student's public key, mode 600
+    <output>/authorized_keys             all public keys, for a shared demo account
+
+Usage (from the ssh_game directory):
+    python provisioning.py --students 30 --output keys
+    python provisioning.py --names students.txt --algorithm rsa-2048 --output keys
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ssh_utils
+
+# Private key file name per algorithm, as chosen by ssh-keygen
+KEY_FILE_NAMES = {
+    'rsa-1024': 'id_rsa',
+    'rsa-2048': 'id_rsa',
+    'ed25519': 'id_ed25519',
+    'ecdsa-p256': 'id_ecdsa',
+    'ecdsa-p384': 'id_ecdsa',
+}
+DEFAULT_ALGORITHM = 'ed25519'
+DEFAULT_HOST = 'ssh-game'
+# Students handed to a worker at once, larger chunks mean less inter-process traffic
+CHUNK_SIZE = 8
+
+
+def _provision_student(task):
+    # Runs in a worker process: generate one key pair and write the student's files
+    name, output_dir, algorithm, host, overwrite = task
+    student_dir = os.path.join(output_dir, name)
+    os.makedirs(student_dir, mode=0o700, exist_ok=True)
+    private_key, public_key = ssh_utils.generate_openssh_key_pair(algorithm, f"{name}@{host}")
+    key_path = os.path.join(student_dir, KEY_FILE_NAMES[algorithm])
+    ssh_utils.write_key_file(key_path, private_key, 0o600, overwrite)
+    ssh_utils.write_key_file(key_path + '.pub', public_key, 0o644, overwrite)
+    ssh_utils.write_key_file(os.path.join(student_dir, 'authorized_keys'), public_key, 0o600, overwrite)
+    return public_key
+
+
+def provision(names, output_dir, algorithm=DEFAULT_ALGORITHM, host=DEFAULT_HOST,
+              workers=None, overwrite=False):
+    """
+    Create a key pair and an authorized_keys file for every student.
+
+    Args:
+        names (list): Account names, one directory is created per name
+        output_dir (str): Directory for all key files
+        algorithm (str): One of ssh_utils.KEY_ALGORITHMS
+        host (str): Host part of the public key comments
+        workers (int): Number of processes, default is the number of CPUs
+        overwrite (bool): Replace existing key files instead of failing
+
+    Returns:
+        dict: Number of keys, elapsed seconds and keys per second
+    """
+    if algorithm not in KEY_FILE_NAMES:
+        raise ValueError(f"Unknown key algorithm {algorithm}")
+    if len(set(names)) != len(names):
+        raise ValueError("Student names must be unique")
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, mode=0o700, exist_ok=True)
+
+    start = time.perf_counter()
+    tasks = [(name, output_dir, algorithm, host, overwrite) for name in names]
+    combined_path = os.path.join(output_dir, 'authorized_keys')
+    # The shared authorized_keys file is assembled while the workers are still generating,
+    # it replaces the old one only when every student got a key
+    partial_path = combined_path + '.partial'
+    fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'w') as combined, ProcessPoolExecutor(max_workers=workers) as executor:
+            for public_key in executor.map(_provision_student, tasks, chunksize=CHUNK_SIZE):
+                combined.write(public_key)
+    except BaseException:
+        os.remove(partial_path)
+        raise
+    os.replace(partial_path, combined_path)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'keys': len(names),
+        'workers': workers,
+        'seconds': elapsed,
+        'keys_per_s': len(names) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def student_names(count, prefix='student'):
+    width = max(2, len(str(count)))
+    return [f"{prefix}{i:0{width}d}" for i in range(1, count + 1)]
+
+
+def read_names(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python provisioning.py', description="Create SSH keys for a class")
+    names = parser.add_mutually_exclusive_group(required=True)
+    names.add_argument('--students', type=int, help="Number of accounts, named student01, student02, ...")
+    names.add_argument('--names', help="File with one account name per line")
+    parser.add_argument('--prefix', default='student', help="Account name prefix for --students")
+    parser.add_argument('--output', required=True, help="Directory for the key files")
+    parser.add_argument('--algorithm', choices=sorted(KEY_FILE_NAMES), default=DEFAULT_ALGORITHM)
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Host part of the key comments")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--force', action='store_true', help="Replace existing key files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = read_names(args.names) if args.names else student_names(args.students, args.prefix)
+    try:
+        report = provision(names, args.output, args.algorithm, args.host, args.workers, args.force)
+    except FileExistsError as e:
+        print(f"Ключ уже существует: {e.filename} (используйте --force)")
+        return 1
+    print(f"Создано ключей: {report['keys']} ({args.algorithm}) в {args.output}")
+    print(f"{report['seconds']:.2f} с, {report['keys_per_s']:.1f} ключей/с, процессов: {report['workers']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
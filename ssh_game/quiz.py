@@ -2,6 +2,8 @@ import pygame
 import sys
 import random
 from pygame.locals import *
+from text_cache import render_text
+from scene_graph import SceneGraph, TextNode, ButtonNode
 
 # Constants
 SCREEN_WIDTH = 800
@@ -15,13 +17,14 @@ GRAY = (200, 200, 200)
 LIGHT_BLUE = (173, 216, 230)
 LIGHT_GREEN = (144, 238, 144)
 LIGHT_RED = (255, 182, 193)
+BUTTON_FONT_SIZE = 20
 
 class Quiz:
-    def __init__(self, screen, font_small, font_medium, font_large):
+    def __init__(self, screen, fonts):
         self.screen = screen
-        self.font_small = font_small
-        self.font_medium = font_medium
-        self.font_large = font_large
+        self.font_small = fonts.small
+        self.font_medium = fonts.medium
+        self.font_large = fonts.large
         self.current_question = 0
         self.score = 0
         self.selected_answer = None
@@ -91,14 +94,17 @@ class Quiz:
         for i in range(4):
             button_y = 250 + i * 70
             self.option_buttons.append(
-                Button(button_x, button_y, button_width, button_height, "", GRAY, LIGHT_BLUE, i)
+                Button(button_x, button_y, button_width, button_height, "", GRAY, LIGHT_BLUE, i, fonts)
             )
         
-        self.next_button = Button(SCREEN_WIDTH//2 - 100, 520, 200, 50, "Далее", GRAY, LIGHT_BLUE, self.next_question)
-        self.finish_button = Button(SCREEN_WIDTH//2 - 100, 520, 200, 50, "Завершить", GRAY, LIGHT_BLUE, None)
+        self.next_button = Button(SCREEN_WIDTH//2 - 100, 520, 200, 50, "Далее", GRAY, LIGHT_BLUE, self.next_question, fonts)
+        self.finish_button = Button(SCREEN_WIDTH//2 - 100, 520, 200, 50, "Завершить", GRAY, LIGHT_BLUE, None, fonts)
         
         # Update button text for first question
         self.update_button_text()
+        
+        self.scene = SceneGraph(WHITE)
+        self.build_scene()
     
     def update_button_text(self):
         if not self.quiz_completed:
@@ -120,6 +126,7 @@ class Quiz:
             if self.current_question == len(self.questions) - 1:
                 self.quiz_completed = True
             
+            self.build_scene()
             return True
         return False
     
@@ -131,6 +138,7 @@ class Quiz:
             self.update_button_text()
         else:
             self.quiz_completed = True
+        self.build_scene()
     
     def handle_event(self, event):
         mouse_pos = pygame.mouse.get_pos()
@@ -157,26 +165,21 @@ class Quiz:
         
         return None
     
-    def draw(self):
-        self.screen.fill(WHITE)
+    def build_scene(self):
+        # The quiz screen only changes when an answer is submitted or the question changes
+        self.scene.clear()
         
-        # Draw title
-        title = self.font_large.render("Тест на знание SSH и криптографии", True, BLACK)
-        title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 50))
-        self.screen.blit(title, title_rect)
+        # Title
+        self.scene.add(TextNode(self.font_large, "Тест на знание SSH и криптографии", BLACK, center=(SCREEN_WIDTH//2, 50)))
         
         if not self.quiz_completed:
-            # Draw question number
-            question_num = self.font_medium.render(f"Вопрос {self.current_question + 1}/{len(self.questions)}", True, BLACK)
-            question_num_rect = question_num.get_rect(center=(SCREEN_WIDTH//2, 100))
-            self.screen.blit(question_num, question_num_rect)
+            # Question number
+            self.scene.add(TextNode(self.font_medium, f"Вопрос {self.current_question + 1}/{len(self.questions)}", BLACK, center=(SCREEN_WIDTH//2, 100)))
             
-            # Draw question
-            question_text = self.font_medium.render(self.questions[self.current_question]["question"], True, BLACK)
-            question_rect = question_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-            self.screen.blit(question_text, question_rect)
+            # Question
+            self.scene.add(TextNode(self.font_medium, self.questions[self.current_question]["question"], BLACK, center=(SCREEN_WIDTH//2, 150)))
             
-            # Draw options
+            # Options
             for i, button in enumerate(self.option_buttons):
                 # Change button color based on selection and submission
                 if self.answer_submitted:
@@ -190,23 +193,19 @@ class Quiz:
                 else:
                     button.color = LIGHT_BLUE if self.selected_answer == i else GRAY
                 
-                button.draw(self.screen)
+                self.scene.add(ButtonNode(button))
             
-            # Draw next button after answer is submitted
+            # Next button after answer is submitted
             if self.answer_submitted:
-                self.next_button.draw(self.screen)
+                self.scene.add(ButtonNode(self.next_button))
         else:
-            # Draw quiz completion message
-            completion_text = self.font_large.render("Тест завершен!", True, BLACK)
-            completion_rect = completion_text.get_rect(center=(SCREEN_WIDTH//2, 200))
-            self.screen.blit(completion_text, completion_rect)
+            # Quiz completion message
+            self.scene.add(TextNode(self.font_large, "Тест завершен!", BLACK, center=(SCREEN_WIDTH//2, 200)))
             
-            # Draw score
-            score_text = self.font_large.render(f"Ваш результат: {self.score}/{len(self.questions)}", True, BLACK)
-            score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, 300))
-            self.screen.blit(score_text, score_rect)
+            # Score
+            self.scene.add(TextNode(self.font_large, f"Ваш результат: {self.score}/{len(self.questions)}", BLACK, center=(SCREEN_WIDTH//2, 300)))
             
-            # Draw feedback based on score
+            # Feedback based on score
             feedback = ""
             if self.score == len(self.questions):
                 feedback = "Отлично! Вы превосходно разбираетесь в SSH и криптографии!"
@@ -215,16 +214,18 @@ class Quiz:
             else:
                 feedback = "Рекомендуем повторить материал и пройти тест снова."
             
-            feedback_text = self.font_medium.render(feedback, True, BLACK)
-            feedback_rect = feedback_text.get_rect(center=(SCREEN_WIDTH//2, 350))
-            self.screen.blit(feedback_text, feedback_rect)
+            self.scene.add(TextNode(self.font_medium, feedback, BLACK, center=(SCREEN_WIDTH//2, 350)))
             
-            # Draw finish button
-            self.finish_button.draw(self.screen)
+            # Finish button
+            self.scene.add(ButtonNode(self.finish_button))
+    
+    def draw(self):
+        self.scene.draw(self.screen)
 
 class Button:
-    def __init__(self, x, y, width, height, text, color, hover_color, action=None):
+    def __init__(self, x, y, width, height, text, color, hover_color, action, fonts):
         self.rect = pygame.Rect(x, y, width, height)
+        self.font = fonts.get(fonts.default_face, BUTTON_FONT_SIZE)
         self.text = text
         self.color = color
         self.hover_color = hover_color
@@ -236,8 +237,7 @@ class Button:
         pygame.draw.rect(surface, color, self.rect, border_radius=10)
         pygame.draw.rect(surface, BLACK, self.rect, 2, border_radius=10)
         
-        font = pygame.font.SysFont('Arial', 20)
-        text_surface = font.render(self.text, True, BLACK)
+        text_surface = render_text(self.font, self.text, True, BLACK)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
         
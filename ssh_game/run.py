@@ -4,44 +4,59 @@ SSH Keys Educational Game Launcher
 Запускатель обучающей игры о SSH-ключах
 """
 
+import importlib.util
 import os
 import sys
-import pygame
 
-# Make sure we're in the correct directory
-script_dir = os.path.dirname(os.path.abspath(__file__))
-os.chdir(script_dir)
 
-# Add the current directory to Python path
-sys.path.insert(0, script_dir)
 
-# Check if required modules are installed
-required_modules = ['pygame', 'cryptography', 'pyOpenSSL']
-missing_modules = []
+def main():
+    # Make sure we're in the correct directory
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
 
-for module in required_modules:
+    # Add the current directory to Python path
+    sys.path.insert(0, script_dir)
+
+    # Check if required modules are installed, without importing them
+    # Import name -> pip package
+    required_modules = {
+        'pygame': 'pygame',
+        'cryptography': 'cryptography',
+        'OpenSSL': 'pyOpenSSL',
+        'numpy': 'numpy',
+        'rsa': 'rsa',
+    }
+    missing_modules = []
+
+    for module, package in required_modules.items():
+        if importlib.util.find_spec(module) is None:
+            missing_modules.append(package)
+
+    if missing_modules:
+        print("Отсутствуют необходимые модули. Установите их с помощью команды:")
+        print(f"pip install {' '.join(missing_modules)}")
+        print("\nAborting game launch.")
+        sys.exit(1)
+
+    import pygame
+
+    # Initialize pygame
+    pygame.init()
+
+    # Import and run the game
     try:
-        __import__(module)
-    except ImportError:
-        missing_modules.append(module)
-
-if missing_modules:
-    print("Отсутствуют необходимые модули. Установите их с помощью команды:")
-    print(f"pip install {' '.join(missing_modules)}")
-    print("\nAborting game launch.")
-    sys.exit(1)
-
-# Initialize pygame
-pygame.init()
-
-# Import and run the game
-try:
-    from main import Game
-    game = Game()
-    game.run()
-except Exception as e:
-    print(f"Error launching game: {e}")
-    import traceback
-    traceback.print_exc()
-    pygame.quit()
-    sys.exit(1) 
\ No newline at end of file
+        from main import Game
+        game = Game()
+        game.run()
+    except Exception as e:
+        print(f"Error launching game: {e}")
+        import traceback
+        traceback.print_exc()
+        pygame.quit()
+        sys.exit(1)
+
+
+# Process pool workers started with spawn import this file again, they must not start a game
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Retained-mode scene graph with dirty-rectangle display updates.
+Граф сцены с обновлением только изменившихся областей экрана.
+
+Static scenes describe their text and widgets once as nodes. Every frame the
+renderer asks each node for its state, redraws only the nodes whose state
+changed (e.g. a button hover) and pushes just those rectangles to the display.
+Animated scenes that still draw the whole frame report the regions they
+changed, so only those are pushed with pygame.display.update(rects).
+"""
+
+import pygame
+
+from text_cache import render_text
+
+WHITE = (255, 255, 255)
+
+
+class Node:
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+
+    def state(self):
+        # Value compared between frames, a change marks the node dirty
+        return None
+
+    def draw(self, surface):
+        pass
+
+
+class TextNode(Node):
+    def __init__(self, font, text, color, **anchor):
+        """
+        Args:
+            font (pygame.font.Font): Font to render with
+            text (str): Text to show
+            color (tuple): Text color
+            **anchor: Rect position, e.g. center=(x, y) or midleft=(x, y)
+        """
+        self.surface = render_text(font, text, True, color)
+        super().__init__(self.surface.get_rect(**anchor))
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class SurfaceNode(Node):
+    def __init__(self, image, **anchor):
+        self.surface = image
+        super().__init__(image.get_rect(**anchor))
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class ScrollNode(Node):
+    def __init__(self, image, rect, indicator_color=(200, 200, 200)):
+        """
+        Shows a vertical window into a taller pre-rendered surface.
+
+        Args:
+            image (pygame.Surface): Full content, e.g. a laid-out page
+            rect (pygame.Rect): Visible area on screen
+            indicator_color (tuple): Color of the scroll indicator
+        """
+        super().__init__(rect)
+        self.surface = image
+        self.offset = 0
+        self.indicator_color = indicator_color
+
+    @property
+    def max_offset(self):
+        return max(0, self.surface.get_height() - self.rect.height)
+
+    def scroll_by(self, dy):
+        self.offset = max(0, min(self.offset + dy, self.max_offset))
+
+    def page(self, direction):
+        # Scroll by one visible height, keeping one line of context
+        self.scroll_by(direction * max(1, self.rect.height - 20))
+
+    def state(self):
+        return self.offset
+
+    def draw(self, surface):
+        area = pygame.Rect(0, self.offset, self.rect.width, self.rect.height)
+        surface.blit(self.surface, self.rect, area)
+        if self.max_offset:
+            content_height = self.surface.get_height()
+            bar_height = self.rect.height * self.rect.height / content_height
+            bar_y = self.rect.y + self.offset * self.rect.height / content_height
+            pygame.draw.rect(surface, self.indicator_color, (self.rect.right - 5, bar_y, 5, bar_height))
+
+
+class ButtonNode(Node):
+    def __init__(self, button):
+        super().__init__(button.rect)
+        self.button = button
+
+    def state(self):
+        return (self.button.is_hovered, self.button.color, self.button.text)
+
+    def draw(self, surface):
+        self.button.draw(surface)
+
+
+class SceneGraph:
+    def __init__(self, background=WHITE):
+        self.background = background
+        self.nodes = []
+        self._states = {}
+        self._dirty = []
+        self._full_redraw = True
+
+    def add(self, node):
+        self.nodes.append(node)
+        self._dirty.append(node.rect)
+        return node
+
+    def clear(self):
+        self.nodes = []
+        self._states = {}
+        self._full_redraw = True
+
+    def invalidate(self, rect=None):
+        """
+        Mark a region for redrawing, or the whole screen when rect is None.
+        """
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def collect_dirty(self):
+        """
+        Returns:
+            list: Rects changed since the last frame, or None for a full redraw
+        """
+        rects = self._dirty
+        self._dirty = []
+        for node in self.nodes:
+            state = node.state()
+            if self._states.get(id(node), state) != state:
+                rects.append(node.rect)
+            self._states[id(node)] = state
+        if self._full_redraw:
+            self._full_redraw = False
+            return None
+        return rects
+
+    def draw(self, surface, area=None):
+        """
+        Draw the graph, limited to one area if given.
+        """
+        if area is None:
+            surface.fill(self.background)
+            for node in self.nodes:
+                node.draw(surface)
+            return
+        surface.set_clip(area)
+        surface.fill(self.background, area)
+        for node in self.nodes:
+            if node.rect.colliderect(area):
+                node.draw(surface)
+        surface.set_clip(None)
+
+
+class Renderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.current = None
+        self.frames = 0
+        self.pixels_pushed = 0
+
+    def render(self, graph):
+        """
+        Redraw and push only the changed parts of a retained scene.
+        """
+        if graph is not self.current:
+            # Whatever was on screen belonged to another scene
+            graph.invalidate()
+            self.current = graph
+        rects = graph.collect_dirty()
+        if rects is None:
+            graph.draw(self.screen)
+        else:
+            rects = self._merge(rects)
+            for rect in rects:
+                graph.draw(self.screen, rect)
+        self.present(graph, rects)
+
+    def present(self, scene, rects=None):
+        """
+        Push a frame that has already been drawn to the screen.
+
+        Args:
+            scene: Object that drew the frame, a new scene forces a full update
+            rects (list): Changed regions, None for the whole screen
+        """
+        if scene is not self.current:
+            self.current = scene
+            rects = None
+        self.frames += 1
+        if rects is None:
+            pygame.display.flip()
+            self.pixels_pushed += self.screen.get_width() * self.screen.get_height()
+        elif rects:
+            pygame.display.update(rects)
+            self.pixels_pushed += sum(rect.width * rect.height for rect in rects)
+
+    def reset(self):
+        self.current = None
+
+    @staticmethod
+    def _merge(rects):
+        # Overlapping rects are joined so no area is redrawn twice
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            for i, other in enumerate(merged):
+                if rect.colliderect(other):
+                    merged[i] = other.union(rect)
+                    break
+            else:
+                merged.append(rect)
+        return merged
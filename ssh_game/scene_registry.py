@@ -0,0 +1,87 @@
+"""
+Lazy scene registry.
+Реестр сцен, создаваемых при первом входе.
+
+Each scene is registered with a factory and is constructed the first time
+it is entered. On exit a scene is either kept or unloaded, an unloaded
+scene frees its surfaces and particle arrays and starts fresh on the next
+entry. Construction times are recorded per scene.
+"""
+
+import time
+
+# What happens to a scene when the player leaves it
+KEEP = 'keep'
+UNLOAD = 'unload'
+
+
+class SceneRegistry:
+    def __init__(self):
+        self._factories = {}
+        self._scenes = {}
+        self.construction = {}  # key -> list of construction times in seconds
+
+    def register(self, key, name, factory, on_exit=KEEP):
+        """
+        Args:
+            key: Game state the scene belongs to
+            name (str): Name used in reports
+            factory (callable): Builds the scene, called without arguments
+            on_exit (str): KEEP or UNLOAD
+        """
+        self._factories[key] = (name, factory, on_exit)
+
+    def __contains__(self, key):
+        return key in self._factories
+
+    def loaded(self, key):
+        return key in self._scenes
+
+    def get(self, key):
+        """
+        Return the scene, constructing it on first use.
+        """
+        scene = self._scenes.get(key)
+        if scene is None:
+            _, factory, _ = self._factories[key]
+            start = time.perf_counter()
+            scene = self._scenes[key] = factory()
+            self.construction.setdefault(key, []).append(time.perf_counter() - start)
+        return scene
+
+    def exit(self, key):
+        """
+        Called when the player leaves a scene. Scenes may define on_exit()
+        to stop their timers and background jobs.
+        """
+        scene = self._scenes.get(key)
+        if scene is None:
+            return
+        if hasattr(scene, 'on_exit'):
+            scene.on_exit()
+        if self._factories[key][2] == UNLOAD:
+            del self._scenes[key]
+
+    def unload(self, key):
+        scene = self._scenes.pop(key, None)
+        if scene is not None and hasattr(scene, 'on_exit'):
+            scene.on_exit()
+
+    def unload_all(self):
+        for key in list(self._scenes):
+            self.unload(key)
+
+    def report(self):
+        """
+        Returns:
+            dict: Scene name -> construction count, last and total time in milliseconds
+        """
+        report = {}
+        for key, samples in self.construction.items():
+            report[self._factories[key][0]] = {
+                'constructed': len(samples),
+                'last_ms': samples[-1] * 1000,
+                'total_ms': sum(samples) * 1000,
+                'loaded': key in self._scenes,
+            }
+        return report
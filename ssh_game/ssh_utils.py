@@ -1,7 +1,21 @@
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
+"""
+SSH key helpers (RSA, ECDSA, Ed25519) for the game, scripts and the grading server.
+Вспомогательные функции для работы с ключами RSA, ECDSA и Ed25519.
+
+Importing this module does not load pygame or cryptography, the
+cryptography modules are imported on first use. Parsed keys are kept in an
+LRU cache keyed by the digest of their PEM text, callers that use a key
+many times can also keep the KeyHandle returned by load_*_key().
+"""
+
+import base64
+import functools
+import hashlib
+import mmap
 import os
+import threading
+import time
+from collections import OrderedDict
 
 def generate_rsa_key_pair(key_size=2048):
     """
@@ -13,6 +27,10 @@ def generate_rsa_key_pair(key_size=2048):
     Returns:
         tuple: (private_key, public_key) as PEM-encoded strings
     """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.backends import default_backend
+    
     # Generate private key
     private_key = rsa.generate_private_key(
         public_exponent=65537,
@@ -38,6 +56,130 @@ def generate_rsa_key_pair(key_size=2048):
     
     return private_pem.decode('utf-8'), public_pem.decode('utf-8')
 
+def _serialize_key_pair(private_key):
+    from cryptography.hazmat.primitives import serialization
+    
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode('utf-8'), public_pem.decode('utf-8')
+
+def generate_ed25519_key_pair():
+    """
+    Generate an Ed25519 key pair, the default key type of modern OpenSSH.
+    
+    Returns:
+        tuple: (private_key, public_key) as PEM-encoded strings
+    """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    
+    return _serialize_key_pair(ed25519.Ed25519PrivateKey.generate())
+
+def generate_ecdsa_key_pair(curve='P-256'):
+    """
+    Generate an ECDSA key pair.
+    
+    Args:
+        curve (str): 'P-256' or 'P-384'
+        
+    Returns:
+        tuple: (private_key, public_key) as PEM-encoded strings
+    """
+    from cryptography.hazmat.primitives.asymmetric import ec
+    
+    curves = {'P-256': ec.SECP256R1, 'P-384': ec.SECP384R1}
+    if curve not in curves:
+        raise ValueError(f"Unsupported curve {curve}, use one of {', '.join(curves)}")
+    return _serialize_key_pair(ec.generate_private_key(curves[curve]()))
+
+# Algorithm name -> key pair generator
+KEY_ALGORITHMS = {
+    'rsa-1024': lambda: generate_rsa_key_pair(1024),
+    'rsa-2048': lambda: generate_rsa_key_pair(2048),
+    'ed25519': generate_ed25519_key_pair,
+    'ecdsa-p256': lambda: generate_ecdsa_key_pair('P-256'),
+    'ecdsa-p384': lambda: generate_ecdsa_key_pair('P-384'),
+}
+
+def generate_key_pair(algorithm='ed25519'):
+    """
+    Generate a key pair of any supported algorithm.
+    
+    Args:
+        algorithm (str): One of KEY_ALGORITHMS, e.g. 'ed25519' or 'rsa-2048'
+        
+    Returns:
+        tuple: (private_key, public_key) as PEM-encoded strings
+    """
+    if algorithm not in KEY_ALGORITHMS:
+        raise ValueError(f"Unknown key algorithm {algorithm}")
+    return KEY_ALGORITHMS[algorithm]()
+
+def _new_private_key(algorithm):
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    
+    if algorithm not in KEY_ALGORITHMS:
+        raise ValueError(f"Unknown key algorithm {algorithm}")
+    if algorithm == 'ed25519':
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm.startswith('ecdsa'):
+        curve = ec.SECP384R1 if algorithm == 'ecdsa-p384' else ec.SECP256R1
+        return ec.generate_private_key(curve())
+    return rsa.generate_private_key(public_exponent=65537, key_size=int(algorithm.split('-')[1]))
+
+def generate_openssh_key_pair(algorithm='ed25519', comment=''):
+    """
+    Generate a key pair in the formats written by ssh-keygen.
+    
+    Args:
+        algorithm (str): One of KEY_ALGORITHMS
+        comment (str): Comment appended to the public key line, e.g. "student01@course"
+        
+    Returns:
+        tuple: (private_key, public_key), the private key in the
+            "OPENSSH PRIVATE KEY" format and the public key as one authorized_keys line
+    """
+    from cryptography.hazmat.primitives import serialization
+    
+    private_key = _new_private_key(algorithm)
+    private_openssh = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.OpenSSH,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode('utf-8')
+    public_openssh = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.OpenSSH,
+        format=serialization.PublicFormat.OpenSSH
+    ).decode('ascii')
+    if comment:
+        public_openssh = f"{public_openssh} {comment}"
+    return private_openssh, public_openssh + '\n'
+
+def write_key_file(path, data, mode=0o600, overwrite=True):
+    """
+    Write a key file that has its permissions from the moment it is created,
+    so a private key is never readable by others, not even briefly.
+    
+    Args:
+        path (str): File path
+        data (str): File contents
+        mode (int): Permission bits, 0o600 for private keys and authorized_keys
+        overwrite (bool): False to raise FileExistsError instead of replacing a file
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if overwrite else os.O_EXCL)
+    fd = os.open(path, flags, mode)
+    with os.fdopen(fd, 'w') as f:
+        # An existing file keeps its old mode and the umask may have cleared bits
+        if os.name == 'posix':
+            os.fchmod(fd, mode)
+        f.write(data)
+
 def save_key_pair(private_key, public_key, private_path, public_path):
     """
     Save the key pair to files.
@@ -48,15 +190,542 @@ def save_key_pair(private_key, public_key, private_path, public_path):
         private_path (str): Path to save the private key
         public_path (str): Path to save the public key
     """
-    with open(private_path, 'w') as f:
-        f.write(private_key)
+    write_key_file(private_path, private_key, 0o600)
+    write_key_file(public_path, public_key, 0o644)
+
+# Number of parsed keys kept by the key cache
+KEY_CACHE_SIZE = 64
+
+_crypto = None
+
+def _load_crypto():
+    """
+    Import the cryptography modules once, on first use.
+
+    Returns:
+        SimpleNamespace: cryptography modules and reusable padding objects
+    """
+    global _crypto
+    if _crypto is None:
+        from types import SimpleNamespace
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding
+        
+        _crypto = SimpleNamespace(
+            serialization=serialization,
+            hashes=hashes,
+            ec=ec,
+            ed25519=ed25519,
+            pkcs1v15=padding.PKCS1v15(),
+            oaep=padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                algorithm=hashes.SHA256(),
+                label=None
+            )
+        )
+    return _crypto
+
+class KeyHandle:
+    def __init__(self, key, private):
+        """
+        A parsed key that can be reused for many operations.
+        Create handles with load_public_key() / load_private_key().
+        
+        Args:
+            key: cryptography RSA, ECDSA or Ed25519 key object
+            private (bool): True for a private key
+        """
+        self.key = key
+        self.private = private
+        self._fingerprint = None  # Set by fingerprint() on first use
+    
+    @property
+    def key_size(self):
+        if self.algorithm == 'ed25519':
+            return 256
+        return self.key.key_size
+    
+    @property
+    def algorithm(self):
+        crypto = _load_crypto()
+        if isinstance(self.key, (crypto.ed25519.Ed25519PrivateKey, crypto.ed25519.Ed25519PublicKey)):
+            return 'ed25519'
+        if isinstance(self.key, (crypto.ec.EllipticCurvePrivateKey, crypto.ec.EllipticCurvePublicKey)):
+            return f"ecdsa-p{self.key.curve.key_size}"
+        return f"rsa-{self.key.key_size}"
+    
+    def _signature_args(self):
+        # Hashes as used by SSH: rsa-sha2-256, ecdsa-sha2-nistp256/384, Ed25519 hashes internally
+        crypto = _load_crypto()
+        algorithm = self.algorithm
+        if algorithm == 'ed25519':
+            return ()
+        if algorithm.startswith('ecdsa'):
+            hash_type = crypto.hashes.SHA384 if algorithm == 'ecdsa-p384' else crypto.hashes.SHA256
+            return (crypto.ec.ECDSA(hash_type()),)
+        return (crypto.pkcs1v15, crypto.hashes.SHA256())
+    
+    def sign(self, message):
+        """
+        Args:
+            message (str or bytes): The message to sign
+            
+        Returns:
+            bytes: The signature
+        """
+        if not self.private:
+            raise ValueError("Signing needs a private key")
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        return self.key.sign(message, *self._signature_args())
+    
+    def verify(self, message, signature):
+        """
+        Returns:
+            bool: True if the signature was made by this key pair for this message
+        """
+        from cryptography.exceptions import InvalidSignature
+        
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        public_key = self.key.public_key() if self.private else self.key
+        try:
+            public_key.verify(signature, message, *self._signature_args())
+        except InvalidSignature:
+            return False
+        return True
+    
+    def public_key(self):
+        """
+        Returns:
+            KeyHandle: Handle of the public half of this key
+        """
+        if not self.private:
+            return self
+        return KeyHandle(self.key.public_key(), private=False)
+    
+    def encrypt(self, message):
+        """
+        Encrypt a message with RSA-OAEP, a private key encrypts with its public half.
+        
+        Args:
+            message (str): The message to encrypt
+            
+        Returns:
+            bytes: The encrypted message
+        """
+        return self.encrypt_bytes(message.encode('utf-8'))
+    
+    def encrypt_bytes(self, data):
+        public_key = self.key.public_key() if self.private else self.key
+        return public_key.encrypt(data, _load_crypto().oaep)
     
-    with open(public_path, 'w') as f:
-        f.write(public_key)
+    def decrypt(self, encrypted_message):
+        """
+        Args:
+            encrypted_message (bytes): The encrypted message
+            
+        Returns:
+            str: The decrypted message
+        """
+        return self.decrypt_bytes(encrypted_message).decode('utf-8')
     
-    # Set appropriate permissions for private key (Unix-like systems)
-    if os.name == 'posix':
-        os.chmod(private_path, 0o600)
+    def decrypt_bytes(self, data):
+        if not self.private:
+            raise ValueError("Decryption needs a private key")
+        return self.key.decrypt(data, _load_crypto().oaep)
+
+class KeyCache:
+    def __init__(self, max_size=KEY_CACHE_SIZE):
+        """
+        LRU cache of parsed keys, keyed by the SHA-256 digest of the PEM text
+        so the cache does not keep copies of private key PEMs.
+        
+        Args:
+            max_size (int): Maximum number of cached keys
+        """
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()  # Keys are loaded from worker threads too
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def load(self, key_pem, private):
+        """
+        Return the handle for a key, parsing it only on a cache miss.
+        
+        Args:
+            key_pem (str or bytes): PEM-encoded key, OpenSSH private key or public key line
+            private (bool): True to load a private key
+            
+        Returns:
+            KeyHandle: The parsed key
+        """
+        if isinstance(key_pem, str):
+            key_pem = key_pem.encode('utf-8')
+        cache_key = (hashlib.sha256(key_pem).digest(), private)
+        with self._lock:
+            handle = self._keys.get(cache_key)
+            if handle is not None:
+                self.hits += 1
+                self._keys.move_to_end(cache_key)
+                return handle
+            self.misses += 1
+        
+        # Parsing runs outside the lock, two threads may parse the same key once each
+        serialization = _load_crypto().serialization
+        if private and key_pem.lstrip().startswith(b'-----BEGIN OPENSSH'):
+            key = serialization.load_ssh_private_key(key_pem, password=None)
+        elif private:
+            key = serialization.load_pem_private_key(key_pem, password=None)
+        elif not key_pem.lstrip().startswith(b'-----'):
+            key = serialization.load_ssh_public_key(key_pem.strip())
+        else:
+            key = serialization.load_pem_public_key(key_pem)
+        handle = KeyHandle(key, private)
+        
+        with self._lock:
+            self._keys[cache_key] = handle
+            self._keys.move_to_end(cache_key)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+                self.evictions += 1
+        return handle
+    
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+    
+    def stats(self):
+        """
+        Returns:
+            dict: Cache size and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._keys),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+# Cache shared by all callers of this module
+key_cache = KeyCache()
+
+def load_public_key(public_key_pem):
+    """
+    Parse a PEM public key once and return a reusable handle.
+    
+    Args:
+        public_key_pem (str): PEM-encoded public key
+        
+    Returns:
+        KeyHandle: The parsed key
+    """
+    return key_cache.load(public_key_pem, private=False)
+
+def load_private_key(private_key_pem):
+    """
+    Parse a PEM private key once and return a reusable handle.
+    
+    Args:
+        private_key_pem (str): PEM-encoded private key
+        
+    Returns:
+        KeyHandle: The parsed key
+    """
+    return key_cache.load(private_key_pem, private=True)
+
+def key_cache_stats():
+    return key_cache.stats()
+
+def sign_message(message, private_key_pem):
+    """
+    Sign a message with a private key of any supported algorithm.
+    
+    Args:
+        message (str or bytes): The message to sign
+        private_key_pem (str or KeyHandle): PEM-encoded private key or a loaded key
+        
+    Returns:
+        bytes: The signature
+    """
+    if not isinstance(private_key_pem, KeyHandle):
+        private_key_pem = load_private_key(private_key_pem)
+    return private_key_pem.sign(message)
+
+def verify_signature(message, signature, public_key_pem):
+    """
+    Args:
+        message (str or bytes): The signed message
+        signature (bytes): Signature from sign_message
+        public_key_pem (str or KeyHandle): PEM-encoded public key or a loaded key
+        
+    Returns:
+        bool: True if the signature is valid
+    """
+    if not isinstance(public_key_pem, KeyHandle):
+        public_key_pem = load_public_key(public_key_pem)
+    return public_key_pem.verify(message, signature)
+
+def format_public_key_openssh(public_key_pem):
+    """
+    Returns:
+        str: The public key as one OpenSSH line, e.g. "ssh-ed25519 AAAA..."
+    """
+    if not isinstance(public_key_pem, KeyHandle):
+        public_key_pem = load_public_key(public_key_pem)
+    serialization = _load_crypto().serialization
+    return public_key_pem.public_key().key.public_bytes(
+        encoding=serialization.Encoding.OpenSSH,
+        format=serialization.PublicFormat.OpenSSH
+    ).decode('ascii')
+
+def public_key_blob(public_key):
+    """
+    Args:
+        public_key (str or KeyHandle): OpenSSH public key line or PEM-encoded public key
+        
+    Returns:
+        bytes: The key in the SSH wire format, the data fingerprints are computed from
+    """
+    if isinstance(public_key, KeyHandle) or public_key.lstrip().startswith('-----'):
+        public_key = format_public_key_openssh(public_key)
+    return base64.b64decode(public_key.split()[1])
+
+def blob_fingerprint(blob):
+    """
+    Args:
+        blob (bytes): Public key in the SSH wire format (base64-decoded authorized_keys field)
+        
+    Returns:
+        str: The fingerprint printed by ssh-keygen -l, e.g. "SHA256:nThbg6kX..."
+    """
+    digest = hashlib.sha256(blob).digest()
+    return 'SHA256:' + base64.b64encode(digest).decode('ascii').rstrip('=')
+
+# Number of key strings whose fingerprints are remembered
+FINGERPRINT_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def _text_fingerprint(public_key):
+    return blob_fingerprint(public_key_blob(public_key))
+
+def fingerprint(public_key):
+    """
+    OpenSSH SHA256 fingerprint of a public key. The result is memoized on a
+    KeyHandle and for the most recently used key strings, so matching the
+    same key again does not convert or hash it again.
+    
+    Args:
+        public_key (str or KeyHandle): OpenSSH public key line, PEM-encoded public key or a loaded key
+        
+    Returns:
+        str: The fingerprint printed by ssh-keygen -l, e.g. "SHA256:nThbg6kX..."
+    """
+    if isinstance(public_key, KeyHandle):
+        if public_key._fingerprint is None:
+            public_key._fingerprint = blob_fingerprint(public_key_blob(public_key))
+        return public_key._fingerprint
+    return _text_fingerprint(public_key)
+
+# An authorized_keys entry starts with one of these key types, anything before it is the options field
+SSH_KEY_TYPE_PREFIXES = (b'ssh-', b'ecdsa-sha2-', b'sk-ssh-', b'sk-ecdsa-')
+
+class AuthorizedKey:
+    __slots__ = ('options', 'key_type', 'blob', 'comment', 'line_number')
+    
+    def __init__(self, options, key_type, blob, comment, line_number):
+        """
+        One authorized_keys entry.
+        
+        Args:
+            options (str): Options field, e.g. 'no-pty,command="ls"', None without options
+            key_type (str): Key type, e.g. 'ssh-ed25519'
+            blob (bytes): Base64-encoded key as written in the file
+            comment (str): Comment after the key, None without a comment
+            line_number (int): Line in the file, starting at 1
+        """
+        self.options = options
+        self.key_type = key_type
+        self.blob = blob
+        self.comment = comment
+        self.line_number = line_number
+    
+    def __repr__(self):
+        return f"AuthorizedKey({self.key_type!r}, line {self.line_number}, {self.comment!r})"
+    
+    @property
+    def public_key(self):
+        return f"{self.key_type} {self.blob.decode('ascii')}"
+    
+    @property
+    def fingerprint(self):
+        return blob_fingerprint(base64.b64decode(self.blob))
+
+def _split_options(line):
+    # Options may contain quoted spaces: command="echo a b",no-pty ssh-ed25519 AAAA...
+    position = 0
+    while True:
+        space = line.find(b' ', position)
+        quote = line.find(b'"', position)
+        if space == -1:
+            return line, b''
+        if quote == -1 or space < quote:
+            return line[:space], line[space + 1:].lstrip()
+        closing = line.find(b'"', quote + 1)
+        while closing > 0 and line[closing - 1] == 0x5c:  # \" inside a quoted value
+            closing = line.find(b'"', closing + 1)
+        if closing == -1:
+            return line, b''
+        position = closing + 1
+
+def parse_authorized_key_line(line, line_number=0):
+    """
+    Args:
+        line (bytes): One line of an authorized_keys file
+        line_number (int): Line number stored in the entry
+        
+    Returns:
+        AuthorizedKey: The entry, None for blank, comment and malformed lines (sshd skips those too)
+    """
+    line = line.strip()
+    if not line or line.startswith(b'#'):
+        return None
+    options = None
+    if not line.startswith(SSH_KEY_TYPE_PREFIXES):
+        options, line = _split_options(line)
+        options = options.decode('utf-8', 'replace')
+    fields = line.split(None, 2)
+    if len(fields) < 2 or not fields[0].startswith(SSH_KEY_TYPE_PREFIXES):
+        return None
+    comment = fields[2].decode('utf-8', 'replace') if len(fields) > 2 else None
+    return AuthorizedKey(options, fields[0].decode('ascii'), fields[1], comment, line_number)
+
+def iter_authorized_keys(path):
+    """
+    Iterate over the entries of an authorized_keys file. The file is
+    memory-mapped and parsed one line at a time, so only the current line
+    is turned into Python objects, even for files with 100k+ entries.
+    
+    Args:
+        path (str): Path to the authorized_keys file
+        
+    Yields:
+        AuthorizedKey: Entries in file order
+    """
+    with open(path, 'rb') as f:
+        # An empty file cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            start = 0
+            line_number = 0
+            while start < size:
+                end = mapped.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line_number += 1
+                entry = parse_authorized_key_line(mapped[start:end], line_number)
+                if entry is not None:
+                    yield entry
+                start = end + 1
+
+def _authorized_blob(public_key):
+    if isinstance(public_key, AuthorizedKey):
+        return public_key.blob
+    if isinstance(public_key, KeyHandle) or public_key.lstrip().startswith('-----'):
+        return format_public_key_openssh(public_key).split()[1].encode('ascii')
+    entry = parse_authorized_key_line(public_key.encode('utf-8'))
+    if entry is None:
+        raise ValueError("Not a public key")
+    return entry.blob
+
+class AuthorizedKeysIndex:
+    def __init__(self, entries=()):
+        """
+        Set of authorized_keys entries keyed by their base64 key blob, so a
+        presented key is matched with one dict lookup without decoding or
+        hashing the stored keys.
+        
+        Args:
+            entries (iterable): AuthorizedKey entries, the first of duplicate keys is kept
+        """
+        self._entries = {}
+        for entry in entries:
+            self.add(entry)
+    
+    @classmethod
+    def from_file(cls, path):
+        return cls(iter_authorized_keys(path))
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, public_key):
+        return self.find(public_key) is not None
+    
+    def add(self, entry):
+        """
+        Args:
+            entry (AuthorizedKey or str): Parsed entry or an authorized_keys line
+        """
+        if not isinstance(entry, AuthorizedKey):
+            entry = parse_authorized_key_line(entry.encode('utf-8'))
+            if entry is None:
+                raise ValueError("Not an authorized_keys entry")
+        self._entries.setdefault(entry.blob, entry)
+    
+    def find(self, public_key):
+        """
+        Args:
+            public_key (str, KeyHandle or AuthorizedKey): OpenSSH public key line,
+                authorized_keys line, PEM-encoded public key or a loaded key
+                
+        Returns:
+            AuthorizedKey: The matching entry with its options, None if the key is not authorized
+        """
+        return self._entries.get(_authorized_blob(public_key))
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+def measure_key_algorithms(algorithms=tuple(KEY_ALGORITHMS), generate_repeat=3, sign_repeat=20):
+    """
+    Measure key generation, signing and verification of each algorithm.
+    
+    Args:
+        algorithms (iterable): Names from KEY_ALGORITHMS
+        generate_repeat (int): Key pairs generated per algorithm
+        sign_repeat (int): Signatures made and verified per algorithm
+        
+    Returns:
+        dict: Algorithm -> median 'generate_ms', 'sign_ms' and 'verify_ms'
+    """
+    message = b"SSH key algorithm benchmark"
+    timings = {}
+    for algorithm in algorithms:
+        generate_ms = _median_ms(lambda: generate_key_pair(algorithm), generate_repeat)
+        private_pem, public_pem = generate_key_pair(algorithm)
+        private_key = load_private_key(private_pem)
+        public_key = load_public_key(public_pem)
+        signature = private_key.sign(message)
+        timings[algorithm] = {
+            'generate_ms': generate_ms,
+            'sign_ms': _median_ms(lambda: private_key.sign(message), sign_repeat),
+            'verify_ms': _median_ms(lambda: public_key.verify(message, signature), sign_repeat),
+        }
+    return timings
 
 def encrypt_message(message, public_key_pem):
     """
@@ -67,31 +736,14 @@ def encrypt_message(message, public_key_pem):
     
     Args:
         message (str): The message to encrypt
-        public_key_pem (str): PEM-encoded public key
+        public_key_pem (str or KeyHandle): PEM-encoded public key or a loaded key
         
     Returns:
         bytes: The encrypted message
     """
-    from cryptography.hazmat.primitives.asymmetric import padding
-    from cryptography.hazmat.primitives import hashes
-    
-    # Load the public key
-    public_key = serialization.load_pem_public_key(
-        public_key_pem.encode('utf-8'),
-        backend=default_backend()
-    )
-    
-    # Encrypt the message
-    encrypted = public_key.encrypt(
-        message.encode('utf-8'),
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
-    )
-    
-    return encrypted
+    if not isinstance(public_key_pem, KeyHandle):
+        public_key_pem = load_public_key(public_key_pem)
+    return public_key_pem.encrypt(message)
 
 def decrypt_message(encrypted_message, private_key_pem):
     """
@@ -99,32 +751,232 @@ def decrypt_message(encrypted_message, private_key_pem):
     
     Args:
         encrypted_message (bytes): The encrypted message
-        private_key_pem (str): PEM-encoded private key
+        private_key_pem (str or KeyHandle): PEM-encoded private key or a loaded key
         
     Returns:
         str: The decrypted message
     """
-    from cryptography.hazmat.primitives.asymmetric import padding
-    from cryptography.hazmat.primitives import hashes
+    if not isinstance(private_key_pem, KeyHandle):
+        private_key_pem = load_private_key(private_key_pem)
+    return private_key_pem.decrypt(encrypted_message)
+
+# Hybrid encryption: a random symmetric key encrypts the data in chunks and
+# RSA-OAEP encrypts only that key, so the data can be of any size.
+#
+# Format: header, then frames of 4-byte length + AEAD ciphertext.
+# Header: magic, algorithm id, chunk size, nonce prefix, wrapped key length, wrapped key.
+# The header is authenticated with every chunk. The nonce is the prefix, the chunk
+# number and a last-chunk flag, so reordered, dropped or truncated chunks fail to decrypt.
+HYBRID_MAGIC = b'SGH1'
+HYBRID_ALGORITHMS = {'aes-gcm': 1, 'chacha20-poly1305': 2}
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+LAST_FRAME = 0x80000000
+_TAG_SIZE = 16
+_NONCE_PREFIX_SIZE = 7
+
+def _aead(algorithm_id, key):
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
     
-    # Load the private key
-    private_key = serialization.load_pem_private_key(
-        private_key_pem.encode('utf-8'),
-        password=None,
-        backend=default_backend()
-    )
+    if algorithm_id == HYBRID_ALGORITHMS['aes-gcm']:
+        return AESGCM(key)
+    if algorithm_id == HYBRID_ALGORITHMS['chacha20-poly1305']:
+        return ChaCha20Poly1305(key)
+    raise ValueError(f"Unknown hybrid algorithm id {algorithm_id}")
+
+def _chunk_nonce(prefix, index, last):
+    return prefix + index.to_bytes(4, 'big') + (b'\x01' if last else b'\x00')
+
+def _rechunk(chunks, chunk_size):
+    # Regroup an iterable of byte strings into pieces of exactly chunk_size (the last may be shorter)
+    buffer = bytearray()
+    for data in chunks:
+        if not buffer and len(data) == chunk_size:
+            yield bytes(data)  # Blocks already of the right size are passed through
+            continue
+        buffer += data
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    yield bytes(buffer)
+
+def encrypt_stream(chunks, public_key, chunk_size=DEFAULT_CHUNK_SIZE, algorithm='aes-gcm'):
+    """
+    Encrypt data of any size with a fresh symmetric key wrapped by RSA-OAEP.
+    Memory use is bounded by a few chunks, whatever the total size.
     
-    # Decrypt the message
-    decrypted = private_key.decrypt(
-        encrypted_message,
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
-    )
+    Args:
+        chunks (iterable): Byte strings of any size, e.g. a file read in blocks
+        public_key (str or KeyHandle): PEM-encoded public key or a loaded key
+        chunk_size (int): Plaintext bytes per encrypted chunk
+        algorithm (str): 'aes-gcm' or 'chacha20-poly1305'
+        
+    Yields:
+        bytes: The header, then one frame per chunk
+    """
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    algorithm_id = HYBRID_ALGORITHMS[algorithm]
+    if not isinstance(public_key, KeyHandle):
+        public_key = load_public_key(public_key)
+    
+    data_key = os.urandom(32)
+    nonce_prefix = os.urandom(_NONCE_PREFIX_SIZE)
+    wrapped_key = public_key.encrypt_bytes(data_key)
+    header = (HYBRID_MAGIC + bytes([algorithm_id]) + chunk_size.to_bytes(4, 'big') + nonce_prefix
+              + len(wrapped_key).to_bytes(2, 'big') + wrapped_key)
+    yield header
     
-    return decrypted.decode('utf-8')
+    aead = _aead(algorithm_id, data_key)
+    pieces = _rechunk(chunks, chunk_size)
+    piece = next(pieces)
+    index = 0
+    # One chunk of lookahead tells whether the current chunk is the last one
+    for next_piece in pieces:
+        if not next_piece:
+            break
+        ciphertext = aead.encrypt(_chunk_nonce(nonce_prefix, index, False), piece, header)
+        yield len(ciphertext).to_bytes(4, 'big') + ciphertext
+        piece = next_piece
+        index += 1
+    ciphertext = aead.encrypt(_chunk_nonce(nonce_prefix, index, True), piece, header)
+    yield (len(ciphertext) | LAST_FRAME).to_bytes(4, 'big') + ciphertext
+
+class _StreamReader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+    
+    def read(self, size):
+        if not self._buffer:
+            # Fast path: the next input block is exactly the requested piece
+            data = next(self._chunks, b'')
+            if len(data) == size:
+                return bytes(data)
+            self._buffer += data
+        while len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                raise ValueError("Encrypted stream is truncated") from None
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+    
+    def at_end(self):
+        while not self._buffer:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                return True
+        return False
+
+def decrypt_stream(chunks, private_key):
+    """
+    Decrypt data produced by encrypt_stream, one chunk at a time.
+    
+    Args:
+        chunks (iterable): Byte strings of the encrypted stream, split anywhere
+        private_key (str or KeyHandle): PEM-encoded private key or a loaded key
+        
+    Yields:
+        bytes: Decrypted chunks
+        
+    Raises:
+        ValueError: If the stream is malformed, truncated or was modified
+    """
+    from cryptography.exceptions import InvalidTag
+    
+    if not isinstance(private_key, KeyHandle):
+        private_key = load_private_key(private_key)
+    reader = _StreamReader(chunks)
+    
+    fixed = reader.read(len(HYBRID_MAGIC) + 1 + 4 + _NONCE_PREFIX_SIZE + 2)
+    if not fixed.startswith(HYBRID_MAGIC):
+        raise ValueError("Not a hybrid encrypted stream")
+    position = len(HYBRID_MAGIC)
+    algorithm_id = fixed[position]
+    chunk_size = int.from_bytes(fixed[position + 1:position + 5], 'big')
+    nonce_prefix = fixed[position + 5:position + 5 + _NONCE_PREFIX_SIZE]
+    wrapped_key = reader.read(int.from_bytes(fixed[-2:], 'big'))
+    header = fixed + wrapped_key
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError("Invalid chunk size in the stream header")
+    
+    aead = _aead(algorithm_id, private_key.decrypt_bytes(wrapped_key))
+    index = 0
+    while True:
+        frame = int.from_bytes(reader.read(4), 'big')
+        last = bool(frame & LAST_FRAME)
+        length = frame & ~LAST_FRAME
+        if length > chunk_size + _TAG_SIZE:
+            raise ValueError("Encrypted chunk is larger than the chunk size")
+        try:
+            yield aead.decrypt(_chunk_nonce(nonce_prefix, index, last), reader.read(length), header)
+        except InvalidTag:
+            raise ValueError("Encrypted chunk failed authentication") from None
+        if last:
+            break
+        index += 1
+    if not reader.at_end():
+        raise ValueError("Unexpected data after the last encrypted chunk")
+
+def hybrid_encrypt(message, public_key, algorithm='aes-gcm'):
+    """
+    Encrypt a message of any length, see encrypt_stream.
+    
+    Args:
+        message (str or bytes): The message to encrypt
+        public_key (str or KeyHandle): PEM-encoded public key or a loaded key
+        
+    Returns:
+        bytes: The encrypted message
+    """
+    if isinstance(message, str):
+        message = message.encode('utf-8')
+    return b''.join(encrypt_stream([message], public_key, algorithm=algorithm))
+
+def hybrid_decrypt(encrypted_message, private_key):
+    """
+    Returns:
+        bytes: The message encrypted with hybrid_encrypt
+    """
+    return b''.join(decrypt_stream([encrypted_message], private_key))
+
+def _read_blocks(f, size):
+    return iter(lambda: f.read(size), b'')
+
+def encrypt_file(source_path, target_path, public_key, chunk_size=DEFAULT_CHUNK_SIZE, algorithm='aes-gcm'):
+    """
+    Encrypt a file of any size with bounded memory.
+    
+    Returns:
+        int: Number of bytes written
+    """
+    written = 0
+    with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+        for data in encrypt_stream(_read_blocks(source, chunk_size), public_key, chunk_size, algorithm):
+            target.write(data)
+            written += len(data)
+    return written
+
+def decrypt_file(source_path, target_path, private_key):
+    """
+    Decrypt a file written by encrypt_file. The target is removed if decryption fails.
+    
+    Returns:
+        int: Number of bytes written
+    """
+    written = 0
+    try:
+        with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+            for data in decrypt_stream(_read_blocks(source, DEFAULT_CHUNK_SIZE), private_key):
+                target.write(data)
+                written += len(data)
+    except ValueError:
+        os.remove(target_path)
+        raise
+    return written
 
 def format_key_for_display(key_pem, max_chars_per_line=50):
     """
@@ -0,0 +1,57 @@
+"""
+Process pool jobs under the spawn start method, used on macOS and Windows.
+Run from the ssh_game directory:
+    python -m unittest discover tests
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+import workers
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait(job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not job.done():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Process job did not finish")
+        time.sleep(0.01)
+    return job.result()
+
+
+class SpawnProcessPoolTest(unittest.TestCase):
+    def setUp(self):
+        workers.shutdown()
+        self.context = workers.PROCESS_CONTEXT
+        workers.PROCESS_CONTEXT = multiprocessing.get_context('spawn')
+
+    def tearDown(self):
+        workers.shutdown()
+        workers.PROCESS_CONTEXT = self.context
+
+    def test_submit_process_runs_in_another_process(self):
+        self.assertNotEqual(wait(workers.submit_process(os.getpid)), os.getpid())
+
+    def test_submit_process_generates_keys(self):
+        import auth_server
+        report = wait(workers.submit_process(auth_server.load_test, 3, 'ed25519'))
+        self.assertEqual(report['count'], 3)
+
+    def test_launcher_does_not_start_a_game_when_imported(self):
+        # Spawned workers import the launcher as __mp_main__
+        code = ("import runpy, sys; runpy.run_path('run.py', run_name='__mp_main__'); "
+                "print('pygame' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=GAME_DIR, capture_output=True,
+                                text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Shared cache of rendered text surfaces.
+Общий кэш отрисованных текстовых поверхностей.
+
+Static text (titles, lessons, stage messages) is rendered once and reused on
+every frame instead of calling font.render() 60 times per second.
+Cached surfaces are shared, callers must only blit them and never draw on them.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+# About 16 MB of 32-bit pixels
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class TextCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._surfaces = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        """
+        Same arguments as pygame.font.Font.render, but the surface is cached.
+
+        Args:
+            font (pygame.font.Font): Font to render with
+            text (str): Text to render
+            antialias (bool): Antialiased rendering
+            color (tuple): Text color
+
+        Returns:
+            pygame.Surface: The rendered text, converted to the display format
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        if pygame.display.get_surface() is not None:
+            # Converted surfaces blit without a per-pixel format conversion
+            surface = surface.convert_alpha()
+        self._surfaces[key] = surface
+        self.bytes_used += self._surface_bytes(surface)
+        self._evict()
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, memory use and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._surfaces),
+            'bytes_used': self.bytes_used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _evict(self):
+        # Always keep the surface that was just added
+        while self.bytes_used > self.max_bytes and len(self._surfaces) > 1:
+            _, surface = self._surfaces.popitem(last=False)
+            self.bytes_used -= self._surface_bytes(surface)
+            self.evictions += 1
+
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# Cache shared by every scene
+text_cache = TextCache()
+
+
+def render_text(font, text, antialias, color):
+    """
+    Render text through the shared cache, see TextCache.render.
+    """
+    return text_cache.render(font, text, antialias, color)
@@ -0,0 +1,104 @@
+"""
+Text layout engine for lesson pages.
+Вёрстка текста уроков.
+
+Lesson text is word-wrapped once per (content, font, width) and rendered into
+a single page surface. Scrolling only changes which part of the page is
+blitted, the text is never wrapped or rendered again.
+"""
+
+import pygame
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+LINE_HEIGHT = 20
+BLANK_LINE_HEIGHT = 15
+
+_layouts = {}
+
+
+def wrap_line(font, line, max_width):
+    """
+    Split one line of text into lines no wider than max_width.
+
+    Args:
+        font (pygame.font.Font): Font used to measure the text
+        line (str): Text to wrap
+        max_width (int): Maximum line width in pixels
+
+    Returns:
+        list: Wrapped lines
+    """
+    if font.size(line)[0] <= max_width:
+        return [line]
+    words = line.split()
+    if not words:
+        return [line]
+    lines = []
+    current_line = words[0]
+    for word in words[1:]:
+        test_line = current_line + " " + word
+        if font.size(test_line)[0] <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    lines.append(current_line)
+    return lines
+
+
+class TextLayout:
+    def __init__(self, font, paragraphs, width, color=BLACK, background=WHITE):
+        """
+        Args:
+            font (pygame.font.Font): Font for the text
+            paragraphs (list): Lines of text, "" adds a smaller vertical gap
+            width (int): Page width in pixels
+            color (tuple): Text color
+            background (tuple): Page background color
+        """
+        self.font = font
+        self.width = width
+        self.color = color
+        self.background = background
+        self.lines = []  # (text, y of the line center)
+        y = LINE_HEIGHT // 2
+        for paragraph in paragraphs:
+            if paragraph == "":
+                y += BLANK_LINE_HEIGHT
+                continue
+            for line in wrap_line(font, paragraph, width):
+                self.lines.append((line, y))
+                y += LINE_HEIGHT
+        self.height = y - LINE_HEIGHT // 2
+        self._surface = None
+
+    @property
+    def surface(self):
+        # The whole page is rendered once, on first use
+        if self._surface is None:
+            page = pygame.Surface((self.width, max(1, self.height)))
+            page.fill(self.background)
+            for text, y in self.lines:
+                rendered = self.font.render(text, True, self.color)
+                page.blit(rendered, rendered.get_rect(midleft=(0, y)))
+            if pygame.display.get_surface() is not None:
+                page = page.convert()
+            self._surface = page
+        return self._surface
+
+
+def layout_text(font, paragraphs, width, color=BLACK, background=WHITE):
+    """
+    Return the cached layout for this content, font and width, creating it
+    the first time. Changing the content or the width gives a new layout.
+    """
+    key = (font, tuple(paragraphs), width, tuple(color), tuple(background))
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = TextLayout(font, paragraphs, width, color, background)
+    return layout
+
+
+def clear_layouts():
+    _layouts.clear()
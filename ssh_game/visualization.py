@@ -1,7 +1,9 @@
 import pygame
-import math
-import random
+import numpy as np
 from pygame.locals import *
+from text_cache import render_text
+from particles import ParticleSystem
+from game_clock import Scheduler
 
 # Constants
 SCREEN_WIDTH = 800
@@ -17,62 +19,36 @@ LIGHT_BLUE = (173, 216, 230)
 PURPLE = (128, 0, 128)
 ORANGE = (255, 165, 0)
 
-class Particle:
-    def __init__(self, x, y, color, size=3, speed=2):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.speed = speed
-        self.target_x = x
-        self.target_y = y
-        self.angle = 0
-        self.distance = 0
-        self.is_moving = False
-        self.reached_target = True
-    
-    def set_target(self, target_x, target_y):
-        self.target_x = target_x
-        self.target_y = target_y
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
-        self.angle = math.atan2(dy, dx)
-        self.distance = math.sqrt(dx**2 + dy**2)
-        self.is_moving = True
-        self.reached_target = False
-    
-    def update(self):
-        if self.is_moving and not self.reached_target:
-            # Move towards target
-            self.x += math.cos(self.angle) * self.speed
-            self.y += math.sin(self.angle) * self.speed
-            
-            # Check if reached target (within threshold)
-            dx = self.target_x - self.x
-            dy = self.target_y - self.y
-            remaining_distance = math.sqrt(dx**2 + dy**2)
-            
-            if remaining_distance < self.speed:
-                self.x = self.target_x
-                self.y = self.target_y
-                self.reached_target = True
-                self.is_moving = False
-    
-    def draw(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
+# Region the particles move in, between the sender and the receiver
+PARTICLE_AREA = pygame.Rect(100, 170, 600, 170)
+
+# Particle groups
+MESSAGE = 0
+KEY = 1
+ENCRYPTED = 2
+MESSAGE_PARTICLES = 30
+KEY_PARTICLES = 15
+STAGE_MIN_TIME = 100 / 60  # Seconds each stage is shown before the student can continue
 
 class EncryptionVisualizer:
-    def __init__(self, screen, font_small, font_medium, font_large):
+    def __init__(self, screen, fonts, message_particles=MESSAGE_PARTICLES, key_particles=KEY_PARTICLES,
+                 scheduler=None):
         self.screen = screen
-        self.font_small = font_small
-        self.font_medium = font_medium
-        self.font_large = font_large
+        self.font_small = fonts.small
+        self.font_medium = fonts.medium
+        self.font_large = fonts.large
         self.current_stage = 0
         self.max_stages = 3
-        self.particles = []
-        self.timer = 0
+        self.particles = ParticleSystem()
+        self.rng = np.random.default_rng()
+        self.message_particle_count = message_particles
+        self.key_particle_count = key_particles
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.stage_timer = None
+        self.min_time_passed = False
         self.animation_done = False
         self.show_explanation = True
+        self.frame_signature = None
         
         # Define the positions
         self.sender_pos = (150, 300)
@@ -81,19 +57,17 @@ class EncryptionVisualizer:
         self.encryption_box_pos = (400, 300)
         
         # Create message particles
-        self.message_particles = []
-        self.generate_message_particles()
+        self.message_particles = self.generate_message_particles()
         
         # Create encryption box particles
         self.encryption_box_points = []
         self.generate_encryption_box()
         
         # Create key particles
-        self.key_particles = []
-        self.generate_key_particles()
+        self.key_particles = self.generate_key_particles()
         
-        # Encrypted message particles
-        self.encrypted_particles = []
+        # Encrypted message particles are created when the message is encrypted
+        self.encrypted_particles = None
         
         # Define explanations for each stage
         self.explanations = [
@@ -106,18 +80,24 @@ class EncryptionVisualizer:
             ["Преимущества: даже если сообщение перехвачено,",
              "его невозможно прочитать без приватного ключа."]
         ]
+        
+        self.start_stage_timer()
+    
+    def random_particles(self, center, width, height, count, color, group):
+        # Particles scattered uniformly over a rectangle around center
+        positions = self.random_points(center, width, height, count)
+        sizes = self.rng.integers(2, 5, count)
+        speeds = self.rng.uniform(1, 3, count)
+        return self.particles.add(positions, color, sizes, speeds, group)
+    
+    def random_points(self, center, width, height, count):
+        x = center[0] - width/2 + self.rng.uniform(0, width, count)
+        y = center[1] - height/2 + self.rng.uniform(0, height, count)
+        return np.column_stack((x, y))
     
     def generate_message_particles(self):
         # Create particles representing the original message
-        message_width = 80
-        message_height = 40
-        num_particles = 30
-        
-        for _ in range(num_particles):
-            x = self.sender_pos[0] - message_width/2 + random.uniform(0, message_width)
-            y = self.sender_pos[1] - message_height/2 + random.uniform(0, message_height)
-            particle = Particle(x, y, GREEN, random.randint(2, 4), random.uniform(1, 3))
-            self.message_particles.append(particle)
+        return self.random_particles(self.sender_pos, 80, 40, self.message_particle_count, GREEN, MESSAGE)
     
     def generate_encryption_box(self):
         # Create points for the encryption box
@@ -135,91 +115,87 @@ class EncryptionVisualizer:
     
     def generate_key_particles(self):
         # Create particles representing the key
-        key_width = 60
-        key_height = 30
-        num_particles = 15
-        
-        for _ in range(num_particles):
-            x = self.key_pos[0] - key_width/2 + random.uniform(0, key_width)
-            y = self.key_pos[1] - key_height/2 + random.uniform(0, key_height)
-            particle = Particle(x, y, YELLOW, random.randint(2, 4), random.uniform(1, 3))
-            self.key_particles.append(particle)
+        return self.random_particles(self.key_pos, 60, 30, self.key_particle_count, YELLOW, KEY)
     
     def next_stage(self):
         if self.current_stage < self.max_stages:
             self.current_stage += 1
             self.animation_done = False
-            self.timer = 0
+            self.start_stage_timer()
             
             if self.current_stage == 1:
                 # Move message to encryption box
-                for particle in self.message_particles:
-                    target_x = self.encryption_box_pos[0] - 20 + random.uniform(0, 40)
-                    target_y = self.encryption_box_pos[1] - 15 + random.uniform(0, 30)
-                    particle.set_target(target_x, target_y)
+                count = self.message_particle_count
+                self.particles.set_targets(self.message_particles,
+                                           self.random_points(self.encryption_box_pos, 40, 30, count))
                 
                 # Move key to encryption box
-                for particle in self.key_particles:
-                    target_x = self.encryption_box_pos[0] - 15 + random.uniform(0, 30)
-                    target_y = self.encryption_box_pos[1] - 10 + random.uniform(0, 20)
-                    particle.set_target(target_x, target_y)
+                count = self.key_particle_count
+                self.particles.set_targets(self.key_particles,
+                                           self.random_points(self.encryption_box_pos, 30, 20, count))
             
             elif self.current_stage == 2:
-                # Create encrypted particles
-                for _ in range(len(self.message_particles)):
-                    x = self.encryption_box_pos[0] - 20 + random.uniform(0, 40)
-                    y = self.encryption_box_pos[1] - 15 + random.uniform(0, 30)
-                    particle = Particle(x, y, PURPLE, random.randint(2, 4), random.uniform(1, 3))
-                    target_x = self.receiver_pos[0] - 40 + random.uniform(0, 80)
-                    target_y = self.receiver_pos[1] - 20 + random.uniform(0, 40)
-                    particle.set_target(target_x, target_y)
-                    self.encrypted_particles.append(particle)
+                # Create encrypted particles, one per message particle
+                count = self.message_particle_count
+                self.encrypted_particles = self.random_particles(self.encryption_box_pos, 40, 30, count, PURPLE, ENCRYPTED)
+                self.particles.set_targets(self.encrypted_particles,
+                                           self.random_points(self.receiver_pos, 80, 40, count))
             
             elif self.current_stage == 3:
                 # Final stage - just show explanation
                 pass
     
-    def update(self):
-        self.timer += 1
-        
-        # Update all particles
-        for particle in self.message_particles:
-            particle.update()
-        
-        for particle in self.key_particles:
-            particle.update()
-        
-        for particle in self.encrypted_particles:
-            particle.update()
+    def start_stage_timer(self):
+        if self.stage_timer is not None:
+            self.stage_timer.cancel()
+        self.min_time_passed = False
+        self.stage_timer = self.scheduler.call_later(STAGE_MIN_TIME, self.stage_time_passed, owner=self)
+    
+    def on_exit(self):
+        self.scheduler.cancel_owner(self)
+    
+    def stage_time_passed(self):
+        self.min_time_passed = True
+    
+    def update(self, dt):
+        # Called once per fixed simulation step, particle speeds are in pixels per step
+        self.particles.update()
         
         # Check if current stage animation is done
         if self.current_stage == 0:
             # Initial stage - just showing the setup
-            if self.timer > 100:
+            if self.min_time_passed:
                 self.animation_done = True
         
         elif self.current_stage == 1:
             # Check if all particles reached target
-            all_reached = True
-            for particle in self.message_particles + self.key_particles:
-                if not particle.reached_target:
-                    all_reached = False
-                    break
-            
-            if all_reached and self.timer > 100:
+            all_reached = self.particles.all_reached(MESSAGE) and self.particles.all_reached(KEY)
+            if all_reached and self.min_time_passed:
                 self.animation_done = True
         
         elif self.current_stage == 2:
             # Check if all encrypted particles reached target
-            all_reached = True
-            for particle in self.encrypted_particles:
-                if not particle.reached_target:
-                    all_reached = False
-                    break
-            
-            if all_reached and self.timer > 100:
+            if self.particles.all_reached(ENCRYPTED) and self.min_time_passed:
                 self.animation_done = True
     
+    def is_animating(self):
+        # The final stage is a static explanation
+        if self.current_stage >= self.max_stages:
+            return False
+        return not self.animation_done
+    
+    def dirty_rects(self):
+        """
+        Regions changed by the last draw(), None when the whole screen changed.
+        """
+        signature = (self.current_stage, self.animation_done)
+        if signature != self.frame_signature:
+            self.frame_signature = signature
+            return None
+        if self.particles.any_moving():
+            return [PARTICLE_AREA.copy()]
+        return []
+    
     def handle_event(self, event):
         if event.type == MOUSEBUTTONDOWN and event.button == 1:
             if self.animation_done:
@@ -236,18 +212,18 @@ class EncryptionVisualizer:
         self.screen.fill(WHITE)
         
         # Draw title
-        title = self.font_large.render("Визуализация асимметричного шифрования", True, BLACK)
+        title = render_text(self.font_large, "Визуализация асимметричного шифрования", True, BLACK)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 50))
         self.screen.blit(title, title_rect)
         
         # Draw sender and receiver
         pygame.draw.circle(self.screen, BLUE, self.sender_pos, 30)
-        sender_label = self.font_small.render("Отправитель", True, BLACK)
+        sender_label = render_text(self.font_small, "Отправитель", True, BLACK)
         sender_rect = sender_label.get_rect(center=(self.sender_pos[0], self.sender_pos[1] + 50))
         self.screen.blit(sender_label, sender_rect)
         
         pygame.draw.circle(self.screen, RED, self.receiver_pos, 30)
-        receiver_label = self.font_small.render("Получатель", True, BLACK)
+        receiver_label = render_text(self.font_small, "Получатель", True, BLACK)
         receiver_rect = receiver_label.get_rect(center=(self.receiver_pos[0], self.receiver_pos[1] + 50))
         self.screen.blit(receiver_label, receiver_rect)
         
@@ -256,24 +232,17 @@ class EncryptionVisualizer:
         pygame.draw.polygon(self.screen, BLACK, self.encryption_box_points, 2)
         
         # Draw key label
-        key_label = self.font_small.render("Публичный ключ", True, BLACK)
+        key_label = render_text(self.font_small, "Публичный ключ", True, BLACK)
         key_rect = key_label.get_rect(center=(self.key_pos[0], self.key_pos[1] - 25))
         self.screen.blit(key_label, key_rect)
         
         # Draw encryption box label
-        box_label = self.font_small.render("Шифрование", True, BLACK)
+        box_label = render_text(self.font_small, "Шифрование", True, BLACK)
         box_rect = box_label.get_rect(center=(self.encryption_box_pos[0], self.encryption_box_pos[1] + 45))
         self.screen.blit(box_label, box_rect)
         
         # Draw particles
-        for particle in self.message_particles:
-            particle.draw(self.screen)
-        
-        for particle in self.key_particles:
-            particle.draw(self.screen)
-        
-        for particle in self.encrypted_particles:
-            particle.draw(self.screen)
+        self.particles.draw(self.screen)
         
         # Draw explanation
         if self.show_explanation:
@@ -282,20 +251,20 @@ class EncryptionVisualizer:
             pygame.draw.rect(self.screen, BLACK, explanation_box, 2, border_radius=10)
             
             # Draw stage number
-            stage_text = self.font_medium.render(f"Этап {self.current_stage + 1}/{self.max_stages + 1}", True, BLACK)
+            stage_text = render_text(self.font_medium, f"Этап {self.current_stage + 1}/{self.max_stages + 1}", True, BLACK)
             stage_rect = stage_text.get_rect(midtop=(SCREEN_WIDTH//2, 410))
             self.screen.blit(stage_text, stage_rect)
             
             # Draw explanation text
             y_offset = 450
             for line in self.explanations[self.current_stage]:
-                text = self.font_small.render(line, True, BLACK)
+                text = render_text(self.font_small, line, True, BLACK)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH//2, y_offset))
                 self.screen.blit(text, text_rect)
                 y_offset += 30
             
             # Draw "click to continue" if animation is done
             if self.animation_done:
-                continue_text = self.font_small.render("Нажмите, чтобы продолжить", True, BLACK)
+                continue_text = render_text(self.font_small, "Нажмите, чтобы продолжить", True, BLACK)
                 continue_rect = continue_text.get_rect(center=(SCREEN_WIDTH//2, 520))
                 self.screen.blit(continue_text, continue_rect) 
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Background jobs for the game loop.
+Фоновые задачи для игрового цикла.
+
+Heavy work (key generation, encryption, the login simulation) is submitted
+here and the frame loop polls the returned Job instead of blocking on it.
+Work in OpenSSL through the cryptography package releases the GIL and runs
+in the thread pool. Pure-Python work such as rsa.newkeys holds the GIL for
+whole seconds, so it goes to the process pool instead.
+"""
+
+import atexit
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+MAX_WORKERS = 2
+MAX_PROCESSES = 2
+# multiprocessing context of the process pool, None is the platform default (spawn on macOS and Windows)
+PROCESS_CONTEXT = None
+
+_executor = None
+_process_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the shared worker pool, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The pool used for all background jobs
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS,
+                                           thread_name_prefix='ssh-game-worker')
+        return _executor
+
+
+def get_process_executor():
+    """
+    Return the shared process pool, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: The pool used for long CPU-bound jobs
+    """
+    global _process_executor
+    with _executor_lock:
+        if _process_executor is None:
+            _process_executor = ProcessPoolExecutor(max_workers=MAX_PROCESSES, mp_context=PROCESS_CONTEXT)
+        return _process_executor
+
+
+def shutdown():
+    """
+    Stop the worker pools, dropping jobs that have not started yet.
+    """
+    global _executor, _process_executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=False, cancel_futures=True)
+            _process_executor = None
+
+
+atexit.register(shutdown)
+
+
+class Job:
+    def __init__(self, future):
+        self._future = future
+        self.cancelled = False
+
+    def done(self):
+        # A cancelled job never reports completion to the scene
+        return not self.cancelled and self._future.done()
+
+    def failed(self):
+        return self.done() and self._future.exception() is not None
+
+    def result(self):
+        """
+        Return the job result. Must only be called once done() is True,
+        so it never blocks the frame loop.
+        """
+        if not self.done():
+            raise RuntimeError("Job is not finished yet")
+        return self._future.result()
+
+    def exception(self):
+        if not self.done():
+            return None
+        return self._future.exception()
+
+    def cancel(self):
+        """
+        Cancel the job. A job that is already running is left to finish in
+        the background, but its result is discarded.
+        """
+        self.cancelled = True
+        self._future.cancel()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run a function in the background.
+
+    Args:
+        fn (callable): Function to run
+        *args, **kwargs: Arguments for the function
+
+    Returns:
+        Job: Handle the frame loop can poll with done()
+    """
+    return Job(get_executor().submit(fn, *args, **kwargs))
+
+
+def submit_process(fn, *args, **kwargs):
+    """
+    Run a CPU-bound function in the process pool. The function and its
+    arguments must be picklable, so fn has to be a module-level function.
+
+    Args:
+        fn (callable): Function to run
+        *args, **kwargs: Arguments for the function
+
+    Returns:
+        Job: Handle the frame loop can poll with done()
+    """
+    return Job(get_process_executor().submit(fn, *args, **kwargs))
+
+
+def completed(value):
+    """
+    Wrap an already available value in a finished Job, so callers can treat
+    cached results and background work the same way.
+
+    Args:
+        value: The job result
+
+    Returns:
+        Job: A job whose done() is already True
+    """
+    future = Future()
+    future.set_result(value)
+    return Job(future)
+
+
+def cancel_all(jobs):
+    """
+    Cancel every job in an iterable, ignoring None entries.
+
+    Args:
+        jobs (iterable): Jobs to cancel
+    """
+    for job in jobs:
+        if job is not None:
+            job.cancel()